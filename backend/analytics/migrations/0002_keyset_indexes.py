@@ -0,0 +1,22 @@
+# Generated by Django 5.0 on 2026-10-17 18:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0001_initial'),
+        ('schools', '0002_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='featureusage',
+            index=models.Index(fields=['date', 'id'], name='analytics_f_date_29c187_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userengagement',
+            index=models.Index(fields=['date', 'id'], name='analytics_u_date_243dc8_idx'),
+        ),
+    ]
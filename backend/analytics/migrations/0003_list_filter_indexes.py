@@ -0,0 +1,46 @@
+# Generated by Django 5.0 on 2026-10-17 18:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0002_keyset_indexes'),
+        ('schools', '0005_list_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='featureusage',
+            index=models.Index(fields=['school', '-date'], name='analytics_f_school__a0b4c4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='featureusage',
+            index=models.Index(fields=['feature_name', '-date'], name='analytics_f_feature_162f00_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='revenueanalytics',
+            index=models.Index(fields=['school', '-date'], name='analytics_r_school__7abadc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tenanthealth',
+            index=models.Index(fields=['-date'], name='analytics_t_date_0e0e94_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userengagement',
+            index=models.Index(fields=['school', '-date'], name='analytics_u_school__721fb2_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userengagement',
+            index=models.Index(fields=['country', '-date'], name='analytics_u_country_4be711_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userengagement',
+            index=models.Index(fields=['state', '-date'], name='analytics_u_state_f99be4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userengagement',
+            index=models.Index(fields=['city', '-date'], name='analytics_u_city_345545_idx'),
+        ),
+    ]
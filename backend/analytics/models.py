@@ -32,6 +32,15 @@ class UserEngagement(models.Model):
     class Meta:
         unique_together = ['date', 'school', 'country', 'state', 'city']
         ordering = ['-date']
+        indexes = [
+            # Keyset pagination on (date, id)
+            models.Index(fields=['date', 'id']),
+            # List endpoint filters and default ordering
+            models.Index(fields=['school', '-date']),
+            models.Index(fields=['country', '-date']),
+            models.Index(fields=['state', '-date']),
+            models.Index(fields=['city', '-date']),
+        ]
     
     def __str__(self):
         location = f"{self.city or 'Unknown'}, {self.country or 'Unknown'}"
@@ -69,6 +78,10 @@ class RevenueAnalytics(models.Model):
     class Meta:
         unique_together = ['date', 'school']
         ordering = ['-date']
+        indexes = [
+            # List endpoint filters and default ordering
+            models.Index(fields=['school', '-date']),
+        ]
     
     def __str__(self):
         school_name = self.school.name if self.school else "Global"
@@ -94,6 +107,13 @@ class FeatureUsage(models.Model):
     class Meta:
         unique_together = ['date', 'school', 'feature_name']
         ordering = ['-date']
+        indexes = [
+            # Keyset pagination on (date, id)
+            models.Index(fields=['date', 'id']),
+            # List endpoint filters and default ordering
+            models.Index(fields=['school', '-date']),
+            models.Index(fields=['feature_name', '-date']),
+        ]
     
     def __str__(self):
         school_name = self.school.name if self.school else "Global"
@@ -130,6 +150,10 @@ class TenantHealth(models.Model):
     class Meta:
         unique_together = ['school', 'date']
         ordering = ['-date']
+        indexes = [
+            # List endpoint filters and default ordering
+            models.Index(fields=['-date']),
+        ]
     
     def __str__(self):
         return f"{self.school.name} Health - {self.date}"
\ No newline at end of file
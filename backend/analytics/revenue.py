@@ -0,0 +1,43 @@
+from django.db.models import Sum, Avg
+from .models import RevenueAnalytics
+
+def compute_revenue_dashboard(start_date, end_date):
+    """Revenue summary, daily trend and top schools of [start_date, end_date]"""
+    queryset = RevenueAnalytics.objects.filter(
+        date__gte=start_date,
+        date__lte=end_date
+    )
+
+    # Revenue summary
+    revenue_summary = queryset.aggregate(
+        total_daily_revenue=Sum('daily_revenue'),
+        avg_monthly_revenue=Avg('monthly_revenue'),
+        new_subscriptions=Sum('new_subscriptions'),
+        canceled_subscriptions=Sum('canceled_subscriptions'),
+        successful_payments=Sum('successful_payments'),
+        failed_payments=Sum('failed_payments'),
+        avg_cac=Avg('customer_acquisition_cost'),
+        avg_clv=Avg('customer_lifetime_value'),
+        avg_churn_rate=Avg('churn_rate')
+    )
+
+    # Daily revenue trend
+    daily_revenue = list(queryset.values('date').annotate(
+        revenue=Sum('daily_revenue'),
+        new_subs=Sum('new_subscriptions'),
+        churn=Sum('canceled_subscriptions')
+    ).order_by('date'))
+
+    # Top revenue schools
+    top_schools = queryset.filter(
+        school__isnull=False
+    ).values('school__name').annotate(
+        total_revenue=Sum('daily_revenue'),
+        subscribers=Sum('new_subscriptions')
+    ).order_by('-total_revenue')[:10]
+
+    return {
+        'summary': revenue_summary,
+        'daily_trends': daily_revenue,
+        'top_schools': list(top_schools)
+    }
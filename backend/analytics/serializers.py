@@ -1,30 +1,36 @@
 from rest_framework import serializers
+from super_admin_backend.fieldsets import SparseFieldsetMixin
+from schools.serializers import SchoolBriefSerializer
 from .models import UserEngagement, RevenueAnalytics, FeatureUsage, TenantHealth
 
-class UserEngagementSerializer(serializers.ModelSerializer):
+class UserEngagementSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     school_name = serializers.CharField(source='school.name', read_only=True)
     
     class Meta:
         model = UserEngagement
         fields = '__all__'
+        expandable_fields = {'school': SchoolBriefSerializer}
 
-class RevenueAnalyticsSerializer(serializers.ModelSerializer):
+class RevenueAnalyticsSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     school_name = serializers.CharField(source='school.name', read_only=True)
     
     class Meta:
         model = RevenueAnalytics
         fields = '__all__'
+        expandable_fields = {'school': SchoolBriefSerializer}
 
-class FeatureUsageSerializer(serializers.ModelSerializer):
+class FeatureUsageSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     school_name = serializers.CharField(source='school.name', read_only=True)
     
     class Meta:
         model = FeatureUsage
         fields = '__all__'
+        expandable_fields = {'school': SchoolBriefSerializer}
 
-class TenantHealthSerializer(serializers.ModelSerializer):
+class TenantHealthSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     school_name = serializers.CharField(source='school.name', read_only=True)
     
     class Meta:
         model = TenantHealth
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+        expandable_fields = {'school': SchoolBriefSerializer}
\ No newline at end of file
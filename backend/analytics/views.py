@@ -6,12 +6,15 @@ from django.db.models import Sum, Avg, Count, Q
 from django.utils import timezone
 from datetime import timedelta
 from .models import UserEngagement, RevenueAnalytics, FeatureUsage, TenantHealth
+from .revenue import compute_revenue_dashboard
 from .serializers import (
     UserEngagementSerializer, RevenueAnalyticsSerializer, 
     FeatureUsageSerializer, TenantHealthSerializer
 )
+from super_admin_backend.exports import ExportViewSetMixin
+from super_admin_backend.fieldsets import SparseFieldsetViewSetMixin
 
-class UserEngagementViewSet(viewsets.ReadOnlyModelViewSet):
+class UserEngagementViewSet(ExportViewSetMixin, SparseFieldsetViewSetMixin, viewsets.ReadOnlyModelViewSet):
     queryset = UserEngagement.objects.select_related('school')
     serializer_class = UserEngagementSerializer
     filter_backends = [DjangoFilterBackend]
@@ -80,7 +83,7 @@ class UserEngagementViewSet(viewsets.ReadOnlyModelViewSet):
         
         return Response(list(school_stats))
 
-class RevenueAnalyticsViewSet(viewsets.ReadOnlyModelViewSet):
+class RevenueAnalyticsViewSet(ExportViewSetMixin, SparseFieldsetViewSetMixin, viewsets.ReadOnlyModelViewSet):
     queryset = RevenueAnalytics.objects.select_related('school')
     serializer_class = RevenueAnalyticsSerializer
     filter_backends = [DjangoFilterBackend]
@@ -93,45 +96,7 @@ class RevenueAnalyticsViewSet(viewsets.ReadOnlyModelViewSet):
         days = int(request.query_params.get('days', 30))
         end_date = timezone.now().date()
         start_date = end_date - timedelta(days=days)
-        
-        queryset = self.get_queryset().filter(
-            date__gte=start_date,
-            date__lte=end_date
-        )
-        
-        # Revenue summary
-        revenue_summary = queryset.aggregate(
-            total_daily_revenue=Sum('daily_revenue'),
-            avg_monthly_revenue=Avg('monthly_revenue'),
-            new_subscriptions=Sum('new_subscriptions'),
-            canceled_subscriptions=Sum('canceled_subscriptions'),
-            successful_payments=Sum('successful_payments'),
-            failed_payments=Sum('failed_payments'),
-            avg_cac=Avg('customer_acquisition_cost'),
-            avg_clv=Avg('customer_lifetime_value'),
-            avg_churn_rate=Avg('churn_rate')
-        )
-        
-        # Daily revenue trend
-        daily_revenue = list(queryset.values('date').annotate(
-            revenue=Sum('daily_revenue'),
-            new_subs=Sum('new_subscriptions'),
-            churn=Sum('canceled_subscriptions')
-        ).order_by('date'))
-        
-        # Top revenue schools
-        top_schools = queryset.filter(
-            school__isnull=False
-        ).values('school__name').annotate(
-            total_revenue=Sum('daily_revenue'),
-            subscribers=Sum('new_subscriptions')
-        ).order_by('-total_revenue')[:10]
-        
-        return Response({
-            'summary': revenue_summary,
-            'daily_trends': daily_revenue,
-            'top_schools': list(top_schools)
-        })
+        return Response(compute_revenue_dashboard(start_date, end_date))
     
     @action(detail=False, methods=['get'])
     def subscription_metrics(self, request):
@@ -159,7 +124,7 @@ class RevenueAnalyticsViewSet(viewsets.ReadOnlyModelViewSet):
             'net_subscription_growth': net_growth
         })
 
-class FeatureUsageViewSet(viewsets.ReadOnlyModelViewSet):
+class FeatureUsageViewSet(ExportViewSetMixin, SparseFieldsetViewSetMixin, viewsets.ReadOnlyModelViewSet):
     queryset = FeatureUsage.objects.select_related('school')
     serializer_class = FeatureUsageSerializer
     filter_backends = [DjangoFilterBackend]
@@ -214,7 +179,7 @@ class FeatureUsageViewSet(viewsets.ReadOnlyModelViewSet):
         
         return Response(performance_data)
 
-class TenantHealthViewSet(viewsets.ReadOnlyModelViewSet):
+class TenantHealthViewSet(ExportViewSetMixin, SparseFieldsetViewSetMixin, viewsets.ReadOnlyModelViewSet):
     queryset = TenantHealth.objects.select_related('school')
     serializer_class = TenantHealthSerializer
     filter_backends = [DjangoFilterBackend]
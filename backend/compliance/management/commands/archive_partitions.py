@@ -0,0 +1,71 @@
+import datetime
+
+from django.core.exceptions import ObjectDoesNotExist
+from django.core.management.base import BaseCommand, CommandError
+
+from super_admin_backend.partitions import (
+    archivable_months, archive_partition, partitioned_models, purge_orphaned_rows, restore_partition
+)
+
+class Command(BaseCommand):
+    help = (
+        'Move the months of RecentActivity and AuditLog older than their hot window '
+        'to compressed archive files and purge archived rows of deleted schools '
+        '(run monthly from cron), or restore a month'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--model', action='append', choices=partitioned_models(),
+            help='Partitioned model to archive (app_label.ModelName), default all'
+        )
+        parser.add_argument('--before', help='Only archive months before this one (YYYY-MM)')
+        parser.add_argument('--dry-run', action='store_true', help='List the months that would be archived')
+        parser.add_argument('--restore', help='Move this archived month (YYYY-MM) back into the table')
+
+    def parse_month(self, value, name):
+        try:
+            return datetime.datetime.strptime(value, '%Y-%m').date()
+        except ValueError:
+            raise CommandError(f'--{name} must be a month (YYYY-MM)')
+
+    def handle(self, *args, **options):
+        labels = options['model'] or partitioned_models()
+
+        if options['restore']:
+            if len(labels) != 1:
+                raise CommandError('--restore needs exactly one --model')
+            month = self.parse_month(options['restore'], 'restore')
+            try:
+                restored = restore_partition(labels[0], month)
+            except ObjectDoesNotExist:
+                raise CommandError(f'{month:%Y-%m} of {labels[0]} is not archived')
+            self.stdout.write(self.style.SUCCESS(f'Restored {restored} rows of {labels[0]} {month:%Y-%m}'))
+            return
+
+        before = self.parse_month(options['before'], 'before') if options['before'] else None
+        for label in labels:
+            months = [month for month in archivable_months(label) if before is None or month < before]
+            if not months:
+                self.stdout.write(f'{label}: nothing to archive')
+            for month in months:
+                if options['dry_run']:
+                    self.stdout.write(f'{label} {month:%Y-%m} would be archived')
+                    continue
+                try:
+                    partition = archive_partition(label, month)
+                except ValueError as e:
+                    self.stderr.write(f'{label} {month:%Y-%m}: {e}')
+                    continue
+                if partition is None:
+                    self.stdout.write(f'{label} {month:%Y-%m}: no rows')
+                    continue
+                self.stdout.write(self.style.SUCCESS(
+                    f'Archived {partition.row_count} rows of {label} {month:%Y-%m} '
+                    f'to {partition.path} ({partition.file_size} bytes)'
+                ))
+            if options['dry_run']:
+                continue
+            purged = purge_orphaned_rows(label)
+            if purged:
+                self.stdout.write(f'{label}: purged {purged} archived rows of deleted schools')
@@ -0,0 +1,64 @@
+# Generated by Django 5.0 on 2026-10-17 18:31
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('compliance', '0002_keyset_indexes'),
+        ('schools', '0005_list_filter_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['resource_type', '-created_at'], name='compliance__resourc_086268_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['severity', '-created_at'], name='compliance__severit_595962_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='complaint',
+            index=models.Index(fields=['school', '-created_at'], name='compliance__school__702793_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='complaint',
+            index=models.Index(fields=['status', '-created_at'], name='compliance__status_c66436_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='complaint',
+            index=models.Index(fields=['priority', '-created_at'], name='compliance__priorit_ba6247_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='complaint',
+            index=models.Index(fields=['category', '-created_at'], name='compliance__categor_009905_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='complaint',
+            index=models.Index(fields=['assigned_to', '-created_at'], name='compliance__assigne_c9d284_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='complaint',
+            index=models.Index(fields=['-created_at'], name='compliance__created_05bee5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='compliancereport',
+            index=models.Index(fields=['school', '-created_at'], name='compliance__school__9fdfac_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='compliancereport',
+            index=models.Index(fields=['report_type', '-created_at'], name='compliance__report__65f853_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='compliancereport',
+            index=models.Index(fields=['status', '-created_at'], name='compliance__status_b74752_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='compliancereport',
+            index=models.Index(fields=['-created_at'], name='compliance__created_223b0e_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.0 on 2026-10-17 18:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('compliance', '0003_list_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedPartition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=100)),
+                ('month', models.DateField()),
+                ('path', models.CharField(max_length=500)),
+                ('file_size', models.BigIntegerField()),
+                ('checksum', models.CharField(max_length=64)),
+                ('row_count', models.IntegerField()),
+                ('day_counts', models.JSONField(default=dict)),
+                ('summary', models.JSONField(default=dict)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['model', 'month'],
+                'unique_together': {('model', 'month')},
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0 on 2026-10-17 19:24
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('compliance', '0004_archived_partitions'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='archivedpartition',
+            name='summary',
+        ),
+    ]
@@ -56,6 +56,10 @@ class AuditLog(models.Model):
             models.Index(fields=['school', '-created_at']),
             models.Index(fields=['user', '-created_at']),
             models.Index(fields=['action', '-created_at']),
+            models.Index(fields=['created_at', 'id']),
+            # List endpoint filters and default ordering
+            models.Index(fields=['resource_type', '-created_at']),
+            models.Index(fields=['severity', '-created_at']),
         ]
     
     def __str__(self):
@@ -122,6 +126,15 @@ class Complaint(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # List endpoint filters and default ordering
+            models.Index(fields=['school', '-created_at']),
+            models.Index(fields=['status', '-created_at']),
+            models.Index(fields=['priority', '-created_at']),
+            models.Index(fields=['category', '-created_at']),
+            models.Index(fields=['assigned_to', '-created_at']),
+            models.Index(fields=['-created_at']),
+        ]
     
     def __str__(self):
         return f"{self.ticket_number} - {self.title}"
@@ -180,6 +193,33 @@ class ComplianceReport(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # List endpoint filters and default ordering
+            models.Index(fields=['school', '-created_at']),
+            models.Index(fields=['report_type', '-created_at']),
+            models.Index(fields=['status', '-created_at']),
+            models.Index(fields=['-created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_report_type_display()} - {self.title}"
+class ArchivedPartition(models.Model):
+    """A month of a partitioned table moved to an archive file (see super_admin_backend.partitions)"""
+    model = models.CharField(max_length=100)  # app_label.ModelName
+    month = models.DateField()  # first day of the month
+    
+    path = models.CharField(max_length=500)  # relative to PARTITION_ARCHIVE_ROOT
+    file_size = models.BigIntegerField()
+    checksum = models.CharField(max_length=64)  # sha256 of the file
+    
+    row_count = models.IntegerField()
+    day_counts = models.JSONField(default=dict)  # 'YYYY-MM-DD' -> rows
+    
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['model', 'month']
+        unique_together = ['model', 'month']
     
     def __str__(self):
-        return f"{self.get_report_type_display()} - {self.title}"
\ No newline at end of file
+        return f"{self.model} {self.month:%Y-%m} ({self.row_count} rows)"
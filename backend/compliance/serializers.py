@@ -1,15 +1,19 @@
 from rest_framework import serializers
+from super_admin_backend.fieldsets import SparseFieldsetMixin
+from schools.serializers import SchoolBriefSerializer
+from users.serializers import UserSerializer
 from .models import AuditLog, Complaint, ComplianceReport
 
-class AuditLogSerializer(serializers.ModelSerializer):
+class AuditLogSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     school_name = serializers.CharField(source='school.name', read_only=True)
     user_name = serializers.CharField(source='user.get_full_name', read_only=True)
     
     class Meta:
         model = AuditLog
         fields = '__all__'
+        expandable_fields = {'school': SchoolBriefSerializer, 'user': UserSerializer}
 
-class ComplaintSerializer(serializers.ModelSerializer):
+class ComplaintSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     school_name = serializers.CharField(source='school.name', read_only=True)
     assigned_to_name = serializers.CharField(source='assigned_to.get_full_name', read_only=True)
     resolved_by_name = serializers.CharField(source='resolved_by.get_full_name', read_only=True)
@@ -18,12 +22,18 @@ class ComplaintSerializer(serializers.ModelSerializer):
         model = Complaint
         fields = '__all__'
         read_only_fields = ('id', 'ticket_number', 'created_at', 'updated_at')
+        expandable_fields = {
+            'school': SchoolBriefSerializer,
+            'assigned_to': UserSerializer,
+            'resolved_by': UserSerializer,
+        }
 
-class ComplianceReportSerializer(serializers.ModelSerializer):
+class ComplianceReportSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     school_name = serializers.CharField(source='school.name', read_only=True)
     generated_by_name = serializers.CharField(source='generated_by.get_full_name', read_only=True)
     
     class Meta:
         model = ComplianceReport
         fields = '__all__'
-        read_only_fields = ('id', 'created_at', 'updated_at')
\ No newline at end of file
+        read_only_fields = ('id', 'created_at', 'updated_at')
+        expandable_fields = {'school': SchoolBriefSerializer, 'generated_by': UserSerializer}
\ No newline at end of file
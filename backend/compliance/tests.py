@@ -1,3 +1,123 @@
-from django.test import TestCase
+import io
+import shutil
+import tempfile
+from datetime import timedelta
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from schools.models import School, SchoolTier
+from super_admin_backend.partitions import (
+    add_months, archive_partition, archived_partitions, iter_partition_file, month_of, month_range,
+    restore_partition
+)
+from .models import ArchivedPartition, AuditLog
+
+LABEL = 'compliance.AuditLog'
+
+class ArchivedAuditLogTests(TestCase):
+    def setUp(self):
+        self.archive_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.archive_root)
+        override = override_settings(PARTITION_ARCHIVE_ROOT=self.archive_root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        tier = SchoolTier.objects.create(
+            name='basic', description='', max_students=10, max_teachers=1, max_admins=1, price_per_month=1
+        )
+        now = timezone.now()
+        self.schools = [
+            School.objects.create(
+                name=name, code=name, email=f'{name}@example.com', phone='1', address='', city='',
+                state='', country='', postal_code='', tier=tier, subscription_start=now,
+                subscription_end=now, license_expiry=now
+            )
+            for name in ['north', 'south']
+        ]
+        self.user = User.objects.create(username='auditor')
+        # A month well outside the hot window, and a recent row
+        self.month = add_months(month_of(now), -20)
+        start, _ = month_range(self.month)
+        self.old = [
+            self.log(self.schools[position % 2], start + timedelta(days=position, hours=1))
+            for position in range(4)
+        ]
+        self.recent = self.log(self.schools[0], now - timedelta(days=1))
+
+    def log(self, school, created_at, user=None):
+        log = AuditLog.objects.create(
+            school=school, user=user or self.user, action='update', resource_type='Student',
+            description='', ip_address='127.0.0.1', user_agent='test'
+        )
+        AuditLog.objects.filter(pk=log.pk).update(created_at=created_at)
+        log.refresh_from_db()
+        return log
+
+    def test_archive_and_restore_round_trip(self):
+        partition = archive_partition(LABEL, self.month)
+        self.assertEqual(partition.row_count, 4)
+        self.assertEqual(sum(partition.day_counts.values()), 4)
+        self.assertFalse(AuditLog.objects.filter(pk__in=[log.pk for log in self.old]).exists())
+        self.assertEqual(
+            sorted(row['id'] for row in iter_partition_file(partition)),
+            sorted(str(log.pk) for log in self.old)
+        )
+
+        self.assertEqual(restore_partition(LABEL, self.month), 4)
+        self.assertFalse(ArchivedPartition.objects.exists())
+        self.assertEqual(
+            dict(AuditLog.objects.filter(pk__in=[log.pk for log in self.old]).values_list('pk', 'created_at')),
+            {log.pk: log.created_at for log in self.old}
+        )
+
+    def test_restore_skips_deleted_schools_and_nulls_deleted_users(self):
+        archive_partition(LABEL, self.month)
+        self.user.delete()
+        self.schools[1].delete()
+
+        self.assertEqual(restore_partition(LABEL, self.month), 2)
+        restored = AuditLog.objects.filter(pk__in=[log.pk for log in self.old])
+        self.assertEqual(set(restored.values_list('school', flat=True)), {self.schools[0].pk})
+        self.assertEqual(set(restored.values_list('user', flat=True)), {None})
+
+    def test_restore_counts_only_inserted_rows(self):
+        archive_partition(LABEL, self.month)
+        # A row of the archived month already back in the table
+        AuditLog.objects.bulk_create([self.old[0]])
+        self.assertEqual(restore_partition(LABEL, self.month), 3)
+        self.assertEqual(AuditLog.objects.filter(pk__in=[log.pk for log in self.old]).count(), 4)
+
+    def test_archive_command_purges_rows_of_deleted_schools(self):
+        archive_partition(LABEL, self.month)
+        self.schools[1].delete()
+        call_command('archive_partitions', model=[LABEL], stdout=io.StringIO())
+
+        partition = archived_partitions(LABEL).get()
+        self.assertEqual(partition.row_count, 2)
+        self.assertEqual(sum(partition.day_counts.values()), 2)
+        self.assertEqual(
+            {row['school_id'] for row in iter_partition_file(partition)}, {str(self.schools[0].pk)}
+        )
+
+        self.schools[0].delete()
+        call_command('archive_partitions', model=[LABEL], stdout=io.StringIO())
+        self.assertFalse(ArchivedPartition.objects.exists())
+
+    def test_api_reads_only_the_table(self):
+        archive_partition(LABEL, self.month)
+        data = self.client.get('/api/compliance/audit-logs/').json()
+        self.assertEqual([row['id'] for row in data['results']], [str(self.recent.pk)])
+
+    def test_statistics_distributions_cover_the_window(self):
+        for days in [40, 50]:
+            self.log(self.schools[1], timezone.now() - timedelta(days=days))
+        url = '/api/compliance/audit-logs/statistics/'
+        top_schools = self.client.get(url).json()['top_schools']
+        self.assertEqual(top_schools, [{'school__name': 'north', 'count': 1}])
+        top_schools = self.client.get(url, {'days': 60}).json()['top_schools']
+        self.assertEqual(
+            top_schools, [{'school__name': 'south', 'count': 2}, {'school__name': 'north', 'count': 1}]
+        )
+        self.assertEqual(self.client.get(url, {'days': 'all'}).status_code, 400)
@@ -7,8 +7,10 @@ from django.utils import timezone
 from datetime import timedelta
 from .models import AuditLog, Complaint, ComplianceReport
 from .serializers import AuditLogSerializer, ComplaintSerializer, ComplianceReportSerializer
+from super_admin_backend.exports import ExportViewSetMixin
+from super_admin_backend.fieldsets import SparseFieldsetViewSetMixin
 
-class AuditLogViewSet(viewsets.ReadOnlyModelViewSet):
+class AuditLogViewSet(ExportViewSetMixin, SparseFieldsetViewSetMixin, viewsets.ReadOnlyModelViewSet):
     queryset = AuditLog.objects.select_related('school', 'user')
     serializer_class = AuditLogSerializer
     filter_backends = [DjangoFilterBackend]
@@ -17,7 +19,12 @@ class AuditLogViewSet(viewsets.ReadOnlyModelViewSet):
     
     @action(detail=False, methods=['get'])
     def statistics(self, request):
-        """Get audit log statistics"""
+        """Get audit log statistics; distributions cover the last ?days= (default 30)"""
+        try:
+            days = int(request.query_params.get('days', 30))
+        except ValueError:
+            return Response({'error': 'days must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        
         # Time-based statistics
         now = timezone.now()
         today = now.date()
@@ -28,18 +35,21 @@ class AuditLogViewSet(viewsets.ReadOnlyModelViewSet):
         week_logs = AuditLog.objects.filter(created_at__gte=week_ago).count()
         month_logs = AuditLog.objects.filter(created_at__gte=month_ago).count()
         
+        # Distributions over the window, not the whole table
+        window = AuditLog.objects.filter(created_at__gte=now - timedelta(days=days))
+        
         # Action type distribution
-        action_stats = AuditLog.objects.values('action').annotate(
+        action_stats = window.values('action').annotate(
             count=Count('id')
         ).order_by('-count')
         
         # Severity distribution
-        severity_stats = AuditLog.objects.values('severity').annotate(
+        severity_stats = window.values('severity').annotate(
             count=Count('id')
         ).order_by('-count')
         
         # Top active schools
-        school_stats = AuditLog.objects.filter(
+        school_stats = window.filter(
             school__isnull=False
         ).values('school__name').annotate(
             count=Count('id')
@@ -56,7 +66,7 @@ class AuditLogViewSet(viewsets.ReadOnlyModelViewSet):
             'top_schools': list(school_stats)
         })
 
-class ComplaintViewSet(viewsets.ModelViewSet):
+class ComplaintViewSet(ExportViewSetMixin, SparseFieldsetViewSetMixin, viewsets.ModelViewSet):
     queryset = Complaint.objects.select_related('school', 'assigned_to', 'resolved_by')
     serializer_class = ComplaintSerializer
     filter_backends = [DjangoFilterBackend]
@@ -145,7 +155,7 @@ class ComplaintViewSet(viewsets.ModelViewSet):
             'average_resolution_time_hours': round(avg_resolution_time, 2)
         })
 
-class ComplianceReportViewSet(viewsets.ModelViewSet):
+class ComplianceReportViewSet(ExportViewSetMixin, SparseFieldsetViewSetMixin, viewsets.ModelViewSet):
     queryset = ComplianceReport.objects.select_related('school', 'generated_by')
     serializer_class = ComplianceReportSerializer
     filter_backends = [DjangoFilterBackend]
@@ -0,0 +1,104 @@
+"""
+Dashboard bootstrap.
+
+``/api/dashboard/bootstrap/`` returns every panel the dashboard page loads
+in one response, instead of one request per panel each paying for the
+middleware, authentication and a connection. Panels are computed by the
+same functions as their own endpoints, so each panel of the payload has
+the shape of that endpoint's response.
+
+Each panel is cached under its own key for its ``DASHBOARD_PANEL_TTLS``
+seconds. A TTL of 0 leaves the panel to its own cache (school statistics,
+health overview and activity summary already keep one, invalidated on
+change). Panels missing from the cache are computed concurrently on a
+shared thread pool, each on its worker's own database connection; a
+panel that fails is reported under ``errors`` without failing the others
+(with a generic message, the exception goes to the log).
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.utils import timezone
+from analytics.revenue import compute_revenue_dashboard
+from schools.stats import get_school_statistics
+from .activity import get_activity_summary
+from .health import get_health_overview
+from .models import AIQuizPerformance
+from .quiz import compute_quiz_analytics
+from .summary import compute_dashboard_summary
+
+logger = logging.getLogger(__name__)
+
+PANEL_CACHE_KEY = 'dashboard:panel'
+PANEL_ERROR = 'This panel could not be loaded'
+
+def school_statistics_panel():
+    snapshot = get_school_statistics()
+    return {
+        **snapshot['data'],
+        'computed_at': snapshot['computed_at'],
+        'cache_age_seconds': round((timezone.now() - snapshot['computed_at']).total_seconds(), 1)
+    }
+
+def ai_quiz_panel(days=30):
+    end_date = timezone.now().date()
+    queryset = AIQuizPerformance.objects.filter(
+        date__gte=end_date - timedelta(days=days), date__lte=end_date
+    )
+    return compute_quiz_analytics(queryset)
+
+def revenue_panel(days=30):
+    end_date = timezone.now().date()
+    return compute_revenue_dashboard(end_date - timedelta(days=days), end_date)
+
+# Panel name -> function computing it, in payload order
+PANELS = {
+    'schools': school_statistics_panel,
+    'system_health': get_health_overview,
+    'metrics': compute_dashboard_summary,
+    'activities': get_activity_summary,
+    'ai_quiz': ai_quiz_panel,
+    'revenue': revenue_panel,
+}
+
+executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'DASHBOARD_BOOTSTRAP_WORKERS', 6),
+    thread_name_prefix='dashboard-panel'
+)
+
+def panel_ttl(name):
+    return getattr(settings, 'DASHBOARD_PANEL_TTLS', {}).get(name, 0)
+
+def compute_panel(name):
+    try:
+        data = PANELS[name]()
+        if panel_ttl(name):
+            cache.set(f'{PANEL_CACHE_KEY}:{name}', data, panel_ttl(name))
+        return data
+    finally:
+        # Pool threads outlive requests: release their connection the way
+        # the end of a request would
+        close_old_connections()
+
+def get_panels(names=None):
+    """({panel: data}, {panel: error}) of `names` (every panel by default)"""
+    names = list(names or PANELS)
+    cached = cache.get_many([f'{PANEL_CACHE_KEY}:{name}' for name in names if panel_ttl(name)])
+    panels, errors, futures = {}, {}, {}
+    for name in names:
+        key = f'{PANEL_CACHE_KEY}:{name}'
+        if key in cached:
+            panels[name] = cached[key]
+        else:
+            futures[name] = executor.submit(compute_panel, name)
+    for name, future in futures.items():
+        try:
+            panels[name] = future.result()
+        except Exception:
+            logger.exception('Dashboard panel %s failed', name)
+            errors[name] = PANEL_ERROR
+    return {name: panels[name] for name in names if name in panels}, errors
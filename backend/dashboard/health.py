@@ -0,0 +1,58 @@
+"""
+System health overview.
+
+The dashboard polls the overview every few seconds from many tabs, while
+components only report now and then. The overview is therefore computed
+once per reported change and kept in process memory: ``health_cache``
+validates its rows against the row count and latest ``last_check`` of
+SystemHealth, which every probe round (written by the separate
+``probe_health`` process) and every save or delete moves, and polls in
+between are answered from memory. That check is one aggregate query per
+``REFERENCE_CACHE_CHECK_INTERVAL``, whatever the cache backend.
+"""
+import threading
+
+from django.db.models import Avg, Count, Max, Q
+from super_admin_backend.refcache import health_cache
+from .models import SystemHealth
+from .serializers import SystemHealthSerializer
+
+HEALTH_STATUSES = [status for status, _ in SystemHealth.STATUS_CHOICES]
+
+_overview_lock = threading.Lock()
+_overview = {'rows': None, 'data': None}
+
+def compute_health_overview(components):
+    """Counters and averages in one conditional aggregate query"""
+    aggregates = {
+        'total_components': Count('id'),
+        'average_response_time': Avg('response_time'),
+        'average_uptime': Avg('uptime_percentage'),
+        'last_check': Max('last_check'),
+    }
+    for status in HEALTH_STATUSES:
+        aggregates[status] = Count('id', filter=Q(status=status))
+    totals = SystemHealth.objects.aggregate(**aggregates)
+
+    return {
+        'total_components': totals['total_components'],
+        **{status: totals[status] for status in HEALTH_STATUSES},
+        'average_response_time': round(totals['average_response_time'] or 0, 2),
+        'average_uptime': round(totals['average_uptime'] or 0, 2),
+        'last_check': totals['last_check'],
+        'components': SystemHealthSerializer(components, many=True).data
+    }
+
+def get_health_overview():
+    """Return the overview of the rows health_cache currently holds"""
+    # health_cache hands out a new dict whenever it reloads, so the dict
+    # itself tells whether a component reported since the last overview
+    rows = health_cache.load()
+    overview = _overview
+    if overview['rows'] is rows:
+        return overview['data']
+    with _overview_lock:
+        if _overview['rows'] is not rows:
+            data = compute_health_overview(list(rows.values()))
+            _overview.update(rows=rows, data=data)
+        return _overview['data']
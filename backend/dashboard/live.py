@@ -0,0 +1,221 @@
+"""
+Live dashboard feed.
+
+``live_feed`` streams Server-Sent Events at /api/dashboard/live/ so the
+dashboard no longer polls the activity and health endpoints:
+
+* ``activity``: each new RecentActivity, as RecentActivitySerializer
+* ``health``: each SystemHealth report, as SystemHealthSerializer
+* ``audit``: each new AuditLog of a severity in LIVE_FEED_AUDIT_SEVERITIES
+
+``?topics=activity,health`` picks topics (all by default). Events are
+published once per write, after its transaction commits, and fanned out
+in memory by super_admin_backend.pubsub, so an open stream costs no
+queries: it waits on its queue and sends a comment every
+``LIVE_FEED_HEARTBEAT`` seconds to keep proxies from closing it.
+
+A client reconnecting with ``Last-Event-ID`` (EventSource does this by
+itself) gets the events it missed, or a ``resync`` event telling it to
+reload its panels when they are no longer in the backlog.
+
+With a shared broker (RedisBroker) every writer publishes its events,
+whatever process it runs in: web workers, the ``probe_health`` command,
+imports. With LocalBroker events would stay in the writing process, so
+writers publish nothing and each web process watches the tables instead,
+for each topic one of its streams is subscribed to: new RecentActivity
+and AuditLog rows by ``created_at``, SystemHealth reports whose
+``last_check`` moved. Every ``LIVE_FEED_WATCH_POLL`` seconds a watcher
+reads back ``LIVE_FEED_WATCH_LAG`` seconds before its last check, for rows
+of transactions that committed after their ``created_at``, and skips the
+rows it already published.
+
+The stream runs the API's authentication, permission and throttle
+classes (``REST_FRAMEWORK``) before it opens, like the DRF views.
+
+The stream is an async iterator, so it needs the ASGI application
+(super_admin_backend.asgi under uvicorn or daphne); each open stream then
+holds no thread.
+"""
+import asyncio
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import close_old_connections
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.views.decorators.http import require_GET
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from compliance.models import AuditLog
+from compliance.serializers import AuditLogSerializer
+from super_admin_backend.pubsub import event_id, get_broker, hub, publish, subscribe
+from super_admin_backend.refcache import health_cache
+from .models import RecentActivity
+from .serializers import RecentActivitySerializer, SystemHealthSerializer
+
+TOPICS = ['activity', 'health', 'audit']
+
+# How long EventSource waits before reconnecting, in milliseconds
+RETRY_MS = 3000
+
+def publish_activities(pks):
+    """Publish the RecentActivity rows `pks`, oldest first"""
+    activities = RecentActivity.objects.filter(pk__in=pks).select_related(
+        'school', 'user'
+    ).order_by('created_at')
+    for activity in activities:
+        publish('activity', RecentActivitySerializer(activity).data)
+
+def publish_health(reports):
+    for health in reports:
+        publish('health', SystemHealthSerializer(health).data)
+
+def publishes_on_write():
+    """Whether writers publish their events, rather than the web processes"""
+    return get_broker().shared
+
+def is_live_audit_log(log):
+    return log.severity in getattr(settings, 'LIVE_FEED_AUDIT_SEVERITIES', ['high', 'critical'])
+
+def publish_audit_logs(pks):
+    """Publish the AuditLog rows `pks`, oldest first"""
+    logs = AuditLog.objects.filter(pk__in=pks).select_related(
+        'school', 'user'
+    ).order_by('created_at')
+    for log in logs:
+        publish('audit', AuditLogSerializer(log).data)
+
+def live_audit_logs():
+    return AuditLog.objects.filter(
+        severity__in=getattr(settings, 'LIVE_FEED_AUDIT_SEVERITIES', ['high', 'critical'])
+    )
+
+class HealthWatch:
+    """Publishes the SystemHealth reports whose last_check moved"""
+
+    def __init__(self):
+        self.checks = None
+
+    def check(self):
+        rows = health_cache.load()
+        if self.checks is not None:
+            moved = [health for pk, health in rows.items() if self.checks.get(pk) != health.last_check]
+            publish_health(sorted(moved, key=lambda health: health.last_check))
+        self.checks = {pk: health.last_check for pk, health in rows.items()}
+
+class RowWatch:
+    """Publishes the rows of `queryset` created since the first check"""
+
+    def __init__(self, queryset, publisher):
+        self.queryset = queryset
+        self.publisher = publisher
+        self.checked_at = None
+        # pk -> created_at of the rows published within the lag window
+        self.seen = None
+
+    def check(self):
+        now = timezone.now()
+        start = (self.checked_at or now) - timedelta(seconds=getattr(settings, 'LIVE_FEED_WATCH_LAG', 10))
+        rows = self.queryset.filter(created_at__gte=start).order_by('created_at', 'pk').values_list(
+            'pk', 'created_at'
+        )
+        new = [(pk, created_at) for pk, created_at in rows if self.seen is None or pk not in self.seen]
+        if self.seen is not None and new:
+            self.publisher([pk for pk, _ in new])
+        self.seen = {
+            pk: created_at for pk, created_at in (self.seen or {}).items() if created_at >= start
+        }
+        self.seen.update(new)
+        self.checked_at = now
+
+WATCHES = {
+    'activity': lambda: RowWatch(RecentActivity.objects.all(), publish_activities),
+    'health': HealthWatch,
+    'audit': lambda: RowWatch(live_audit_logs(), publish_audit_logs),
+}
+
+# (event loop, topic) -> its watching task
+watchers = {}
+
+def check_table(watch):
+    try:
+        watch.check()
+    finally:
+        # Runs outside any request: release the connection as one would
+        close_old_connections()
+
+async def watch_table(topic):
+    """Publish the topic's events from its table, while anyone listens"""
+    watch = WATCHES[topic]()
+    interval = getattr(settings, 'LIVE_FEED_WATCH_POLL', 2)
+    while hub.has_subscribers(topic):
+        await sync_to_async(check_table)(watch)
+        await asyncio.sleep(interval)
+
+def start_watchers(subscription):
+    loop = asyncio.get_running_loop()
+    for topic in WATCHES:
+        if not subscription.wants({'topic': topic}):
+            continue
+        watcher = watchers.get((loop, topic))
+        if watcher is None or watcher.done():
+            watchers[(loop, topic)] = loop.create_task(watch_table(topic))
+
+def format_event(event):
+    return f"id: {event['id']}\nevent: {event['topic']}\ndata: {event['data']}\n\n"
+
+async def event_stream(topics, last_event_id):
+    heartbeat = getattr(settings, 'LIVE_FEED_HEARTBEAT', 15)
+    subscription = await subscribe(topics, last_event_id)
+    if not publishes_on_write():
+        start_watchers(subscription)
+    try:
+        yield f'retry: {RETRY_MS}\n\n'
+        if subscription.replay is None:
+            yield format_event({'id': event_id(), 'topic': 'resync', 'data': '{}'})
+        for event in subscription.replay or []:
+            yield format_event(event)
+        while True:
+            if subscription.overflowed and subscription.queue.empty():
+                # Too far behind: end the stream, the client reconnects
+                # and catches up from the backlog
+                break
+            event = await subscription.get(heartbeat)
+            yield format_event(event) if event else ': keepalive\n\n'
+    finally:
+        subscription.close()
+
+class LiveFeedAccess(APIView):
+    """The API's authentication, permission and throttle checks, for live_feed"""
+
+    def get(self, request):
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+check_access = LiveFeedAccess.as_view()
+
+@require_GET
+async def live_feed(request):
+    """Server-Sent Events stream of the live dashboard topics"""
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {'error': 'The live feed is only served by the ASGI application'}, status=501
+        )
+    denied = await sync_to_async(check_access)(request)
+    if denied.status_code != status.HTTP_204_NO_CONTENT:
+        return denied
+    topics = [topic for topic in request.GET.get('topics', '').split(',') if topic]
+    unknown = sorted(set(topics) - set(TOPICS))
+    if unknown:
+        return JsonResponse({'error': f"Unknown topics: {', '.join(unknown)}"}, status=400)
+
+    last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    response = StreamingHttpResponse(
+        event_stream(topics, last_event_id), content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    # Keep nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,76 @@
+import datetime
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils.dateparse import parse_date
+
+from dashboard.metrics import materialize_platform_metrics, refresh_platform_metrics
+
+class Command(BaseCommand):
+    help = (
+        'Compute PlatformMetrics rows from the source tables: the stale, missing '
+        'and current days, or every day of --start/--end'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='First day to backfill (YYYY-MM-DD)')
+        parser.add_argument('--end', help='Last day to backfill (YYYY-MM-DD), default today')
+        parser.add_argument('--chunk-days', type=int, default=31, help='Days per backfill chunk')
+        parser.add_argument('--workers', type=int, default=4, help='Backfill chunks computed in parallel')
+        parser.add_argument(
+            '--interval', type=int, default=0,
+            help='Keep running and refresh every INTERVAL seconds instead of once'
+        )
+
+    def parse(self, value, name):
+        try:
+            parsed = parse_date(value)
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            raise CommandError(f'--{name} must be a date (YYYY-MM-DD)')
+        return parsed
+
+    def chunks(self, start, end, chunk_days):
+        while start <= end:
+            last = min(start + datetime.timedelta(days=chunk_days - 1), end)
+            yield start, last
+            start = last + datetime.timedelta(days=1)
+
+    def materialize_chunk(self, first, last):
+        try:
+            return materialize_platform_metrics(first, last)
+        finally:
+            # Each worker thread opens its own connections
+            connections.close_all()
+
+    def backfill(self, start, end, chunk_days, workers):
+        written = 0
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            futures = [
+                executor.submit(self.materialize_chunk, first, last)
+                for first, last in self.chunks(start, end, max(1, chunk_days))
+            ]
+            for future in as_completed(futures):
+                written += future.result()
+        self.stdout.write(self.style.SUCCESS(f'Backfilled {written} days from {start} to {end}'))
+
+    def refresh(self):
+        written = refresh_platform_metrics()
+        self.stdout.write(self.style.SUCCESS(f'Refreshed {written} days of platform metrics'))
+
+    def handle(self, *args, **options):
+        if options['start']:
+            start = self.parse(options['start'], 'start')
+            end = self.parse(options['end'], 'end') if options['end'] else datetime.date.today()
+            if start > end:
+                raise CommandError('--start must not be after --end')
+            self.backfill(start, end, options['chunk_days'], options['workers'])
+            return
+
+        self.refresh()
+        while options['interval'] > 0:
+            time.sleep(options['interval'])
+            self.refresh()
@@ -0,0 +1,44 @@
+import asyncio
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from dashboard.probes import HealthProber, load_probes
+
+class Command(BaseCommand):
+    help = 'Probe the platform components concurrently and record their health'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=int, default=None,
+            help='Seconds between probe rounds (default HEALTH_PROBE_INTERVAL)'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Run a single round and exit'
+        )
+        parser.add_argument(
+            '--component', action='append', default=[],
+            help='Only probe this component (can be repeated)'
+        )
+
+    def report(self, results):
+        for component, status, response_time, error in results:
+            style = self.style.SUCCESS if status == 'healthy' else self.style.WARNING
+            line = f'{component}: {status} ({response_time:.1f} ms)'
+            self.stdout.write(style(f'{line} {error}' if error else line))
+
+    def handle(self, *args, **options):
+        unknown = set(options['component']) - set(getattr(settings, 'HEALTH_PROBES', {}))
+        if unknown:
+            raise CommandError(f'No probe configured for: {", ".join(sorted(unknown))}')
+        probes = load_probes(options['component'])
+        if not probes:
+            raise CommandError('No configured probes to run')
+        self.stdout.write(f'Probing {", ".join(probe.component for probe in probes)}')
+
+        prober = HealthProber(probes, options['interval'])
+        try:
+            asyncio.run(prober.run(rounds=1 if options['once'] else None, on_round=self.report))
+        except KeyboardInterrupt:
+            pass
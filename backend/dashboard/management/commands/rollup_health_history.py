@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from dashboard.timeseries import prune_health_history, rollup_health_history
+
+class Command(BaseCommand):
+    help = 'Downsample system health samples and apply the retention policy (run from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=int, default=0,
+            help='Keep running and roll up every INTERVAL seconds instead of once'
+        )
+        parser.add_argument(
+            '--no-prune', action='store_true',
+            help='Only roll up, keep history past its retention'
+        )
+
+    def run(self, prune):
+        written = rollup_health_history()
+        summary = ', '.join(f'{resolution}: {count}' for resolution, count in written.items())
+        self.stdout.write(self.style.SUCCESS(f'Rolled up health samples ({summary})'))
+        if prune:
+            deleted = prune_health_history()
+            summary = ', '.join(f'{resolution}: {count}' for resolution, count in deleted.items())
+            self.stdout.write(f'Pruned health history ({summary})')
+
+    def handle(self, *args, **options):
+        self.run(not options['no_prune'])
+        while options['interval'] > 0:
+            time.sleep(options['interval'])
+            self.run(not options['no_prune'])
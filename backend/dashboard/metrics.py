@@ -0,0 +1,201 @@
+"""
+PlatformMetrics materializer.
+
+Each day's PlatformMetrics row is computed from the source tables:
+
+* schools: School rows created by the end of the day (status counts and
+  student/teacher totals use the schools' current values, so past days
+  are as accurate as the data allows and today is exact)
+* logins and quiz attempts: that day's SchoolUsageStats
+* revenue and MRR: that day's RevenueAnalytics
+* API requests: that day's AuditLog entries, which record the endpoint
+  and method of every audited API call; error rate and average response
+  time come from the 'api' HealthSample rows of the day
+
+A range of days is computed in one pass: one grouped query per source for
+the whole range, and one upsert of all its rows. Recomputing a day gives
+the same row, so runs can be repeated or overlap safely.
+
+Writes to the per-day sources mark their day in StaleMetricsDay (see
+dashboard.signals). ``refresh_platform_metrics`` recomputes the stale
+days, the days after the last materialized one and today, whose school
+counts can change without a dated source row. AuditLog rows, written on
+every audited call, are not marked for today: the refresh finds the days
+of the rows created since its last run from their ``created_at`` instead.
+"""
+import datetime
+
+from django.db import transaction
+from django.db.models import Avg, Count, Max, Min, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from analytics.models import RevenueAnalytics
+from compliance.models import AuditLog
+from schools.models import School, SchoolUsageStats
+from super_admin_backend.partitions import archived_day_counts
+from .models import PlatformMetrics, StaleMetricsDay, HealthSample
+
+METRIC_FIELDS = [
+    'total_schools', 'active_schools', 'trial_schools', 'suspended_schools',
+    'total_students', 'total_teachers', 'total_logins', 'total_quiz_attempts',
+    'total_revenue', 'monthly_recurring_revenue',
+    'api_requests', 'error_rate', 'average_response_time',
+]
+
+SCHOOL_TOTALS = {
+    'total_schools': Count('id'),
+    'active_schools': Count('id', filter=Q(status='active')),
+    'trial_schools': Count('id', filter=Q(status='trial')),
+    'suspended_schools': Count('id', filter=Q(status='suspended')),
+    'total_students': Sum('total_students'),
+    'total_teachers': Sum('total_teachers'),
+}
+
+def day_start(day):
+    return timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+
+def day_ranges(days):
+    """Group sorted dates into inclusive (first, last) runs of consecutive days"""
+    runs = []
+    for day in sorted(set(days)):
+        if runs and runs[-1][1] == day - datetime.timedelta(days=1):
+            runs[-1][1] = day
+        else:
+            runs.append([day, day])
+    return [tuple(run) for run in runs]
+
+def compute_platform_metrics(first, last):
+    """PlatformMetrics values of every day in [first, last], keyed by date"""
+    start, end = day_start(first), day_start(last + datetime.timedelta(days=1))
+
+    # School counts are running totals: those created before the range,
+    # plus each day's creations
+    running = School.objects.filter(created_at__lt=start).aggregate(**SCHOOL_TOTALS)
+    running = {field: value or 0 for field, value in running.items()}
+    created = {
+        row.pop('day'): row
+        for row in School.objects.filter(created_at__gte=start, created_at__lt=end).annotate(
+            day=TruncDate('created_at')
+        ).order_by().values('day').annotate(**SCHOOL_TOTALS)
+    }
+    usage = {
+        row.pop('date'): row
+        for row in SchoolUsageStats.objects.filter(date__range=(first, last)).order_by().values(
+            'date'
+        ).annotate(total_logins=Sum('login_count'), total_quiz_attempts=Sum('quiz_attempts'))
+    }
+    revenue = {
+        row.pop('date'): row
+        for row in RevenueAnalytics.objects.filter(date__range=(first, last)).order_by().values(
+            'date'
+        ).annotate(total_revenue=Sum('daily_revenue'), monthly_recurring_revenue=Sum('monthly_revenue'))
+    }
+    # Archived months are counted from the partition catalog
+    requests = archived_day_counts('compliance.AuditLog', first, last)
+    for day, count in AuditLog.objects.filter(created_at__gte=start, created_at__lt=end).annotate(
+        day=TruncDate('created_at')
+    ).order_by().values('day').annotate(count=Count('id')).values_list('day', 'count'):
+        requests[day] += count
+    api_health = {
+        row.pop('day'): row
+        for row in HealthSample.objects.filter(
+            component='api', recorded_at__gte=start, recorded_at__lt=end
+        ).annotate(day=TruncDate('recorded_at')).order_by().values('day').annotate(
+            samples=Count('id'),
+            errors=Count('id', filter=Q(status__in=['critical', 'down'])),
+            average_response_time=Avg('response_time'),
+        )
+    }
+
+    metrics = {}
+    day = first
+    while day <= last:
+        for field, value in created.get(day, {}).items():
+            running[field] += value or 0
+        health = api_health.get(day)
+        metrics[day] = {
+            **running,
+            'total_logins': 0,
+            'total_quiz_attempts': 0,
+            'total_revenue': 0,
+            'monthly_recurring_revenue': 0,
+            **{field: value or 0 for field, value in usage.get(day, {}).items()},
+            **{field: value or 0 for field, value in revenue.get(day, {}).items()},
+            'api_requests': requests.get(day, 0),
+            'error_rate': round(health['errors'] * 100 / health['samples'], 2) if health else 0,
+            'average_response_time': round(health['average_response_time'], 2) if health else 0,
+        }
+        day += datetime.timedelta(days=1)
+    return metrics
+
+def materialize_platform_metrics(first, last):
+    """Compute and upsert the PlatformMetrics rows of [first, last]; returns the row count"""
+    computed_at = timezone.now()
+    metrics = compute_platform_metrics(first, last)
+    rows = [
+        PlatformMetrics(date=day, computed_at=computed_at, **values)
+        for day, values in metrics.items()
+    ]
+    PlatformMetrics.objects.bulk_create(
+        rows, batch_size=500, update_conflicts=True,
+        unique_fields=['date'], update_fields=METRIC_FIELDS + ['computed_at']
+    )
+    return len(rows)
+
+def mark_metrics_stale(days):
+    """Queue days for recomputation; re-marking a queued day moves its mark"""
+    marked_at = timezone.now()
+    StaleMetricsDay.objects.bulk_create(
+        [StaleMetricsDay(date=day, marked_at=marked_at) for day in set(days)],
+        update_conflicts=True, unique_fields=['date'], update_fields=['marked_at']
+    )
+
+def pending_metrics_days(today=None):
+    """Days the incremental refresh recomputes, with their stale marks"""
+    today = today or timezone.localdate()
+    marks = dict(StaleMetricsDay.objects.filter(date__lte=today).values_list('date', 'marked_at'))
+    days = set(marks) | {today}
+
+    latest = PlatformMetrics.objects.filter(computed_at__isnull=False).aggregate(
+        latest=Max('date')
+    )['latest']
+    if latest is None:
+        # Nothing materialized yet: start from the first school
+        first = School.objects.aggregate(first=Min('created_at'))['first']
+        latest = timezone.localdate(first) - datetime.timedelta(days=1) if first else today
+    day = latest + datetime.timedelta(days=1)
+    while day < today:
+        days.add(day)
+        day += datetime.timedelta(days=1)
+
+    # Audit logs written since the last run, on days that have ended since
+    last_run = PlatformMetrics.objects.aggregate(last_run=Max('computed_at'))['last_run']
+    if last_run is not None:
+        first_new = AuditLog.objects.filter(created_at__gte=last_run).aggregate(
+            first=Min('created_at')
+        )['first']
+        day = timezone.localdate(first_new) if first_new else today
+        while day < today:
+            days.add(day)
+            day += datetime.timedelta(days=1)
+    return sorted(days), marks
+
+def refresh_platform_metrics(today=None):
+    """
+    Recompute the stale, missing and current days. Returns the number of
+    rows written.
+    """
+    days, marks = pending_metrics_days(today)
+    written = 0
+    for first, last in day_ranges(days):
+        with transaction.atomic():
+            written += materialize_platform_metrics(first, last)
+            # Only clear marks this run saw; a day marked again meanwhile
+            # stays queued for the next run
+            cleared = Q()
+            for day, marked_at in marks.items():
+                if first <= day <= last:
+                    cleared |= Q(date=day, marked_at__lte=marked_at)
+            if cleared:
+                StaleMetricsDay.objects.filter(cleared).delete()
+    return written
@@ -0,0 +1,20 @@
+# Generated by Django 5.0 on 2026-10-17 18:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0001_initial'),
+        ('schools', '0002_keyset_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='recentactivity',
+            index=models.Index(fields=['created_at', 'id'], name='dashboard_r_created_c39a57_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.0 on 2026-10-17 18:31
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0002_keyset_indexes'),
+        ('schools', '0005_list_filter_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='aiquizperformance',
+            index=models.Index(fields=['school', '-date'], name='dashboard_a_school__a6b257_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recentactivity',
+            index=models.Index(fields=['activity_type', '-created_at'], name='dashboard_r_activit_c3627d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recentactivity',
+            index=models.Index(fields=['school', '-created_at'], name='dashboard_r_school__8667db_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='systemhealth',
+            index=models.Index(fields=['component', '-last_check'], name='dashboard_s_compone_a44b07_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='systemhealth',
+            index=models.Index(fields=['status', '-last_check'], name='dashboard_s_status_a1b3d2_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='systemhealth',
+            index=models.Index(fields=['-last_check'], name='dashboard_s_last_ch_94346d_idx'),
+        ),
+    ]
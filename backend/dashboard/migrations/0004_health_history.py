@@ -0,0 +1,46 @@
+# Generated by Django 5.0 on 2026-10-17 18:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0003_list_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HealthRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('component', models.CharField(choices=[('database', 'Database'), ('api', 'API Server'), ('cache', 'Cache Server'), ('storage', 'File Storage'), ('email', 'Email Service'), ('sms', 'SMS Service'), ('payment', 'Payment Gateway')], max_length=20)),
+                ('resolution', models.CharField(choices=[('minute', 'Minute'), ('hour', 'Hour'), ('day', 'Day')], max_length=10)),
+                ('bucket_start', models.DateTimeField()),
+                ('sample_count', models.IntegerField(default=0)),
+                ('up_count', models.IntegerField(default=0)),
+                ('min_response_time', models.FloatField()),
+                ('avg_response_time', models.FloatField()),
+                ('max_response_time', models.FloatField()),
+                ('p95_response_time', models.FloatField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['resolution', 'bucket_start'], name='dashboard_h_resolut_c8fc4e_idx')],
+                'unique_together': {('resolution', 'component', 'bucket_start')},
+            },
+        ),
+        migrations.CreateModel(
+            name='HealthSample',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('component', models.CharField(choices=[('database', 'Database'), ('api', 'API Server'), ('cache', 'Cache Server'), ('storage', 'File Storage'), ('email', 'Email Service'), ('sms', 'SMS Service'), ('payment', 'Payment Gateway')], max_length=20)),
+                ('status', models.CharField(choices=[('healthy', 'Healthy'), ('warning', 'Warning'), ('critical', 'Critical'), ('down', 'Down')], max_length=20)),
+                ('response_time', models.FloatField(help_text='Response time in milliseconds')),
+                ('error_message', models.TextField(blank=True, null=True)),
+                ('recorded_at', models.DateTimeField(db_index=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['component', 'recorded_at'], name='dashboard_h_compone_9ff2bd_idx')],
+            },
+        ),
+    ]
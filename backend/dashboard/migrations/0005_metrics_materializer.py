@@ -0,0 +1,26 @@
+# Generated by Django 5.0 on 2026-10-17 18:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0004_health_history'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StaleMetricsDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('marked_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='platformmetrics',
+            name='computed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -28,9 +28,61 @@ class SystemHealth(models.Model):
     last_check = models.DateTimeField(auto_now=True)
     error_message = models.TextField(blank=True, null=True)
     
+    class Meta:
+        indexes = [
+            # List endpoint filters and default ordering
+            models.Index(fields=['component', '-last_check']),
+            models.Index(fields=['status', '-last_check']),
+            models.Index(fields=['-last_check']),
+        ]
+    
     def __str__(self):
         return f"{self.get_component_display()}: {self.get_status_display()}"
 
+class HealthSample(models.Model):
+    """One health report of a component, never updated (see dashboard.timeseries)"""
+    component = models.CharField(max_length=20, choices=SystemHealth.COMPONENT_CHOICES)
+    status = models.CharField(max_length=20, choices=SystemHealth.STATUS_CHOICES)
+    response_time = models.FloatField(help_text="Response time in milliseconds")
+    error_message = models.TextField(blank=True, null=True)
+    recorded_at = models.DateTimeField(db_index=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['component', 'recorded_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_component_display()}: {self.get_status_display()} at {self.recorded_at}"
+
+class HealthRollup(models.Model):
+    """Health samples of a component downsampled to one minute, hour or day"""
+    RESOLUTION_CHOICES = [
+        ('minute', 'Minute'),
+        ('hour', 'Hour'),
+        ('day', 'Day'),
+    ]
+    
+    component = models.CharField(max_length=20, choices=SystemHealth.COMPONENT_CHOICES)
+    resolution = models.CharField(max_length=10, choices=RESOLUTION_CHOICES)
+    bucket_start = models.DateTimeField()
+    
+    sample_count = models.IntegerField(default=0)
+    up_count = models.IntegerField(default=0)  # samples not 'down'
+    min_response_time = models.FloatField()
+    avg_response_time = models.FloatField()
+    max_response_time = models.FloatField()
+    p95_response_time = models.FloatField()
+    
+    class Meta:
+        unique_together = ['resolution', 'component', 'bucket_start']
+        indexes = [
+            models.Index(fields=['resolution', 'bucket_start']),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_component_display()} {self.resolution} {self.bucket_start}"
+
 class PlatformMetrics(models.Model):
     date = models.DateField(unique=True)
     
@@ -56,6 +108,7 @@ class PlatformMetrics(models.Model):
     average_response_time = models.FloatField(default=0)
     
     created_at = models.DateTimeField(auto_now_add=True)
+    computed_at = models.DateTimeField(null=True, blank=True)  # set by dashboard.metrics
     
     class Meta:
         ordering = ['-date']
@@ -63,6 +116,14 @@ class PlatformMetrics(models.Model):
     def __str__(self):
         return f"Platform Metrics - {self.date}"
 
+class StaleMetricsDay(models.Model):
+    """A day whose PlatformMetrics row must be recomputed (see dashboard.metrics)"""
+    date = models.DateField(unique=True)
+    marked_at = models.DateTimeField()
+    
+    def __str__(self):
+        return f"Stale metrics - {self.date}"
+
 class RecentActivity(models.Model):
     ACTIVITY_TYPES = [
         ('school_created', 'School Created'),
@@ -89,6 +150,13 @@ class RecentActivity(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination on (created_at, id)
+            models.Index(fields=['created_at', 'id']),
+            # List endpoint filters and default ordering
+            models.Index(fields=['activity_type', '-created_at']),
+            models.Index(fields=['school', '-created_at']),
+        ]
     
     def __str__(self):
         return f"{self.title} - {self.created_at.strftime('%Y-%m-%d %H:%M')}"
@@ -116,6 +184,10 @@ class AIQuizPerformance(models.Model):
     class Meta:
         unique_together = ['date', 'school']
         ordering = ['-date']
+        indexes = [
+            # List endpoint filters and default ordering
+            models.Index(fields=['school', '-date']),
+        ]
     
     def __str__(self):
         school_name = self.school.name if self.school else "Global"
@@ -0,0 +1,241 @@
+"""
+Health prober feeding SystemHealth.
+
+Each component of ``SystemHealth.COMPONENT_CHOICES`` is checked by a probe
+configured in ``HEALTH_PROBES``: a dotted class path plus its options, e.g.
+``{'class': 'dashboard.probes.HTTPProbe', 'url': ..., 'timeout': 3}``.
+Probes for components without a target (an empty ``url``) are skipped, and
+tests can point a probe at a local stub endpoint or swap in their own
+class.
+
+``HealthProber`` runs all probes concurrently with asyncio, each bounded
+by its own timeout, and writes a round of results in one batch: one
+insert of HealthSample rows, one grouped query for the rolling uptime and
+one bulk update of the SystemHealth rows.
+"""
+import asyncio
+import time
+import urllib.error
+import urllib.request
+import uuid
+from datetime import timedelta
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from super_admin_backend.refcache import health_cache
+from .live import publish_health, publishes_on_write
+from .models import SystemHealth, HealthSample
+
+class ProbeError(Exception):
+    """A failed check that still got an answer, with the status to report"""
+
+    def __init__(self, message, status='critical'):
+        super().__init__(message)
+        self.status = status
+
+class Probe:
+    """
+    Base probe. ``check()`` returns when the component is reachable and
+    raises otherwise; slow answers are reported as 'warning'.
+    """
+    timeout = 5.0
+    warning_ms = 1000
+
+    def __init__(self, component, timeout=None, warning_ms=None, **options):
+        self.component = component
+        if timeout is not None:
+            self.timeout = timeout
+        if warning_ms is not None:
+            self.warning_ms = warning_ms
+        self.options = options
+
+    def is_configured(self):
+        return True
+
+    async def check(self):
+        raise NotImplementedError
+
+class DatabaseProbe(Probe):
+    """Round trip to the database on a fresh connection"""
+
+    def select_one(self):
+        connection = connections[self.options.get('using', 'default')]
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+                cursor.fetchone()
+        finally:
+            connection.close()
+
+    async def check(self):
+        await sync_to_async(self.select_one, thread_sensitive=False)()
+
+class CacheProbe(Probe):
+    """Write and read back a key in the default cache"""
+
+    def round_trip(self):
+        key = f'health-probe:{uuid.uuid4().hex}'
+        cache.set(key, 1, 30)
+        found = cache.get(key)
+        cache.delete(key)
+        if found != 1:
+            raise ProbeError('Cache did not return the value it was given')
+
+    async def check(self):
+        await sync_to_async(self.round_trip, thread_sensitive=False)()
+
+class StorageProbe(Probe):
+    """Write and delete a small file in the default storage"""
+
+    def round_trip(self):
+        name = default_storage.save(f'health-probes/{uuid.uuid4().hex}', ContentFile(b'ok'))
+        default_storage.delete(name)
+
+    async def check(self):
+        await sync_to_async(self.round_trip, thread_sensitive=False)()
+
+class TCPProbe(Probe):
+    """Open a TCP connection to ``host``:``port`` (e.g. an SMTP server)"""
+
+    def is_configured(self):
+        return bool(self.options.get('host'))
+
+    async def check(self):
+        reader, writer = await asyncio.open_connection(self.options['host'], int(self.options['port']))
+        writer.close()
+        await writer.wait_closed()
+
+class HTTPProbe(Probe):
+    """GET ``url``; 5xx answers are critical, other errors down"""
+
+    def is_configured(self):
+        return bool(self.options.get('url'))
+
+    def fetch(self):
+        request = urllib.request.Request(self.options['url'], method=self.options.get('method', 'GET'))
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                response.read(1024)
+        except urllib.error.HTTPError as e:
+            raise ProbeError(f'HTTP {e.code}', 'critical' if e.code >= 500 else 'down')
+
+    async def check(self):
+        await sync_to_async(self.fetch, thread_sensitive=False)()
+
+def load_probes(components=None):
+    """Configured probes from HEALTH_PROBES, optionally only `components`"""
+    probes = []
+    for component, options in getattr(settings, 'HEALTH_PROBES', {}).items():
+        if components and component not in components:
+            continue
+        options = dict(options)
+        options.setdefault('timeout', getattr(settings, 'HEALTH_PROBE_TIMEOUT', 5.0))
+        probe = import_string(options.pop('class'))(component, **options)
+        if probe.is_configured():
+            probes.append(probe)
+    return probes
+
+async def run_probe(probe):
+    """(component, status, response_time_ms, error_message) of one check"""
+    started = time.perf_counter()
+    status, error = 'healthy', None
+    try:
+        await asyncio.wait_for(probe.check(), probe.timeout)
+    except asyncio.TimeoutError:
+        status, error = 'down', f'No answer within {probe.timeout:g}s'
+    except ProbeError as e:
+        status, error = e.status, str(e)
+    except Exception as e:
+        status, error = 'down', f'{type(e).__name__}: {e}'
+    response_time = (time.perf_counter() - started) * 1000
+    if status == 'healthy' and response_time > probe.warning_ms:
+        status = 'warning'
+    return probe.component, status, round(response_time, 2), error
+
+def write_probe_results(results, now=None):
+    """
+    Record a round of probe results: append the samples, derive uptime
+    over HEALTH_UPTIME_WINDOW_HOURS of samples and update SystemHealth.
+    """
+    now = now or timezone.now()
+    window = timedelta(hours=getattr(settings, 'HEALTH_UPTIME_WINDOW_HOURS', 24))
+    components = [component for component, _, _, _ in results]
+
+    with transaction.atomic():
+        HealthSample.objects.bulk_create([
+            HealthSample(
+                component=component, status=status, response_time=response_time,
+                error_message=error, recorded_at=now
+            )
+            for component, status, response_time, error in results
+        ])
+        uptime = {
+            row['component']: row['up'] * 100 / row['total']
+            for row in HealthSample.objects.filter(
+                component__in=components, recorded_at__gt=now - window
+            ).order_by().values('component').annotate(
+                total=Count('id'), up=Count('id', filter=~Q(status='down'))
+            )
+        }
+
+        # Latest row per component; bulk_update skips the save signals, so
+        # the samples above are not appended twice
+        rows = {}
+        for health in SystemHealth.objects.filter(component__in=components).order_by('last_check'):
+            rows[health.component] = health
+        created = []
+        for component, status, response_time, error in results:
+            health = rows.get(component)
+            if health is None:
+                health = SystemHealth(component=component)
+                created.append(health)
+            health.status = status
+            health.response_time = response_time
+            health.error_message = error
+            health.uptime_percentage = round(uptime.get(component, 0), 2)
+            health.last_check = now
+        SystemHealth.objects.bulk_update(
+            [health for health in rows.values()],
+            ['status', 'response_time', 'error_message', 'uptime_percentage', 'last_check']
+        )
+        SystemHealth.objects.bulk_create(created)
+        # Other processes see the round through health_cache's validator
+        transaction.on_commit(health_cache.bump)
+        # bulk_update skips the signal that publishes reports to the live
+        # feed; without a shared broker the web processes publish them
+        if publishes_on_write():
+            transaction.on_commit(partial(publish_health, list(rows.values()) + created), robust=True)
+
+class HealthProber:
+    """Probe every configured component concurrently, once or on an interval"""
+
+    def __init__(self, probes, interval=None):
+        self.probes = probes
+        self.interval = interval or getattr(settings, 'HEALTH_PROBE_INTERVAL', 30)
+
+    async def probe_once(self):
+        results = await asyncio.gather(*[run_probe(probe) for probe in self.probes])
+        await sync_to_async(write_probe_results)(results)
+        return results
+
+    async def run(self, rounds=None, on_round=None):
+        """Probe every `interval` seconds, `rounds` times or forever"""
+        done = 0
+        while rounds is None or done < rounds:
+            started = time.monotonic()
+            results = await self.probe_once()
+            if on_round:
+                on_round(results)
+            done += 1
+            if rounds is not None and done >= rounds:
+                break
+            # Keep a steady cadence whatever the probes took
+            await asyncio.sleep(max(0, self.interval - (time.monotonic() - started)))
@@ -0,0 +1,88 @@
+"""
+AI quiz performance analytics.
+
+The summary, the trend and the top schools all come from one grouped
+query over the date range, grouped by period and school. Each group
+carries its sums and row count, so folding the groups in memory gives the
+same averages (means of the rows) as aggregating each result set on its
+own. Global rows (``school=NULL``) count towards the summary and the
+trend but are not a school, so they are left out of the top schools.
+
+With a week or month granularity the query returns one group per school
+and period, so long ranges stay small.
+"""
+from collections import defaultdict
+
+from django.db.models import Count, F, Sum
+
+SUMMED_FIELDS = ['total_quizzes', 'ai_generated_quizzes', 'manual_quizzes']
+AVERAGED_FIELDS = ['average_score', 'completion_rate', 'ai_accuracy_rate']
+
+def new_totals():
+    return defaultdict(int)
+
+def add_group(totals, group):
+    for field in SUMMED_FIELDS + AVERAGED_FIELDS + ['rows']:
+        totals[field] += group[field] or 0
+
+def mean(totals, field):
+    return totals[field] / totals['rows'] if totals['rows'] else None
+
+def compute_quiz_analytics(queryset, truncate=None, top=10):
+    """
+    Summary, trend and top schools of an AIQuizPerformance queryset; the
+    trend has a point per day, or per `truncate` period (e.g. TruncWeek).
+    """
+    period = truncate('date') if truncate else F('date')
+    groups = queryset.annotate(period=period).order_by().values(
+        'period', 'school_id', 'school__name'
+    ).annotate(
+        rows=Count('id'),
+        **{field: Sum(field) for field in SUMMED_FIELDS + AVERAGED_FIELDS}
+    )
+
+    summary = new_totals()
+    periods = defaultdict(new_totals)
+    schools = defaultdict(new_totals)
+    names = {}
+    for group in groups:
+        add_group(summary, group)
+        add_group(periods[group['period']], group)
+        if group['school_id'] is not None:
+            add_group(schools[group['school_id']], group)
+            names[group['school_id']] = group['school__name']
+
+    trend = [
+        {
+            'date': date,
+            'total_quizzes': totals['total_quizzes'],
+            'ai_generated': totals['ai_generated_quizzes'],
+            'avg_score': mean(totals, 'average_score'),
+            'completion_rate': mean(totals, 'completion_rate'),
+        }
+        for date, totals in sorted(periods.items())
+    ]
+    ranked = sorted(schools.items(), key=lambda item: (-item[1]['total_quizzes'], names[item[0]]))
+    top_schools = [
+        {
+            'school__name': names[school],
+            'total_quizzes': totals['total_quizzes'],
+            'ai_generated': totals['ai_generated_quizzes'],
+            'avg_score': mean(totals, 'average_score'),
+            'completion_rate': mean(totals, 'completion_rate'),
+        }
+        for school, totals in ranked[:top]
+    ]
+    rows = summary['rows']
+    return {
+        'summary': {
+            'total_quizzes': summary['total_quizzes'] if rows else None,
+            'ai_generated': summary['ai_generated_quizzes'] if rows else None,
+            'manual_quizzes': summary['manual_quizzes'] if rows else None,
+            'avg_score': mean(summary, 'average_score'),
+            'avg_completion': mean(summary, 'completion_rate'),
+            'avg_ai_accuracy': mean(summary, 'ai_accuracy_rate'),
+        },
+        'daily_trends': trend,
+        'top_schools': top_schools,
+    }
@@ -1,27 +1,32 @@
 from rest_framework import serializers
+from super_admin_backend.fieldsets import SparseFieldsetMixin
+from schools.serializers import SchoolBriefSerializer
+from users.serializers import UserSerializer
 from .models import SystemHealth, PlatformMetrics, RecentActivity, AIQuizPerformance
 
-class SystemHealthSerializer(serializers.ModelSerializer):
+class SystemHealthSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = SystemHealth
         fields = '__all__'
 
-class PlatformMetricsSerializer(serializers.ModelSerializer):
+class PlatformMetricsSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = PlatformMetrics
         fields = '__all__'
 
-class RecentActivitySerializer(serializers.ModelSerializer):
+class RecentActivitySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     school_name = serializers.CharField(source='school.name', read_only=True)
     user_name = serializers.CharField(source='user.get_full_name', read_only=True)
     
     class Meta:
         model = RecentActivity
         fields = '__all__'
+        expandable_fields = {'school': SchoolBriefSerializer, 'user': UserSerializer}
 
-class AIQuizPerformanceSerializer(serializers.ModelSerializer):
+class AIQuizPerformanceSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     school_name = serializers.CharField(source='school.name', read_only=True)
     
     class Meta:
         model = AIQuizPerformance
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+        expandable_fields = {'school': SchoolBriefSerializer}
\ No newline at end of file
@@ -0,0 +1,52 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from analytics.models import RevenueAnalytics
+from compliance.models import AuditLog
+from schools.models import SchoolUsageStats
+from .live import (
+    is_live_audit_log, publish_activities, publish_audit_logs, publish_health, publishes_on_write
+)
+from .metrics import mark_metrics_stale
+from .models import SystemHealth, RecentActivity
+from .timeseries import record_health_sample
+
+@receiver(post_save, sender=SystemHealth)
+def append_health_sample(sender, instance, raw=False, **kwargs):
+    """Keep every report in the history, SystemHealth only holds the latest"""
+    if not raw:
+        record_health_sample(instance)
+
+@receiver(post_save, sender=SystemHealth)
+def publish_health_report(sender, instance, raw=False, **kwargs):
+    if not raw and publishes_on_write():
+        transaction.on_commit(partial(publish_health, [instance]), robust=True)
+
+@receiver(post_save, sender=SchoolUsageStats)
+@receiver(post_delete, sender=SchoolUsageStats)
+@receiver(post_save, sender=RevenueAnalytics)
+@receiver(post_delete, sender=RevenueAnalytics)
+def daily_source_changed(sender, instance, **kwargs):
+    """Queue the day's PlatformMetrics row for recomputation"""
+    mark_metrics_stale([instance.date])
+
+@receiver(post_save, sender=RecentActivity)
+def publish_new_activity(sender, instance, created, raw=False, **kwargs):
+    if created and not raw and publishes_on_write():
+        transaction.on_commit(partial(publish_activities, [instance.pk]), robust=True)
+
+@receiver(post_save, sender=AuditLog)
+def publish_new_audit_log(sender, instance, created, raw=False, **kwargs):
+    if created and not raw and is_live_audit_log(instance) and publishes_on_write():
+        transaction.on_commit(partial(publish_audit_logs, [instance.pk]), robust=True)
+
+@receiver(post_save, sender=AuditLog)
+@receiver(post_delete, sender=AuditLog)
+def audit_log_changed(sender, instance, **kwargs):
+    # Today is recomputed on every refresh, which also picks up the days of
+    # logs written since its last run: only changes to past days are marked
+    if instance.created_at and timezone.localdate(instance.created_at) != timezone.localdate():
+        mark_metrics_stale([timezone.localdate(instance.created_at)])
@@ -0,0 +1,54 @@
+"""
+Dashboard summary: the latest PlatformMetrics row with the trends and
+growth rates of the last 30 days, from one fetch of the window.
+"""
+from datetime import timedelta
+
+from django.utils import timezone
+from .models import PlatformMetrics
+from .serializers import PlatformMetricsSerializer
+
+def calculate_growth(current, previous):
+    if previous == 0:
+        return 0
+    return round(((current - previous) / previous) * 100, 2)
+
+def compute_dashboard_summary(thirty_days_ago=None):
+    thirty_days_ago = thirty_days_ago or timezone.now().date() - timedelta(days=30)
+
+    # One fetch of the 30-day window; the latest row is its last one
+    metrics_30d = list(PlatformMetrics.objects.filter(
+        date__gte=thirty_days_ago
+    ).order_by('date'))
+    latest_metrics = metrics_30d[-1] if metrics_30d else PlatformMetrics.objects.first()
+
+    # Calculate trends
+    revenue_trend = [metric.total_revenue for metric in metrics_30d]
+    schools_trend = [metric.total_schools for metric in metrics_30d]
+    students_trend = [metric.total_students for metric in metrics_30d]
+
+    # Calculate growth rates
+    growth_data = {}
+    if len(revenue_trend) >= 2:
+        growth_data['revenue_growth'] = calculate_growth(
+            revenue_trend[-1], revenue_trend[-2]
+        )
+    if len(schools_trend) >= 2:
+        growth_data['schools_growth'] = calculate_growth(
+            schools_trend[-1], schools_trend[-2]
+        )
+    if len(students_trend) >= 2:
+        growth_data['students_growth'] = calculate_growth(
+            students_trend[-1], students_trend[-2]
+        )
+
+    return {
+        'current_metrics': PlatformMetricsSerializer(latest_metrics).data if latest_metrics else None,
+        'trends': {
+            'revenue': revenue_trend,
+            'schools': schools_trend,
+            'students': students_trend,
+            'dates': [metric.date for metric in metrics_30d]
+        },
+        'growth_rates': growth_data
+    }
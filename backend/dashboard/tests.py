@@ -1,3 +1,448 @@
-from django.test import TestCase
+import asyncio
+import json
+import time
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Avg, F, Sum
+from django.db.models.functions import TruncWeek
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.permissions import IsAuthenticated
+
+from compliance.models import AuditLog
+from schools.models import School, SchoolTier
+from super_admin_backend.downsample import lttb
+from super_admin_backend.pubsub import Hub, event_id
+from .metrics import refresh_platform_metrics
+from .models import (
+    AIQuizPerformance, HealthSample, PlatformMetrics, RecentActivity, StaleMetricsDay, SystemHealth
+)
+from .bootstrap import PANEL_ERROR, PANELS
+from .live import WATCHES, LiveFeedAccess, RowWatch
+from .probes import Probe, ProbeError, load_probes, run_probe, write_probe_results
+
+def make_event(topic):
+    return {'id': event_id(), 'topic': topic, 'data': '{}'}
+
+class SleepingProbe(Probe):
+    """Answers after ``delay`` seconds"""
+
+    async def check(self):
+        await asyncio.sleep(self.options.get('delay', 0))
+
+class FailingProbe(Probe):
+    async def check(self):
+        raise ProbeError('HTTP 503')
+
+class HubTests(SimpleTestCase):
+    async def test_delivers_subscribed_topics(self):
+        hub = Hub()
+        health = hub.subscribe(['health'])
+        everything = hub.subscribe()
+        events = [make_event('activity'), make_event('health')]
+        for event in events:
+            hub.deliver(event)
+        self.assertEqual(await health.get(1), events[1])
+        self.assertIsNone(await health.get(0.01))
+        self.assertEqual([await everything.get(1), await everything.get(1)], events)
+        self.assertTrue(hub.has_subscribers('health'))
+        health.close()
+        everything.close()
+        self.assertFalse(hub.has_subscribers('health'))
+
+    async def test_replays_backlog_after_last_event_id(self):
+        hub = Hub()
+        events = [make_event(topic) for topic in ['activity', 'health', 'audit', 'health']]
+        for event in events:
+            hub.deliver(event)
+        subscription = hub.subscribe(last_event_id=events[1]['id'])
+        self.assertEqual(subscription.replay, events[2:])
+        filtered = hub.subscribe(['health'], last_event_id=events[0]['id'])
+        self.assertEqual(filtered.replay, [events[1], events[3]])
+        self.assertEqual(hub.subscribe(last_event_id=events[-1]['id']).replay, [])
+
+    @override_settings(LIVE_FEED_BACKLOG=2)
+    async def test_resyncs_when_events_left_the_backlog(self):
+        hub = Hub()
+        events = [make_event('activity') for _ in range(3)]
+        for event in events:
+            hub.deliver(event)
+        self.assertIsNone(hub.subscribe(last_event_id=events[0]['id']).replay)
+        self.assertIsNone(hub.subscribe(last_event_id='not-an-id').replay)
+        self.assertEqual(hub.subscribe(last_event_id=events[1]['id']).replay, events[2:])
+
+    @override_settings(LIVE_FEED_QUEUE_SIZE=2)
+    async def test_overflowing_subscriber_stops_queueing(self):
+        hub = Hub()
+        subscription = hub.subscribe()
+        for _ in range(3):
+            hub.deliver(make_event('activity'))
+        await asyncio.sleep(0)
+        self.assertTrue(subscription.overflowed)
+        self.assertEqual(subscription.queue.qsize(), 2)
+
+class LiveFeedAccessTests(SimpleTestCase):
+    @mock.patch.object(LiveFeedAccess, 'permission_classes', [IsAuthenticated])
+    async def test_applies_api_permissions(self):
+        response = await self.async_client.get('/api/dashboard/live/')
+        self.assertEqual(response.status_code, 401)
+
+    async def test_rejects_unknown_topics(self):
+        response = await self.async_client.get('/api/dashboard/live/', {'topics': 'activity,nope'})
+        self.assertEqual(response.status_code, 400)
+
+class LiveFeedWatchTests(TestCase):
+    def activity(self, age=None):
+        activity = RecentActivity.objects.create(activity_type='system_alert', title='', description='')
+        if age is not None:
+            RecentActivity.objects.filter(pk=activity.pk).update(created_at=timezone.now() - age)
+        return activity
+
+    def test_publishes_new_rows_once(self):
+        published = []
+        watch = RowWatch(RecentActivity.objects.all(), published.append)
+        self.activity()
+        watch.check()
+        self.assertEqual(published, [])
+        new = self.activity()
+        watch.check()
+        watch.check()
+        self.assertEqual(published, [[new.pk]])
+
+    def test_reaches_back_for_late_commits(self):
+        published = []
+        watch = RowWatch(RecentActivity.objects.all(), published.append)
+        watch.check()
+        # Stamped before the last check, committed after it
+        late = self.activity(timedelta(seconds=5))
+        self.activity(timedelta(minutes=5))
+        watch.check()
+        self.assertEqual(published, [[late.pk]])
+
+    @mock.patch('dashboard.live.publish')
+    def test_audit_watch_publishes_live_severities(self, publish):
+        watch = WATCHES['audit']()
+        watch.check()
+        for severity in ['low', 'critical']:
+            log = AuditLog.objects.create(
+                action='access', resource_type='Student', description='', ip_address='127.0.0.1',
+                user_agent='test', severity=severity
+            )
+        watch.check()
+        publish.assert_called_once()
+        self.assertEqual(publish.call_args.args[0], 'audit')
+        self.assertEqual(publish.call_args.args[1]['id'], str(log.pk))
+
+    @mock.patch('dashboard.live.publish')
+    def test_writers_publish_only_through_a_shared_broker(self, publish):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.activity()
+        publish.assert_not_called()
+        with mock.patch('dashboard.live.get_broker', return_value=mock.Mock(shared=True)):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.activity()
+        self.assertEqual(publish.call_args.args[0], 'activity')
+
+class HealthHistoryTests(TestCase):
+    url = '/api/dashboard/system-health/history/'
+
+    def test_explicit_resolution_is_bounded_by_max_points(self):
+        end = timezone.now()
+        window = {'start': (end - timedelta(days=2)).isoformat(), 'end': end.isoformat()}
+        response = self.client.get(self.url, {**window, 'resolution': 'minute'})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(self.url, {**window, 'resolution': 'raw', 'max_points': 5000})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(self.url, {**window, 'resolution': 'minute', 'max_points': 5000})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get(self.url, window).json()['resolution'], 'hour')
+
+class AuditLogMetricsTests(TestCase):
+    def log(self):
+        return AuditLog.objects.create(
+            action='access', resource_type='Student', description='', ip_address='127.0.0.1',
+            user_agent='test'
+        )
+
+    def test_todays_logs_are_not_marked_stale(self):
+        self.log()
+        self.assertFalse(StaleMetricsDay.objects.exists())
+
+    def test_refresh_recomputes_days_of_logs_written_since_last_run(self):
+        today = timezone.localdate()
+        refresh_platform_metrics(today)
+        self.log()
+        # The next run happens after midnight: today has become a past day
+        refresh_platform_metrics(today + timedelta(days=1))
+        self.assertEqual(PlatformMetrics.objects.get(date=today).api_requests, 1)
+
+    def test_changes_to_past_days_are_marked(self):
+        log = self.log()
+        AuditLog.objects.filter(pk=log.pk).update(created_at=timezone.now() - timedelta(days=3))
+        AuditLog.objects.get(pk=log.pk).delete()
+        self.assertEqual(
+            list(StaleMetricsDay.objects.values_list('date', flat=True)),
+            [timezone.localdate() - timedelta(days=3)]
+        )
+
+class LTTBTests(SimpleTestCase):
+    def test_short_series_are_returned_whole(self):
+        rows = [(x, x * 2) for x in range(5)]
+        self.assertEqual(lttb(rows, 5), rows)
+        self.assertEqual(lttb(iter(rows), 10), rows)
+
+    def test_keeps_ends_and_peaks_within_threshold(self):
+        rows = [(x, 100 if x == 37 else -100 if x == 71 else 0, f'row {x}') for x in range(100)]
+        sampled = lttb(rows, 10)
+        self.assertEqual(len(sampled), 10)
+        self.assertEqual((sampled[0], sampled[-1]), (rows[0], rows[-1]))
+        self.assertIn(rows[37], sampled)
+        self.assertIn(rows[71], sampled)
+        self.assertEqual(sampled, sorted(sampled))
+
+    def test_custom_coordinates(self):
+        rows = [{'day': x, 'value': 5 if x == 50 else 1} for x in range(100)]
+        sampled = lttb(rows, 4, x=lambda row: row['day'], y=lambda row: row['value'])
+        self.assertIn(rows[50], sampled)
+
+    def test_tiny_thresholds(self):
+        rows = [(x, x) for x in range(10)]
+        self.assertEqual(lttb(rows, 2), [rows[0], rows[-1]])
+        self.assertEqual(lttb(rows, 1), [rows[0]])
+        self.assertEqual(lttb(rows, 0), [])
+
+class RevenueChartTests(TestCase):
+    url = '/api/dashboard/metrics/revenue_chart/'
+
+    def setUp(self):
+        today = timezone.now().date()
+        PlatformMetrics.objects.bulk_create([
+            PlatformMetrics(date=today - timedelta(days=days), total_revenue=1000 if days == 45 else 10)
+            for days in range(91)
+        ])
+
+    def test_downsamples_to_max_points(self):
+        data = self.client.get(self.url, {'days': 90, 'max_points': 12}).json()
+        self.assertEqual(len(data), 12)
+        self.assertIn(1000.0, [point['revenue'] for point in data])
+        self.assertEqual(len(self.client.get(self.url, {'days': 90}).json()), 91)
+
+    def test_rejects_invalid_parameters(self):
+        self.assertEqual(self.client.get(self.url, {'max_points': 'many'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'granularity': 'hour'}).status_code, 400)
+
+class QuizAnalyticsTests(TestCase):
+    url = '/api/dashboard/ai-quiz/analytics/'
+
+    def setUp(self):
+        tier = SchoolTier.objects.create(
+            name='basic', description='', max_students=10, max_teachers=1, max_admins=1, price_per_month=1
+        )
+        now = timezone.now()
+        schools = [
+            School.objects.create(
+                name=name, code=name, email=f'{name}@example.com', phone='1', address='', city='',
+                state='', country='', postal_code='', tier=tier, subscription_start=now,
+                subscription_end=now, license_expiry=now
+            )
+            for name in ['north', 'south', 'east']
+        ]
+        today = now.date()
+        rows = []
+        # Global rows every day, schools on every first, second or third day,
+        # and a month left out of the default window
+        for days in list(range(25)) + [40]:
+            for position, school in enumerate([None] + schools):
+                if position and days % position:
+                    continue
+                rows.append(AIQuizPerformance(
+                    date=today - timedelta(days=days), school=school,
+                    total_quizzes=days + position * 7, ai_generated_quizzes=days, manual_quizzes=position * 7,
+                    average_score=50 + days + position * 0.5, completion_rate=80 - days * 0.25,
+                    ai_accuracy_rate=90 + position
+                ))
+        AIQuizPerformance.objects.bulk_create(rows)
+
+    def expected(self, days=30, truncate=None):
+        """The separate aggregates the analytics used to run"""
+        today = timezone.now().date()
+        queryset = AIQuizPerformance.objects.filter(date__gte=today - timedelta(days=days), date__lte=today)
+        summary = queryset.aggregate(
+            total_quizzes=Sum('total_quizzes'),
+            ai_generated=Sum('ai_generated_quizzes'),
+            manual_quizzes=Sum('manual_quizzes'),
+            avg_score=Avg('average_score'),
+            avg_completion=Avg('completion_rate'),
+            avg_ai_accuracy=Avg('ai_accuracy_rate')
+        )
+        period = truncate('date') if truncate else F('date')
+        trend = list(queryset.annotate(period=period).values('period').annotate(
+            total_quizzes=Sum('total_quizzes'),
+            ai_generated=Sum('ai_generated_quizzes'),
+            avg_score=Avg('average_score'),
+            completion_rate=Avg('completion_rate')
+        ).order_by('period'))
+        for point in trend:
+            point['date'] = point.pop('period')
+        # Global rows are not a school
+        top_schools = list(queryset.filter(school__isnull=False).values('school__name').annotate(
+            total_quizzes=Sum('total_quizzes'),
+            ai_generated=Sum('ai_generated_quizzes'),
+            avg_score=Avg('average_score'),
+            completion_rate=Avg('completion_rate')
+        ).order_by('-total_quizzes')[:10])
+        result = {'summary': summary, 'daily_trends': trend, 'top_schools': top_schools}
+        return json.loads(json.dumps(result, cls=DjangoJSONEncoder))
+
+    def assertAnalytics(self, data, expected):
+        self.assertEqual(data.keys(), expected.keys())
+        self.assertEqual(data['summary'].keys(), expected['summary'].keys())
+        for key, value in expected['summary'].items():
+            self.assertAlmostEqual(data['summary'][key], value, msg=key)
+        for name in ['daily_trends', 'top_schools']:
+            self.assertEqual(len(data[name]), len(expected[name]), name)
+            for row, expected_row in zip(data[name], expected[name]):
+                self.assertEqual(row.keys(), expected_row.keys())
+                for key, value in expected_row.items():
+                    self.assertAlmostEqual(row[key], value, msg=f'{name} {key}')
+
+    def test_matches_separate_aggregates(self):
+        data = self.client.get(self.url).json()
+        expected = self.expected()
+        self.assertEqual(len(expected['daily_trends']), 25)
+        self.assertEqual([row['school__name'] for row in data['top_schools']], ['north', 'south', 'east'])
+        self.assertAnalytics(data, expected)
+        self.assertAnalytics(self.client.get(self.url, {'days': 60}).json(), self.expected(60))
+
+    def test_weekly_trend(self):
+        data = self.client.get(self.url, {'granularity': 'week', 'days': 60}).json()
+        expected = self.expected(60, TruncWeek)
+        self.assertLess(len(expected['daily_trends']), 10)
+        self.assertAnalytics(data, expected)
+
+    def test_empty_range(self):
+        data = self.client.get(self.url, {'days': -1}).json()
+        self.assertEqual(data, self.expected(-1))
+        self.assertEqual(set(data['summary'].values()), {None})
+
+    def test_rejects_invalid_parameters(self):
+        self.assertEqual(self.client.get(self.url, {'days': 'all'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'granularity': 'hour'}).status_code, 400)
+
+class HealthProbeTests(SimpleTestCase):
+    @override_settings(HEALTH_PROBES={
+        'api': {'class': 'dashboard.tests.SleepingProbe', 'delay': 10, 'timeout': 0.05},
+        'cache': {'class': 'dashboard.tests.SleepingProbe', 'delay': 0.02, 'warning_ms': 1},
+        'database': {'class': 'dashboard.tests.FailingProbe'},
+        'email': {'class': 'dashboard.probes.HTTPProbe', 'url': ''},
+    })
+    async def test_each_probe_is_bounded_by_its_timeout(self):
+        probes = load_probes()
+        self.assertEqual([probe.component for probe in probes], ['api', 'cache', 'database'])
+        started = time.monotonic()
+        results = {
+            component: (status, response_time, error)
+            for component, status, response_time, error in await asyncio.gather(
+                *[run_probe(probe) for probe in probes]
+            )
+        }
+        self.assertLess(time.monotonic() - started, 5)
+        status, response_time, error = results['api']
+        self.assertEqual((status, error), ('down', 'No answer within 0.05s'))
+        self.assertLess(response_time, 5000)
+        self.assertEqual(results['cache'][0], 'warning')
+        status, _, error = results['database']
+        self.assertEqual((status, error), ('critical', 'HTTP 503'))
+
+class ProbeResultsTests(TestCase):
+    def results(self, components, status='healthy'):
+        return [(component, status, 10.0, None) for component in components]
+
+    def test_writes_a_round_in_batches(self):
+        """Samples, uptime and SystemHealth take one query each, whatever the number of components"""
+        components = ['api', 'cache', 'database']
+        write_probe_results(self.results(components[:1]))
+        # A savepoint, the sample insert, the uptime query, the SystemHealth
+        # read and update, and the release
+        with self.assertNumQueries(6):
+            write_probe_results(self.results(components[:1]))
+        # Plus one insert of the new SystemHealth rows
+        with self.assertNumQueries(7):
+            write_probe_results(self.results(components))
+        with self.assertNumQueries(6):
+            write_probe_results(self.results(components))
+        self.assertEqual(HealthSample.objects.count(), 8)
+        self.assertEqual(SystemHealth.objects.count(), 3)
+
+    @override_settings(HEALTH_UPTIME_WINDOW_HOURS=1)
+    def test_uptime_covers_the_rolling_window(self):
+        now = timezone.now()
+        write_probe_results(self.results(['api'], 'down'), now - timedelta(hours=2))
+        write_probe_results(self.results(['api'], 'down'), now - timedelta(minutes=30))
+        write_probe_results(self.results(['api'], 'warning'), now)
+        self.assertEqual(SystemHealth.objects.get(component='api').uptime_percentage, 50)
+        write_probe_results(self.results(['api']), now + timedelta(minutes=45))
+        # The sample of 30 minutes ago has left the window
+        self.assertEqual(SystemHealth.objects.get(component='api').uptime_percentage, 100)
+
+@override_settings(DASHBOARD_PANEL_TTLS={'metrics': 60, 'revenue': 60})
+class BootstrapTests(SimpleTestCase):
+    url = '/api/dashboard/bootstrap/'
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        # Stub panels, computed on the pool without touching the database
+        self.panels = {
+            'schools': mock.Mock(return_value={'total': 3}),
+            'metrics': mock.Mock(return_value={'users': 10}),
+            'revenue': mock.Mock(return_value={'total': 99.5}),
+        }
+        patcher = mock.patch.dict(PANELS, self.panels, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def calls(self):
+        return {name: panel.call_count for name, panel in self.panels.items()}
+
+    def test_returns_every_panel_or_the_requested_ones(self):
+        data = self.client.get(self.url).json()
+        self.assertEqual(
+            data, {'schools': {'total': 3}, 'metrics': {'users': 10}, 'revenue': {'total': 99.5}}
+        )
+        data = self.client.get(self.url, {'panels': 'revenue,schools'}).json()
+        self.assertEqual(list(data), ['revenue', 'schools'])
+
+    def test_unknown_panels_are_rejected(self):
+        response = self.client.get(self.url, {'panels': 'schools,weather,alerts'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': 'Unknown panels: alerts, weather'})
+        self.assertEqual(set(self.calls().values()), {0})
+
+    def test_panels_with_a_ttl_are_served_from_the_cache(self):
+        self.client.get(self.url)
+        self.client.get(self.url)
+        self.assertEqual(self.calls(), {'schools': 2, 'metrics': 1, 'revenue': 1})
+        # A panel cached by an earlier request is reused by a selection
+        self.assertEqual(self.client.get(self.url, {'panels': 'metrics'}).json(), {'metrics': {'users': 10}})
+        self.assertEqual(self.panels['metrics'].call_count, 1)
+
+    def test_failing_panel_reports_a_generic_error(self):
+        error = RuntimeError('password authentication failed for user "billing"')
+        self.panels['revenue'].side_effect = error
+        with self.assertLogs('dashboard.bootstrap', 'ERROR') as logs:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['errors'], {'revenue': PANEL_ERROR})
+        self.assertEqual(data['metrics'], {'users': 10})
+        self.assertNotIn('billing', response.content.decode())
+        self.assertIn('billing', '\n'.join(logs.output))
+
+        # Failures are not cached
+        self.panels['revenue'].side_effect = None
+        data = self.client.get(self.url, {'panels': 'revenue'}).json()
+        self.assertEqual(data, {'revenue': {'total': 99.5}})
@@ -0,0 +1,237 @@
+"""
+System health history.
+
+SystemHealth holds the latest report of each component. Every report is
+also appended to HealthSample, and ``rollup_health_history`` downsamples
+the samples into one HealthRollup per component and minute, hour and day
+(sample count, up count and min/avg/max/p95 response time). Rollups are
+computed from the raw samples, so percentiles are exact, and recomputing
+a bucket is idempotent.
+
+``prune_health_history`` applies ``HEALTH_RETENTION_DAYS`` per resolution;
+raw samples must outlive a day so that day rollups can be computed.
+
+``health_series`` answers a time range from the finest resolution that
+stays under ``HEALTH_HISTORY_MAX_POINTS`` points and is still retained for
+the whole range, and refuses an explicit resolution that would exceed it.
+Buckets not rolled up yet are computed from the samples.
+"""
+import math
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+from .models import HealthSample, HealthRollup
+
+# Finest first
+RESOLUTIONS = {
+    'minute': timedelta(minutes=1),
+    'hour': timedelta(hours=1),
+    'day': timedelta(days=1),
+}
+
+# Samples read per rollup pass, so memory stays bounded on long backfills
+ROLLUP_WINDOWS = {
+    'minute': timedelta(hours=6),
+    'hour': timedelta(days=1),
+    'day': timedelta(days=1),
+}
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+# Components report every few seconds at most; raw windows are sized as
+# if they reported this often
+RAW_SAMPLE_INTERVAL = timedelta(seconds=10)
+
+def retention(resolution):
+    """How far back `resolution` ('raw' or a rollup) is kept, or None"""
+    days = getattr(settings, 'HEALTH_RETENTION_DAYS', {}).get(resolution, 0)
+    return timedelta(days=days) if days else None
+
+def bucket_floor(moment, resolution):
+    step = RESOLUTIONS[resolution]
+    return EPOCH + (moment - EPOCH) // step * step
+
+def record_health_sample(health):
+    """Append a SystemHealth report to the history"""
+    HealthSample.objects.create(
+        component=health.component,
+        status=health.status,
+        response_time=health.response_time,
+        error_message=health.error_message,
+        recorded_at=health.last_check or timezone.now()
+    )
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of an ascending list"""
+    return ordered[max(math.ceil(fraction * len(ordered)) - 1, 0)]
+
+def summarize_bucket(samples):
+    """Rollup values of a bucket's (response_time, is_up) samples"""
+    times = sorted(response_time for response_time, _ in samples)
+    return {
+        'sample_count': len(times),
+        'up_count': sum(1 for _, is_up in samples if is_up),
+        'min_response_time': times[0],
+        'avg_response_time': sum(times) / len(times),
+        'max_response_time': times[-1],
+        'p95_response_time': percentile(times, 0.95),
+    }
+
+def summarize_samples(resolution, start, end, components=None):
+    """
+    Downsample the samples of [start, end) to `resolution`, as a dict of
+    (component, bucket_start) -> rollup values.
+    """
+    samples = HealthSample.objects.filter(recorded_at__gte=start, recorded_at__lt=end)
+    if components:
+        samples = samples.filter(component__in=components)
+    buckets = defaultdict(list)
+    rows = samples.order_by().values_list('component', 'recorded_at', 'status', 'response_time')
+    for component, recorded_at, status, response_time in rows.iterator(chunk_size=2000):
+        buckets[(component, bucket_floor(recorded_at, resolution))].append(
+            (response_time, status != 'down')
+        )
+    return {key: summarize_bucket(samples) for key, samples in buckets.items()}
+
+def rollup_health_history(now=None):
+    """
+    Roll the samples up into every closed minute, hour and day not rolled
+    up yet. The latest existing bucket of each resolution is recomputed
+    too, to pick up samples that arrived late. Returns rollups written per
+    resolution.
+    """
+    now = now or timezone.now()
+    raw_retention = retention('raw')
+    written = {}
+    for resolution in RESOLUTIONS:
+        end = bucket_floor(now, resolution)
+        start = HealthRollup.objects.filter(resolution=resolution).aggregate(
+            latest=Max('bucket_start')
+        )['latest']
+        if start is None:
+            start = HealthSample.objects.aggregate(first=Min('recorded_at'))['first']
+            if start is None:
+                written[resolution] = 0
+                continue
+            start = bucket_floor(start, resolution)
+        if raw_retention:
+            # Buckets older than the samples can no longer be rebuilt
+            start = max(start, bucket_floor(now - raw_retention, resolution))
+
+        written[resolution] = 0
+        while start < end:
+            window_end = min(start + ROLLUP_WINDOWS[resolution], end)
+            buckets = summarize_samples(resolution, start, window_end)
+            with transaction.atomic():
+                HealthRollup.objects.filter(
+                    resolution=resolution, bucket_start__gte=start, bucket_start__lt=window_end
+                ).delete()
+                HealthRollup.objects.bulk_create([
+                    HealthRollup(
+                        component=component, resolution=resolution,
+                        bucket_start=bucket_start, **values
+                    )
+                    for (component, bucket_start), values in buckets.items()
+                ], batch_size=500)
+            written[resolution] += len(buckets)
+            start = window_end
+    return written
+
+def prune_health_history(now=None):
+    """Delete samples and rollups past their retention; returns counts"""
+    now = now or timezone.now()
+    deleted = {}
+    raw_retention = retention('raw')
+    if raw_retention:
+        deleted['raw'], _ = HealthSample.objects.filter(
+            recorded_at__lt=now - raw_retention
+        ).delete()
+    for resolution in RESOLUTIONS:
+        keep = retention(resolution)
+        if keep:
+            deleted[resolution], _ = HealthRollup.objects.filter(
+                resolution=resolution, bucket_start__lt=now - keep
+            ).delete()
+    return deleted
+
+def choose_resolution(start, end, max_points, now=None):
+    """Finest resolution with at most `max_points` buckets covering [start, end)"""
+    now = now or timezone.now()
+    candidates = [('raw', None)] + list(RESOLUTIONS.items())
+    for resolution, step in candidates:
+        keep = retention(resolution)
+        if keep and start < now - keep:
+            continue
+        if (end - start) / (step or RAW_SAMPLE_INTERVAL) <= max_points:
+            return resolution
+    return 'day'
+
+def health_series(start, end, components=None, resolution=None, max_points=None):
+    """
+    Points of [start, end) per component at `resolution` (chosen from the
+    window when not given). Returns (resolution, {component: [point, ...]}).
+    Raises ValueError when `resolution` would give more than `max_points`
+    points per component.
+    """
+    max_points = max_points or getattr(settings, 'HEALTH_HISTORY_MAX_POINTS', 500)
+    if resolution is None:
+        resolution = choose_resolution(start, end, max_points)
+    elif (end - start) / RESOLUTIONS.get(resolution, RAW_SAMPLE_INTERVAL) > max_points:
+        raise ValueError(
+            f'{resolution} resolution gives more than {max_points} points over this range; '
+            f'narrow the range or pick a coarser resolution'
+        )
+    series = defaultdict(list)
+
+    if resolution == 'raw':
+        samples = HealthSample.objects.filter(recorded_at__gte=start, recorded_at__lt=end)
+        if components:
+            samples = samples.filter(component__in=components)
+        rows = samples.order_by('component', 'recorded_at').values_list(
+            'component', 'recorded_at', 'status', 'response_time'
+        )
+        for component, recorded_at, status, response_time in rows:
+            series[component].append({
+                'time': recorded_at,
+                'status': status,
+                'response_time': response_time,
+            })
+        return resolution, dict(series)
+
+    first = bucket_floor(start, resolution)
+    rollups = HealthRollup.objects.filter(
+        resolution=resolution, bucket_start__gte=first, bucket_start__lt=end
+    )
+    if components:
+        rollups = rollups.filter(component__in=components)
+    points = {
+        (row.pop('component'), row.pop('bucket_start')): row
+        for row in rollups.values(
+            'component', 'bucket_start', 'sample_count', 'up_count', 'min_response_time',
+            'avg_response_time', 'max_response_time', 'p95_response_time'
+        )
+    }
+
+    # Buckets after the last rollup pass come straight from the samples
+    latest = HealthRollup.objects.filter(resolution=resolution).aggregate(
+        latest=Max('bucket_start')
+    )['latest']
+    tail = max(first, latest + RESOLUTIONS[resolution]) if latest else first
+    if tail < end:
+        points.update(summarize_samples(resolution, tail, end, components))
+
+    for (component, bucket_start), values in sorted(points.items()):
+        series[component].append({
+            'time': bucket_start,
+            'samples': values['sample_count'],
+            'uptime': round(values['up_count'] * 100 / values['sample_count'], 2),
+            'min_response_time': values['min_response_time'],
+            'avg_response_time': round(values['avg_response_time'], 2),
+            'max_response_time': values['max_response_time'],
+            'p95_response_time': values['p95_response_time'],
+        })
+    return resolution, dict(series)
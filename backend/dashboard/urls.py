@@ -2,8 +2,9 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
     SystemHealthViewSet, PlatformMetricsViewSet, 
-    RecentActivityViewSet, AIQuizPerformanceViewSet
+    RecentActivityViewSet, AIQuizPerformanceViewSet, bootstrap
 )
+from .live import live_feed
 
 router = DefaultRouter()
 router.register(r'system-health', SystemHealthViewSet)
@@ -12,5 +13,7 @@ router.register(r'activities', RecentActivityViewSet)
 router.register(r'ai-quiz', AIQuizPerformanceViewSet)
 
 urlpatterns = [
+    path('live/', live_feed, name='live-feed'),
+    path('bootstrap/', bootstrap, name='dashboard-bootstrap'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
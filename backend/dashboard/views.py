@@ -1,18 +1,30 @@
 from rest_framework import viewsets, status
-from rest_framework.decorators import action
+from rest_framework.decorators import action, api_view
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Sum, Avg, Count, Q
+from django.db.models import Sum, Avg, Count, Max, Q
+from django.db.models.functions import TruncWeek, TruncMonth
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from datetime import timedelta
 from .models import SystemHealth, PlatformMetrics, RecentActivity, AIQuizPerformance
 from .serializers import (
     SystemHealthSerializer, PlatformMetricsSerializer, 
     RecentActivitySerializer, AIQuizPerformanceSerializer
 )
+from .activity import get_activity_summary
+from .bootstrap import PANELS, get_panels
+from .health import get_health_overview
+from .quiz import compute_quiz_analytics
+from .summary import compute_dashboard_summary
+from .timeseries import RESOLUTIONS, health_series
+from super_admin_backend.conditional import add_validators, make_etag, not_modified
+from super_admin_backend.downsample import lttb
+from super_admin_backend.exports import ExportViewSetMixin
+from super_admin_backend.fieldsets import SparseFieldsetViewSetMixin
 from schools.models import School
 
-class SystemHealthViewSet(viewsets.ModelViewSet):
+class SystemHealthViewSet(ExportViewSetMixin, SparseFieldsetViewSetMixin, viewsets.ModelViewSet):
     queryset = SystemHealth.objects.all()
     serializer_class = SystemHealthSerializer
     filter_backends = [DjangoFilterBackend]
@@ -22,33 +34,66 @@ class SystemHealthViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def overview(self, request):
         """Get system health overview"""
-        components = SystemHealth.objects.all()
-        
-        healthy_count = components.filter(status='healthy').count()
-        warning_count = components.filter(status='warning').count()
-        critical_count = components.filter(status='critical').count()
-        down_count = components.filter(status='down').count()
-        
-        average_response_time = components.aggregate(
-            avg_response=Avg('response_time')
-        )['avg_response'] or 0
-        
-        average_uptime = components.aggregate(
-            avg_uptime=Avg('uptime_percentage')
-        )['avg_uptime'] or 0
+        return Response(get_health_overview())
+    
+    @action(detail=False, methods=['get'])
+    def history(self, request):
+        """Response time and uptime of components over ?start= .. ?end="""
+        now = timezone.now()
+        bounds = {}
+        for name, default in (('end', now), ('start', None)):
+            value = request.query_params.get(name)
+            if not value:
+                bounds[name] = default
+                continue
+            try:
+                parsed = parse_datetime(value)
+            except ValueError:
+                parsed = None
+            if parsed is None:
+                return Response(
+                    {'error': f'{name} must be an ISO 8601 datetime'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            bounds[name] = parsed if timezone.is_aware(parsed) else timezone.make_aware(parsed)
+        end = bounds['end']
+        start = bounds['start'] or end - timedelta(hours=24)
+        if start >= end:
+            return Response({'error': 'start must be before end'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        components = [c for c in request.query_params.get('component', '').split(',') if c]
+        unknown = set(components) - {choice for choice, _ in SystemHealth.COMPONENT_CHOICES}
+        if unknown:
+            return Response(
+                {'error': f'Unknown component: {", ".join(sorted(unknown))}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
+        resolution = request.query_params.get('resolution') or None
+        if resolution and resolution != 'raw' and resolution not in RESOLUTIONS:
+            return Response(
+                {'error': f'resolution must be one of raw, {", ".join(RESOLUTIONS)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            max_points = int(request.query_params.get('max_points') or 0) or None
+        except ValueError:
+            max_points = None
+        if max_points:
+            max_points = max(10, min(max_points, 5000))
+        
+        try:
+            resolution, series = health_series(start, end, components, resolution, max_points)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         return Response({
-            'total_components': components.count(),
-            'healthy': healthy_count,
-            'warning': warning_count,
-            'critical': critical_count,
-            'down': down_count,
-            'average_response_time': round(average_response_time, 2),
-            'average_uptime': round(average_uptime, 2),
-            'components': SystemHealthSerializer(components, many=True).data
+            'start': start,
+            'end': end,
+            'resolution': resolution,
+            'series': series
         })
 
-class PlatformMetricsViewSet(viewsets.ReadOnlyModelViewSet):
+class PlatformMetricsViewSet(ExportViewSetMixin, SparseFieldsetViewSetMixin, viewsets.ReadOnlyModelViewSet):
     queryset = PlatformMetrics.objects.all()
     serializer_class = PlatformMetricsSerializer
     filter_backends = [DjangoFilterBackend]
@@ -61,74 +106,77 @@ class PlatformMetricsViewSet(viewsets.ReadOnlyModelViewSet):
         today = timezone.now().date()
         thirty_days_ago = today - timedelta(days=30)
         
-        # Get latest metrics
-        latest_metrics = PlatformMetrics.objects.first()
-        
-        # Get trends for last 30 days
-        metrics_30d = PlatformMetrics.objects.filter(
-            date__gte=thirty_days_ago
-        ).order_by('date')
-        
-        # Calculate trends
-        revenue_trend = list(metrics_30d.values_list('total_revenue', flat=True))
-        schools_trend = list(metrics_30d.values_list('total_schools', flat=True))
-        students_trend = list(metrics_30d.values_list('total_students', flat=True))
-        
-        # Calculate growth rates
-        def calculate_growth(current, previous):
-            if previous == 0:
-                return 0
-            return round(((current - previous) / previous) * 100, 2)
-        
-        growth_data = {}
-        if len(revenue_trend) >= 2:
-            growth_data['revenue_growth'] = calculate_growth(
-                revenue_trend[-1], revenue_trend[-2]
-            )
-        if len(schools_trend) >= 2:
-            growth_data['schools_growth'] = calculate_growth(
-                schools_trend[-1], schools_trend[-2]
-            )
-        if len(students_trend) >= 2:
-            growth_data['students_growth'] = calculate_growth(
-                students_trend[-1], students_trend[-2]
-            )
-        
-        return Response({
-            'current_metrics': PlatformMetricsSerializer(latest_metrics).data if latest_metrics else None,
-            'trends': {
-                'revenue': revenue_trend,
-                'schools': schools_trend,
-                'students': students_trend,
-                'dates': list(metrics_30d.values_list('date', flat=True))
-            },
-            'growth_rates': growth_data
-        })
+        # Validators first: an unchanged dashboard is a 304 without
+        # fetching or serializing any rows
+        versions = PlatformMetrics.objects.aggregate(
+            created=Max('created_at'), computed=Max('computed_at'), rows=Count('id')
+        )
+        last_modified = max(filter(None, (versions['created'], versions['computed'])), default=None)
+        etag = make_etag(versions['created'], versions['computed'], versions['rows'], thirty_days_ago)
+        cached = not_modified(request, etag, last_modified)
+        if cached is not None:
+            return cached
+        
+        response = Response(compute_dashboard_summary(thirty_days_ago))
+        return add_validators(response, etag, last_modified)
+    
+    revenue_chart_max_points = 500
+    revenue_chart_granularities = {
+        'week': TruncWeek,
+        'month': TruncMonth,
+    }
     
     @action(detail=False, methods=['get'])
     def revenue_chart(self, request):
-        """Get revenue chart data"""
-        days = int(request.query_params.get('days', 30))
+        """Get revenue chart data, per ?granularity= and at most ?max_points= points"""
+        try:
+            days = int(request.query_params.get('days', 30))
+            max_points = int(request.query_params.get('max_points', self.revenue_chart_max_points))
+        except ValueError:
+            return Response({'error': 'days and max_points must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+        max_points = max(3, min(max_points, self.revenue_chart_max_points * 10))
+        granularity = request.query_params.get('granularity', 'day')
+        if granularity != 'day' and granularity not in self.revenue_chart_granularities:
+            return Response(
+                {'error': 'granularity must be one of day, week, month'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         end_date = timezone.now().date()
         start_date = end_date - timedelta(days=days)
         
         metrics = PlatformMetrics.objects.filter(
             date__gte=start_date,
             date__lte=end_date
-        ).order_by('date')
+        )
+        if granularity == 'day':
+            rows = metrics.order_by('date').values_list(
+                'date', 'total_revenue', 'monthly_recurring_revenue', 'total_schools'
+            )
+        else:
+            # Revenue adds up over a period; MRR and school counts are
+            # levels, so take their average and peak
+            truncate = self.revenue_chart_granularities[granularity]
+            rows = metrics.annotate(period=truncate('date')).order_by().values('period').annotate(
+                revenue=Sum('total_revenue'),
+                mrr=Avg('monthly_recurring_revenue'),
+                schools=Max('total_schools')
+            ).order_by('period').values_list('period', 'revenue', 'mrr', 'schools')
+        
+        # Keep the shape of the revenue line within max_points
+        rows = lttb(rows.iterator(), max_points, x=lambda row: row[0].toordinal(), y=lambda row: row[1] or 0)
         
         data = []
-        for metric in metrics:
+        for date, revenue, mrr, schools in rows:
             data.append({
-                'date': metric.date,
-                'revenue': float(metric.total_revenue),
-                'mrr': float(metric.monthly_recurring_revenue),
-                'schools': metric.total_schools
+                'date': date,
+                'revenue': float(revenue or 0),
+                'mrr': float(mrr or 0),
+                'schools': schools
             })
         
         return Response(data)
 
-class RecentActivityViewSet(viewsets.ReadOnlyModelViewSet):
+class RecentActivityViewSet(ExportViewSetMixin, SparseFieldsetViewSetMixin, viewsets.ReadOnlyModelViewSet):
     queryset = RecentActivity.objects.select_related('school', 'user')
     serializer_class = RecentActivitySerializer
     filter_backends = [DjangoFilterBackend]
@@ -138,84 +186,55 @@ class RecentActivityViewSet(viewsets.ReadOnlyModelViewSet):
     @action(detail=False, methods=['get'])
     def summary(self, request):
         """Get activity summary for different time periods"""
-        now = timezone.now()
-        today = now.date()
-        week_ago = now - timedelta(days=7)
-        month_ago = now - timedelta(days=30)
-        
-        # Today's activities
-        today_activities = RecentActivity.objects.filter(
-            created_at__date=today
-        ).values('activity_type').annotate(count=Count('id'))
-        
-        # This week's activities
-        week_activities = RecentActivity.objects.filter(
-            created_at__gte=week_ago
-        ).values('activity_type').annotate(count=Count('id'))
-        
-        # This month's activities
-        month_activities = RecentActivity.objects.filter(
-            created_at__gte=month_ago
-        ).values('activity_type').annotate(count=Count('id'))
-        
-        return Response({
-            'today': list(today_activities),
-            'this_week': list(week_activities),
-            'this_month': list(month_activities),
-            'recent_activities': RecentActivitySerializer(
-                RecentActivity.objects.all()[:10], many=True
-            ).data
-        })
+        return Response(get_activity_summary())
 
-class AIQuizPerformanceViewSet(viewsets.ReadOnlyModelViewSet):
+class AIQuizPerformanceViewSet(ExportViewSetMixin, SparseFieldsetViewSetMixin, viewsets.ReadOnlyModelViewSet):
     queryset = AIQuizPerformance.objects.select_related('school')
     serializer_class = AIQuizPerformanceSerializer
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['school', 'date']
     ordering = ['-date']
     
+    analytics_granularities = {
+        'week': TruncWeek,
+        'month': TruncMonth,
+    }
+    
     @action(detail=False, methods=['get'])
     def analytics(self, request):
-        """Get AI quiz performance analytics"""
-        days = int(request.query_params.get('days', 30))
+        """Get AI quiz performance analytics, with a trend point per ?granularity="""
+        try:
+            days = int(request.query_params.get('days', 30))
+        except ValueError:
+            return Response({'error': 'days must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        granularity = request.query_params.get('granularity', 'day')
+        if granularity != 'day' and granularity not in self.analytics_granularities:
+            return Response(
+                {'error': 'granularity must be one of day, week, month'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         end_date = timezone.now().date()
         start_date = end_date - timedelta(days=days)
         
-        queryset = self.get_queryset().filter(
+        queryset = AIQuizPerformance.objects.filter(
             date__gte=start_date,
             date__lte=end_date
         )
-        
-        # Overall statistics
-        total_stats = queryset.aggregate(
-            total_quizzes=Sum('total_quizzes'),
-            ai_generated=Sum('ai_generated_quizzes'),
-            manual_quizzes=Sum('manual_quizzes'),
-            avg_score=Avg('average_score'),
-            avg_completion=Avg('completion_rate'),
-            avg_ai_accuracy=Avg('ai_accuracy_rate')
+        return Response(compute_quiz_analytics(
+            queryset, self.analytics_granularities.get(granularity)
+        ))
+
+@api_view(['GET'])
+def bootstrap(request):
+    """Every dashboard panel in one response; ?panels= picks some of them"""
+    names = [name for name in request.query_params.get('panels', '').split(',') if name]
+    unknown = sorted(set(names) - set(PANELS))
+    if unknown:
+        return Response(
+            {'error': f"Unknown panels: {', '.join(unknown)}"},
+            status=status.HTTP_400_BAD_REQUEST
         )
-        
-        # Daily trends
-        daily_trends = list(queryset.values('date').annotate(
-            total_quizzes=Sum('total_quizzes'),
-            ai_generated=Sum('ai_generated_quizzes'),
-            avg_score=Avg('average_score'),
-            completion_rate=Avg('completion_rate')
-        ).order_by('date'))
-        
-        # School-wise performance
-        school_performance = list(queryset.values(
-            'school__name'
-        ).annotate(
-            total_quizzes=Sum('total_quizzes'),
-            ai_generated=Sum('ai_generated_quizzes'),
-            avg_score=Avg('average_score'),
-            completion_rate=Avg('completion_rate')
-        ).order_by('-total_quizzes')[:10])
-        
-        return Response({
-            'summary': total_stats,
-            'daily_trends': daily_trends,
-            'top_schools': school_performance
-        })
\ No newline at end of file
+    panels, errors = get_panels(names)
+    if errors:
+        panels['errors'] = errors
+    return Response(panels)
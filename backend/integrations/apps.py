@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class IntegrationsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "integrations"
+
+    def ready(self):
+        from super_admin_backend.refcache import integration_cache
+        integration_cache.connect()
@@ -0,0 +1,62 @@
+# Generated by Django 5.0 on 2026-10-17 18:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('integrations', '0001_initial'),
+        ('schools', '0005_list_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='dltregistration',
+            index=models.Index(fields=['school', '-created_at'], name='integration_school__b58b9a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dltregistration',
+            index=models.Index(fields=['status', '-created_at'], name='integration_status_086d37_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dltregistration',
+            index=models.Index(fields=['telecom_operator', '-created_at'], name='integration_telecom_a43f62_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dltregistration',
+            index=models.Index(fields=['-created_at'], name='integration_created_765c38_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='integration',
+            index=models.Index(fields=['type', 'name'], name='integration_type_52475f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='integration',
+            index=models.Index(fields=['status', 'name'], name='integration_status_1c5b5b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='integration',
+            index=models.Index(fields=['provider', 'name'], name='integration_provide_845895_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='integration',
+            index=models.Index(fields=['name'], name='integration_name_d6e30a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='schoolintegration',
+            index=models.Index(fields=['school', '-updated_at'], name='integration_school__273080_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='schoolintegration',
+            index=models.Index(fields=['integration', '-updated_at'], name='integration_integra_b2f0ab_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='schoolintegration',
+            index=models.Index(fields=['status', '-updated_at'], name='integration_status_99d6cd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='schoolintegration',
+            index=models.Index(fields=['-updated_at'], name='integration_updated_e93f66_idx'),
+        ),
+    ]
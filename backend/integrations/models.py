@@ -40,6 +40,15 @@ class Integration(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    class Meta:
+        indexes = [
+            # List endpoint filters and default ordering
+            models.Index(fields=['type', 'name']),
+            models.Index(fields=['status', 'name']),
+            models.Index(fields=['provider', 'name']),
+            models.Index(fields=['name']),
+        ]
+    
     def __str__(self):
         return f"{self.name} ({self.provider})"
 
@@ -74,6 +83,13 @@ class SchoolIntegration(models.Model):
     
     class Meta:
         unique_together = ['school', 'integration']
+        indexes = [
+            # List endpoint filters and default ordering
+            models.Index(fields=['school', '-updated_at']),
+            models.Index(fields=['integration', '-updated_at']),
+            models.Index(fields=['status', '-updated_at']),
+            models.Index(fields=['-updated_at']),
+        ]
     
     def __str__(self):
         return f"{self.school.name} - {self.integration.name}"
@@ -115,5 +131,14 @@ class DLTRegistration(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    class Meta:
+        indexes = [
+            # List endpoint filters and default ordering
+            models.Index(fields=['school', '-created_at']),
+            models.Index(fields=['status', '-created_at']),
+            models.Index(fields=['telecom_operator', '-created_at']),
+            models.Index(fields=['-created_at']),
+        ]
+    
     def __str__(self):
         return f"{self.school.name} - {self.entity_id}"
\ No newline at end of file
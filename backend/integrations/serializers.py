@@ -1,24 +1,29 @@
 from rest_framework import serializers
+from super_admin_backend.fieldsets import SparseFieldsetMixin
+from super_admin_backend.refcache import ReferenceField, integration_cache
+from schools.serializers import SchoolBriefSerializer
 from .models import Integration, SchoolIntegration, DLTRegistration
 
-class IntegrationSerializer(serializers.ModelSerializer):
+class IntegrationSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Integration
         fields = '__all__'
 
-class SchoolIntegrationSerializer(serializers.ModelSerializer):
-    integration_name = serializers.CharField(source='integration.name', read_only=True)
-    integration_type = serializers.CharField(source='integration.type', read_only=True)
+class SchoolIntegrationSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    integration_name = ReferenceField(integration_cache, 'name', source='integration_id')
+    integration_type = ReferenceField(integration_cache, 'type', source='integration_id')
     school_name = serializers.CharField(source='school.name', read_only=True)
     
     class Meta:
         model = SchoolIntegration
         fields = '__all__'
+        expandable_fields = {'school': SchoolBriefSerializer, 'integration': IntegrationSerializer}
 
-class DLTRegistrationSerializer(serializers.ModelSerializer):
+class DLTRegistrationSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     school_name = serializers.CharField(source='school.name', read_only=True)
     
     class Meta:
         model = DLTRegistration
         fields = '__all__'
-        read_only_fields = ('id', 'created_at', 'updated_at')
\ No newline at end of file
+        read_only_fields = ('id', 'created_at', 'updated_at')
+        expandable_fields = {'school': SchoolBriefSerializer}
\ No newline at end of file
@@ -6,10 +6,14 @@ from django.db.models import Count, Q
 from django.utils import timezone
 from .models import Integration, SchoolIntegration, DLTRegistration
 from .serializers import IntegrationSerializer, SchoolIntegrationSerializer, DLTRegistrationSerializer
+from super_admin_backend.exports import ExportViewSetMixin
+from super_admin_backend.fieldsets import SparseFieldsetViewSetMixin
+from super_admin_backend.refcache import ReferenceCacheViewSetMixin, integration_cache
 
-class IntegrationViewSet(viewsets.ModelViewSet):
+class IntegrationViewSet(ExportViewSetMixin, ReferenceCacheViewSetMixin, SparseFieldsetViewSetMixin, viewsets.ModelViewSet):
     queryset = Integration.objects.all()
     serializer_class = IntegrationSerializer
+    reference_cache = integration_cache
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['type', 'status', 'provider']
     ordering = ['name']
@@ -34,8 +38,8 @@ class IntegrationViewSet(viewsets.ModelViewSet):
         serializer = SchoolIntegrationSerializer(school_integrations, many=True)
         return Response(serializer.data)
 
-class SchoolIntegrationViewSet(viewsets.ModelViewSet):
-    queryset = SchoolIntegration.objects.select_related('school', 'integration')
+class SchoolIntegrationViewSet(ExportViewSetMixin, SparseFieldsetViewSetMixin, viewsets.ModelViewSet):
+    queryset = SchoolIntegration.objects.select_related('school')
     serializer_class = SchoolIntegrationSerializer
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['school', 'integration', 'status']
@@ -79,7 +83,7 @@ class SchoolIntegrationViewSet(viewsets.ModelViewSet):
             'popular_integrations': list(popular_integrations)
         })
 
-class DLTRegistrationViewSet(viewsets.ModelViewSet):
+class DLTRegistrationViewSet(ExportViewSetMixin, SparseFieldsetViewSetMixin, viewsets.ModelViewSet):
     queryset = DLTRegistration.objects.select_related('school')
     serializer_class = DLTRegistrationSerializer
     filter_backends = [DjangoFilterBackend]
@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class SchoolsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "schools"
+
+    def ready(self):
+        from . import signals
+        from super_admin_backend.refcache import tier_cache
+        tier_cache.connect()
+        post_migrate.connect(signals.setup_search_index, sender=self)
@@ -0,0 +1,90 @@
+"""
+Denormalized staff counters on School.
+
+``total_teachers`` and ``total_admins`` count the active staff of a school
+by role. They are kept in sync by the SchoolStaff signals with atomic
+``F()`` updates, and ``reconcile_school_counters`` repairs any drift left
+by writes that skip signals (``QuerySet.update()``, ``bulk_create()``,
+raw SQL).
+"""
+from collections import defaultdict
+
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from .models import School, SchoolStaff
+
+# Counter field -> roles it counts (active staff only)
+STAFF_COUNTERS = {
+    'total_teachers': ['teacher'],
+    'total_admins': ['super_admin', 'admin', 'principal', 'vice_principal'],
+}
+
+ROLE_COUNTERS = {
+    role: field for field, roles in STAFF_COUNTERS.items() for role in roles
+}
+
+def counter_field(state):
+    """Counter a (school_id, role, is_active) staff state contributes to"""
+    if state is None:
+        return None
+    school_id, role, is_active = state
+    if not is_active:
+        return None
+    return ROLE_COUNTERS.get(role)
+
+def apply_staff_change(old_state, new_state):
+    """Move a staff member's contribution from `old_state` to `new_state`"""
+    apply_staff_changes([(old_state, new_state)])
+
+def apply_staff_changes(changes):
+    """Apply many (old_state, new_state) moves with one UPDATE per school"""
+    deltas = defaultdict(lambda: defaultdict(int))
+    for old_state, new_state in changes:
+        old_field, new_field = counter_field(old_state), counter_field(new_state)
+        if old_field:
+            deltas[old_state[0]][old_field] -= 1
+        if new_field:
+            deltas[new_state[0]][new_field] += 1
+
+    for school_id, fields in deltas.items():
+        updates = {field: F(field) + delta for field, delta in fields.items() if delta}
+        if updates:
+            School.objects.filter(pk=school_id).update(**updates)
+
+def counted_staff(field):
+    """Subquery counting the staff of the outer school that `field` covers"""
+    counts = SchoolStaff.objects.filter(
+        school=OuterRef('pk'), is_active=True, role__in=STAFF_COUNTERS[field]
+    ).order_by().values('school').annotate(total=Count('pk')).values('total')
+    return Coalesce(Subquery(counts), 0)
+
+def reconcile_school_counters(school_ids, dry_run=False):
+    """
+    Recount the staff counters of `school_ids` and fix the ones that drifted.
+
+    Returns a list of (school_id, {field: (stored, actual)}) for the schools
+    that were out of sync. The fix is a single UPDATE with the recount as a
+    subquery, so increments made concurrently by the signals are not lost.
+    """
+    actual = {f'actual_{field}': counted_staff(field) for field in STAFF_COUNTERS}
+    drift = Q()
+    for field in STAFF_COUNTERS:
+        drift |= ~Q(**{field: F(f'actual_{field}')})
+
+    rows = School.objects.filter(pk__in=school_ids).annotate(**actual).filter(drift).values(
+        'pk', *STAFF_COUNTERS, *actual
+    )
+    drifted = []
+    for row in rows:
+        changes = {
+            field: (row[field], row[f'actual_{field}'])
+            for field in STAFF_COUNTERS
+            if row[field] != row[f'actual_{field}']
+        }
+        drifted.append((row['pk'], changes))
+
+    if drifted and not dry_run:
+        School.objects.filter(pk__in=[pk for pk, _ in drifted]).update(
+            **{field: counted_staff(field) for field in STAFF_COUNTERS}
+        )
+    return drifted
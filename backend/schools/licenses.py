@@ -0,0 +1,58 @@
+"""
+License expiry buckets.
+
+Each school carries a ``license_bucket`` (expired, 7d, 30d, 90d, later)
+derived from ``license_expiry``. Saves set it directly; time moving on is
+handled by ``refresh_license_buckets``, which the refresh_license_buckets
+management command runs on a schedule. Both ``license_expiry`` and
+``(license_bucket, license_expiry)`` are indexed, so bucket listings and
+arbitrary ``days`` windows are index range scans.
+"""
+from datetime import datetime
+
+from django.utils import timezone
+
+# Bucket -> upper bound in days from now; a school falls in the first
+# bucket whose bound its expiry does not exceed
+LICENSE_BUCKETS = [
+    ('expired', 0),
+    ('7d', 7),
+    ('30d', 30),
+    ('90d', 90),
+]
+LATER_BUCKET = 'later'
+
+def bucket_ranges(now=None):
+    """Yield (bucket, lower, upper) expiry ranges; lower is exclusive"""
+    now = now or timezone.now()
+    lower = None
+    for bucket, days in LICENSE_BUCKETS:
+        upper = now + timezone.timedelta(days=days)
+        yield bucket, lower, upper
+        lower = upper
+    yield LATER_BUCKET, lower, None
+
+def license_bucket_for(expiry, now=None):
+    if not isinstance(expiry, datetime):
+        return LATER_BUCKET
+    for bucket, lower, upper in bucket_ranges(now):
+        if upper is None or expiry <= upper:
+            return bucket
+    return LATER_BUCKET
+
+def refresh_license_buckets(queryset, now=None):
+    """
+    Move schools whose expiry has crossed a bucket boundary.
+
+    One UPDATE per bucket, each restricted to the bucket's expiry range so
+    it is driven by the license_expiry index. Returns {bucket: rows moved}.
+    """
+    moved = {}
+    for bucket, lower, upper in bucket_ranges(now):
+        rows = queryset.exclude(license_bucket=bucket)
+        if lower is not None:
+            rows = rows.filter(license_expiry__gt=lower)
+        if upper is not None:
+            rows = rows.filter(license_expiry__lte=upper)
+        moved[bucket] = rows.update(license_bucket=bucket)
+    return moved
@@ -0,0 +1,81 @@
+from functools import partial
+
+from django.db import transaction
+from django.utils import timezone
+from compliance.models import AuditLog
+from dashboard.live import is_live_audit_log, publish_activities, publish_audit_logs, publishes_on_write
+from dashboard.models import RecentActivity
+from .models import School
+from .stats import invalidate_school_statistics
+
+# action -> (new status, RecentActivity type, past tense, audit severity)
+STATUS_ACTIONS = {
+    'activate': ('active', 'school_activated', 'activated', 'medium'),
+    'suspend': ('suspended', 'school_suspended', 'suspended', 'high'),
+}
+
+def change_school_status(schools, action, request):
+    """
+    Move every school in the `schools` queryset to the status of `action`.
+
+    Runs one SELECT, one UPDATE and one bulk INSERT each for RecentActivity
+    and AuditLog, whatever the number of schools. Returns a dict of
+    school id -> outcome ('activated', 'suspended' or 'unchanged').
+    """
+    new_status, activity_type, verb, severity = STATUS_ACTIONS[action]
+    user = request.user if request.user.is_authenticated else None
+    now = timezone.now()
+
+    with transaction.atomic():
+        rows = list(schools.select_for_update().values_list('id', 'name', 'status'))
+        changed = [(pk, name, status) for pk, name, status in rows if status != new_status]
+
+        if changed:
+            School.objects.filter(pk__in=[pk for pk, _, _ in changed]).update(
+                status=new_status, updated_at=now
+            )
+            activities = RecentActivity.objects.bulk_create([
+                RecentActivity(
+                    activity_type=activity_type,
+                    title=f'School {verb}',
+                    description=f'{name} was {verb}',
+                    school_id=pk,
+                    user=user,
+                    metadata={'previous_status': status, 'bulk': len(changed) > 1}
+                )
+                for pk, name, status in changed
+            ])
+            audit_logs = AuditLog.objects.bulk_create([
+                AuditLog(
+                    school_id=pk,
+                    user=user,
+                    action='update',
+                    resource_type='School',
+                    resource_id=str(pk),
+                    description=f'School {name} {verb}',
+                    ip_address=request.META.get('REMOTE_ADDR') or '0.0.0.0',
+                    user_agent=request.META.get('HTTP_USER_AGENT', ''),
+                    endpoint=request.path,
+                    http_method=request.method,
+                    severity=severity,
+                    old_values={'status': status},
+                    new_values={'status': new_status}
+                )
+                for pk, name, status in changed
+            ])
+            # QuerySet.update() bypasses the post_save signal
+            transaction.on_commit(invalidate_school_statistics)
+            # bulk_create bypasses the signals feeding the live feed too
+            if publishes_on_write():
+                transaction.on_commit(
+                    partial(publish_activities, [activity.pk for activity in activities]), robust=True
+                )
+                live_logs = [log.pk for log in audit_logs if is_live_audit_log(log)]
+                if live_logs:
+                    transaction.on_commit(partial(publish_audit_logs, live_logs), robust=True)
+
+    changed_ids = {pk for pk, _, _ in changed}
+    return {
+        pk: verb if pk in changed_ids else 'unchanged'
+        for pk, _, _ in rows
+    }
@@ -0,0 +1,52 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from super_admin_backend.indexaudit import audit_list_views, problems, suggested_index
+
+class Command(BaseCommand):
+    help = 'EXPLAIN the filters and orderings of every list endpoint and suggest missing indexes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all-orderings', action='store_true',
+            help='Check every filter with every ordering, not just the default ordering'
+        )
+        parser.add_argument('--plans', action='store_true', help='Print the query plan of every problem')
+        parser.add_argument('--fail', action='store_true', help='Exit with an error when problems are found')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def describe(self, check):
+        query = f'filter={check.filter_field}' if check.filter_field else 'no filter'
+        return f"{check.view.__name__}: {query}, ordering={','.join(check.ordering) or '-'}"
+
+    def handle(self, *args, **options):
+        checks = audit_list_views(all_orderings=options['all_orderings'], using=options['database'])
+        found = problems(checks)
+
+        suggestions = defaultdict(list)
+        for check in found:
+            issues = []
+            if check.filter_field and check.full_scan:
+                issues.append('full scan')
+            if check.sorts:
+                issues.append('sort without index')
+            self.stdout.write(self.style.WARNING(f"{self.describe(check)}: {', '.join(issues)}"))
+            if options['plans']:
+                self.stdout.write(f'    {check.plan}'.replace('\n', '\n    '))
+            index = suggested_index(check)
+            if index not in suggestions[check.model]:
+                suggestions[check.model].append(index)
+
+        if suggestions:
+            self.stdout.write('\nSuggested indexes (add to Meta.indexes, then run makemigrations):')
+        for model, indexes in suggestions.items():
+            self.stdout.write(f'\n# {model._meta.label}')
+            for index in indexes:
+                self.stdout.write(f'{index},')
+
+        summary = f'Checked {len(checks)} queries, {len(found)} without index support'
+        if found and options['fail']:
+            raise CommandError(summary)
+        self.stdout.write(self.style.SUCCESS(summary) if not found else summary)
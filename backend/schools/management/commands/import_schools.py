@@ -0,0 +1,41 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from schools.onboarding import IMPORT_FORMATS, IMPORT_KINDS, BulkImporter, detect_format, read_records
+
+class Command(BaseCommand):
+    help = 'Bulk onboard schools or staff from a CSV or NDJSON file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or NDJSON file, "-" for stdin')
+        parser.add_argument('--format', choices=IMPORT_FORMATS, help='Defaults to the file extension')
+        parser.add_argument('--kind', choices=IMPORT_KINDS, default='schools')
+        parser.add_argument('--chunk-size', type=int, default=BulkImporter.chunk_size)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or detect_format(path, default=None)
+        if file_format is None:
+            raise CommandError('Cannot tell the format from the file name, pass --format')
+
+        importer = BulkImporter(kind=options['kind'], chunk_size=options['chunk_size'])
+        if path == '-':
+            report = importer.run(read_records(sys.stdin.buffer, file_format))
+        else:
+            try:
+                stream = open(path, 'rb')
+            except OSError as e:
+                raise CommandError(str(e))
+            with stream:
+                report = importer.run(read_records(stream, file_format))
+
+        for error in report.errors:
+            self.stderr.write(f"line {error['line']}: {json.dumps(error['errors'])}")
+        if report.failed > len(report.errors):
+            self.stderr.write(f'... and {report.failed - len(report.errors)} more errors')
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {report.schools_created} schools and {report.staff_created} staff '
+            f'from {report.rows} rows ({report.failed} failed)'
+        ))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from schools.search import SEARCH_INDEXES, get_search_backend
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index for schools and staff'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--model', choices=[model._meta.model_name for model in SEARCH_INDEXES],
+            help='Only rebuild the index of this model'
+        )
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        for model in SEARCH_INDEXES:
+            if options['model'] and model._meta.model_name != options['model']:
+                continue
+            if not backend.is_available(model, options['database']):
+                self.stdout.write(self.style.WARNING(
+                    f'Search index not available for {model._meta.label} on this database'
+                ))
+                continue
+            backend.rebuild(model, options['database'])
+            self.stdout.write(self.style.SUCCESS(f'Rebuilt search index for {model._meta.label}'))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from schools.rollups import rebuild_usage_rollups
+
+class Command(BaseCommand):
+    help = 'Recompute week/month/quarter usage rollups from the daily SchoolUsageStats rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='First day to rebuild (YYYY-MM-DD), widened to whole periods')
+        parser.add_argument('--end', help='Last day to rebuild (YYYY-MM-DD), widened to whole periods')
+
+    def parse(self, value, name):
+        if not value:
+            return None
+        try:
+            parsed = parse_date(value)
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            raise CommandError(f'--{name} must be a date (YYYY-MM-DD)')
+        return parsed
+
+    def handle(self, *args, **options):
+        start = self.parse(options['start'], 'start')
+        end = self.parse(options['end'], 'end')
+        rebuild_usage_rollups(start, end)
+        self.stdout.write(self.style.SUCCESS('Rebuilt usage rollups'))
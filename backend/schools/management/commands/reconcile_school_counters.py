@@ -0,0 +1,60 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from schools.counters import reconcile_school_counters
+from schools.models import School
+
+class Command(BaseCommand):
+    help = 'Recount School staff counters and repair the ones that drifted'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500, help='Schools per chunk')
+        parser.add_argument('--workers', type=int, default=4, help='Chunks reconciled in parallel')
+        parser.add_argument('--dry-run', action='store_true', help='Report drift without fixing it')
+
+    def chunks(self, chunk_size):
+        # Keyset walk over primary keys, one chunk per query
+        last_pk = None
+        while True:
+            queryset = School.objects.order_by('pk')
+            if last_pk is not None:
+                queryset = queryset.filter(pk__gt=last_pk)
+            pks = list(queryset.values_list('pk', flat=True)[:chunk_size])
+            if not pks:
+                return
+            yield pks
+            last_pk = pks[-1]
+
+    def reconcile_chunk(self, pks, dry_run):
+        try:
+            return len(pks), reconcile_school_counters(pks, dry_run=dry_run)
+        finally:
+            # Each worker thread opens its own connections
+            connections.close_all()
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        checked = 0
+        drifted = 0
+
+        with ThreadPoolExecutor(max_workers=max(1, options['workers'])) as executor:
+            futures = [
+                executor.submit(self.reconcile_chunk, pks, dry_run)
+                for pks in self.chunks(max(1, options['chunk_size']))
+            ]
+            for future in as_completed(futures):
+                count, results = future.result()
+                checked += count
+                drifted += len(results)
+                for pk, changes in results:
+                    summary = ', '.join(
+                        f'{field} {stored} -> {actual}' for field, (stored, actual) in changes.items()
+                    )
+                    self.stdout.write(f'{pk}: {summary}')
+
+        verb = 'would be fixed' if dry_run else 'fixed'
+        self.stdout.write(self.style.SUCCESS(
+            f'Checked {checked} schools, {drifted} {verb}'
+        ))
@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from schools.licenses import refresh_license_buckets
+from schools.models import School
+
+class Command(BaseCommand):
+    help = 'Move schools between license expiry buckets as time passes (run from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=int, default=0,
+            help='Keep running and refresh every INTERVAL seconds instead of once'
+        )
+
+    def refresh(self):
+        moved = refresh_license_buckets(School.objects.all())
+        summary = ', '.join(f'{bucket}: {count}' for bucket, count in moved.items())
+        self.stdout.write(self.style.SUCCESS(f'Refreshed license buckets ({summary})'))
+
+    def handle(self, *args, **options):
+        self.refresh()
+        while options['interval'] > 0:
+            time.sleep(options['interval'])
+            self.refresh()
@@ -0,0 +1,17 @@
+# Generated by Django 5.0 on 2026-10-17 18:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schools', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='schoolusagestats',
+            index=models.Index(fields=['date', 'id'], name='schools_sch_date_e54e18_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.0 on 2026-10-17 18:22
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_license_buckets(apps, schema_editor):
+    from schools.licenses import refresh_license_buckets
+    School = apps.get_model('schools', 'School')
+    refresh_license_buckets(School.objects.using(schema_editor.connection.alias))
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schools', '0002_keyset_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='school',
+            name='license_bucket',
+            field=models.CharField(choices=[('expired', 'Expired'), ('7d', 'Expires within 7 days'), ('30d', 'Expires within 30 days'), ('90d', 'Expires within 90 days'), ('later', 'Expires later')], default='later', max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='school',
+            name='license_expiry',
+            field=models.DateTimeField(db_index=True),
+        ),
+        migrations.AddIndex(
+            model_name='school',
+            index=models.Index(fields=['license_bucket', 'license_expiry'], name='schools_sch_license_db60a7_idx'),
+        ),
+        migrations.RunPython(fill_license_buckets, migrations.RunPython.noop),
+    ]
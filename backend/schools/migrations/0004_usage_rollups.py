@@ -0,0 +1,59 @@
+# Generated by Django 5.0 on 2026-10-17 18:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def fill_usage_rollups(apps, schema_editor):
+    from schools.rollups import rebuild_usage_rollups
+    rebuild_usage_rollups(apps=apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schools', '0003_license_buckets'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlatformUsageRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('grain', models.CharField(choices=[('week', 'Week'), ('month', 'Month'), ('quarter', 'Quarter')], max_length=10)),
+                ('period_start', models.DateField()),
+                ('day_count', models.IntegerField(default=0)),
+                ('active_students', models.BigIntegerField(default=0)),
+                ('active_teachers', models.BigIntegerField(default=0)),
+                ('login_count', models.BigIntegerField(default=0)),
+                ('quiz_attempts', models.BigIntegerField(default=0)),
+                ('assignments_submitted', models.BigIntegerField(default=0)),
+                ('classes_conducted', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'unique_together': {('grain', 'period_start')},
+            },
+        ),
+        migrations.CreateModel(
+            name='SchoolUsageRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('grain', models.CharField(choices=[('week', 'Week'), ('month', 'Month'), ('quarter', 'Quarter')], max_length=10)),
+                ('period_start', models.DateField()),
+                ('day_count', models.IntegerField(default=0)),
+                ('active_students', models.BigIntegerField(default=0)),
+                ('active_teachers', models.BigIntegerField(default=0)),
+                ('login_count', models.BigIntegerField(default=0)),
+                ('quiz_attempts', models.BigIntegerField(default=0)),
+                ('assignments_submitted', models.BigIntegerField(default=0)),
+                ('classes_conducted', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('school', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='usage_rollups', to='schools.school')),
+            ],
+            options={
+                'unique_together': {('school', 'grain', 'period_start')},
+            },
+        ),
+        migrations.RunPython(fill_usage_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.0 on 2026-10-17 18:31
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schools', '0004_usage_rollups'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='school',
+            index=models.Index(fields=['status', '-created_at'], name='schools_sch_status_c6db40_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='school',
+            index=models.Index(fields=['tier', '-created_at'], name='schools_sch_tier_id_18a9b7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='school',
+            index=models.Index(fields=['city', '-created_at'], name='schools_sch_city_fb7b08_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='school',
+            index=models.Index(fields=['state', '-created_at'], name='schools_sch_state_7b2dce_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='school',
+            index=models.Index(fields=['country', '-created_at'], name='schools_sch_country_a4c4b1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='school',
+            index=models.Index(fields=['-created_at'], name='schools_sch_created_5aaa27_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='schoolstaff',
+            index=models.Index(fields=['school', '-created_at'], name='schools_sch_school__01f687_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='schoolstaff',
+            index=models.Index(fields=['role', '-created_at'], name='schools_sch_role_f02664_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='schoolstaff',
+            index=models.Index(fields=['is_active', '-created_at'], name='schools_sch_is_acti_45c04d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='schoolstaff',
+            index=models.Index(fields=['-created_at'], name='schools_sch_created_21ea15_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='schooltier',
+            index=models.Index(fields=['price_per_month'], name='schools_sch_price_p_9a7641_idx'),
+        ),
+    ]
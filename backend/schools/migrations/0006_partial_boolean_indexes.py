@@ -0,0 +1,25 @@
+# Generated by Django 5.0 on 2026-10-17 19:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schools', '0005_list_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='schoolstaff',
+            name='schools_sch_is_acti_45c04d_idx',
+        ),
+        migrations.AddIndex(
+            model_name='schoolstaff',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-created_at'], name='schools_staff_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='schoolstaff',
+            index=models.Index(condition=models.Q(('is_active', False)), fields=['-created_at'], name='schools_staff_inactive_idx'),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import Q
 from django.contrib.auth.models import User
 import uuid
 
@@ -20,6 +21,12 @@ class SchoolTier(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    class Meta:
+        indexes = [
+            # List endpoint filters and default ordering
+            models.Index(fields=['price_per_month']),
+        ]
+    
     def __str__(self):
         return self.get_name_display()
 
@@ -31,6 +38,14 @@ class School(models.Model):
         ('trial', 'Trial'),
     ]
     
+    LICENSE_BUCKET_CHOICES = [
+        ('expired', 'Expired'),
+        ('7d', 'Expires within 7 days'),
+        ('30d', 'Expires within 30 days'),
+        ('90d', 'Expires within 90 days'),
+        ('later', 'Expires later'),
+    ]
+    
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     name = models.CharField(max_length=200)
     code = models.CharField(max_length=20, unique=True)
@@ -47,7 +62,9 @@ class School(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='trial')
     subscription_start = models.DateTimeField()
     subscription_end = models.DateTimeField()
-    license_expiry = models.DateTimeField()
+    license_expiry = models.DateTimeField(db_index=True)
+    # Refreshed by the refresh_license_buckets command
+    license_bucket = models.CharField(max_length=10, choices=LICENSE_BUCKET_CHOICES, default='later')
     
     # Usage tracking
     total_students = models.IntegerField(default=0)
@@ -64,6 +81,19 @@ class School(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
     
+    class Meta:
+        indexes = [
+            # Bucket listings ordered by expiry
+            models.Index(fields=['license_bucket', 'license_expiry']),
+            # List endpoint filters and default ordering
+            models.Index(fields=['status', '-created_at']),
+            models.Index(fields=['tier', '-created_at']),
+            models.Index(fields=['city', '-created_at']),
+            models.Index(fields=['state', '-created_at']),
+            models.Index(fields=['country', '-created_at']),
+            models.Index(fields=['-created_at']),
+        ]
+    
     def __str__(self):
         return f"{self.name} ({self.code})"
     
@@ -94,6 +124,19 @@ class SchoolStaff(models.Model):
     
     class Meta:
         unique_together = ['school', 'email']
+        indexes = [
+            # List endpoint filters and default ordering
+            models.Index(fields=['school', '-created_at']),
+            models.Index(fields=['role', '-created_at']),
+            # Boolean filters compile to a bare WHERE col: one partial index per value
+            models.Index(
+                fields=['-created_at'], condition=Q(is_active=True), name='schools_staff_active_idx'
+            ),
+            models.Index(
+                fields=['-created_at'], condition=Q(is_active=False), name='schools_staff_inactive_idx'
+            ),
+            models.Index(fields=['-created_at']),
+        ]
     
     def __str__(self):
         return f"{self.name} - {self.school.name}"
@@ -118,6 +161,52 @@ class SchoolUsageStats(models.Model):
     class Meta:
         unique_together = ['school', 'date']
         ordering = ['-date']
+        indexes = [
+            # Keyset pagination on (date, id)
+            models.Index(fields=['date', 'id']),
+        ]
+    
+    def __str__(self):
+        return f"{self.school.name} - {self.date}"
+
+class UsageRollup(models.Model):
+    """Summed SchoolUsageStats over a week, month or quarter"""
+    GRAIN_CHOICES = [
+        ('week', 'Week'),
+        ('month', 'Month'),
+        ('quarter', 'Quarter'),
+    ]
+    
+    grain = models.CharField(max_length=10, choices=GRAIN_CHOICES)
+    period_start = models.DateField()
+    
+    # Number of daily rows summed, for averages
+    day_count = models.IntegerField(default=0)
+    
+    active_students = models.BigIntegerField(default=0)
+    active_teachers = models.BigIntegerField(default=0)
+    login_count = models.BigIntegerField(default=0)
+    quiz_attempts = models.BigIntegerField(default=0)
+    assignments_submitted = models.BigIntegerField(default=0)
+    classes_conducted = models.BigIntegerField(default=0)
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        abstract = True
+
+class SchoolUsageRollup(UsageRollup):
+    school = models.ForeignKey(School, on_delete=models.CASCADE, related_name='usage_rollups')
+    
+    class Meta:
+        unique_together = ['school', 'grain', 'period_start']
+    
+    def __str__(self):
+        return f"{self.school.name} - {self.grain} {self.period_start}"
+
+class PlatformUsageRollup(UsageRollup):
+    class Meta:
+        unique_together = ['grain', 'period_start']
     
     def __str__(self):
-        return f"{self.school.name} - {self.date}"
\ No newline at end of file
+        return f"Platform - {self.grain} {self.period_start}"
\ No newline at end of file
@@ -0,0 +1,281 @@
+"""
+Bulk onboarding of schools and staff from CSV or NDJSON.
+
+Records are read lazily from the upload, validated with the import
+serializers and written in chunks: one transaction and a couple of
+``bulk_create`` calls per chunk, so memory stays at one chunk whatever the
+file size. Two kinds of file are accepted:
+
+``schools``
+    One school per record, using the SchoolCreateSerializer fields.
+    ``tier`` is a tier id or name. NDJSON records may carry their staff
+    in a nested ``staff_data`` list.
+``staff``
+    One staff member per record, with ``school_code`` naming the school.
+
+``bulk_create`` skips model signals, so the importer sets what the signals
+would: license buckets, staff counters, search documents and the
+statistics cache.
+"""
+import codecs
+import csv
+import json
+from itertools import islice
+
+from django.db import IntegrityError, transaction
+from .counters import apply_staff_changes, counter_field
+from .licenses import license_bucket_for
+from super_admin_backend.refcache import tier_cache
+from .models import School, SchoolStaff
+from .search import get_search_backend
+from .serializers import SchoolImportSerializer, SchoolStaffImportSerializer
+from .stats import invalidate_school_statistics
+
+IMPORT_FORMATS = ('csv', 'ndjson')
+IMPORT_KINDS = ('schools', 'staff')
+
+# CSV cells holding JSON
+JSON_COLUMNS = ('enabled_modules', 'custom_settings')
+
+def detect_format(filename, default='ndjson'):
+    name = (filename or '').lower()
+    if name.endswith('.csv'):
+        return 'csv'
+    if name.endswith(('.ndjson', '.jsonl')):
+        return 'ndjson'
+    return default
+
+def read_records(stream, file_format):
+    """
+    Yield (line, record, error) for each record of a binary stream, without
+    reading the whole stream. `error` is set instead of `record` for lines
+    that cannot be parsed.
+    """
+    lines = codecs.iterdecode(stream, 'utf-8-sig')
+    if file_format == 'csv':
+        reader = csv.DictReader(lines)
+        for row in reader:
+            record, errors = {}, {}
+            for column, value in row.items():
+                # Empty cells fall back to the model defaults
+                if column is None or value in (None, ''):
+                    continue
+                if column in JSON_COLUMNS:
+                    try:
+                        value = json.loads(value)
+                    except ValueError:
+                        errors[column] = ['Invalid JSON.']
+                        continue
+                record[column] = value
+            yield reader.line_num, (None if errors else record), (errors or None)
+        return
+
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield number, None, {'non_field_errors': [f'Invalid JSON: {e}']}
+            continue
+        if not isinstance(record, dict):
+            yield number, None, {'non_field_errors': ['Expected a JSON object.']}
+            continue
+        yield number, record, None
+
+class ImportReport:
+    """Running totals and the first `max_errors` row errors of an import"""
+    max_errors = 1000
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.rows = 0
+        self.schools_created = 0
+        self.staff_created = 0
+        self.failed = 0
+        self.errors = []
+
+    def error(self, line, errors):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({'line': line, 'errors': errors})
+
+    def as_dict(self):
+        return {
+            'kind': self.kind,
+            'rows': self.rows,
+            'schools_created': self.schools_created,
+            'staff_created': self.staff_created,
+            'failed': self.failed,
+            'errors': self.errors,
+            'errors_truncated': self.failed > len(self.errors)
+        }
+
+class BulkImporter:
+    chunk_size = 500
+
+    def __init__(self, kind='schools', user=None, chunk_size=None):
+        self.kind = kind
+        self.user = user if user is not None and user.is_authenticated else None
+        self.chunk_size = chunk_size or self.chunk_size
+        self.context = {'tiers': self.load_tiers()}
+        self.search_backend = get_search_backend()
+
+    def load_tiers(self):
+        tiers = {}
+        for tier in tier_cache.all():
+            tiers[str(tier.pk)] = tier
+            tiers[tier.name] = tier
+        return tiers
+
+    def run(self, records):
+        """Import an iterable of (line, record, error) and return the report"""
+        report = ImportReport(self.kind)
+        records = iter(records)
+        process = self.import_schools if self.kind == 'schools' else self.import_staff
+        while True:
+            chunk = list(islice(records, self.chunk_size))
+            if not chunk:
+                break
+            report.rows += len(chunk)
+            valid = []
+            for line, record, errors in chunk:
+                if errors:
+                    report.error(line, errors)
+                else:
+                    valid.append((line, record))
+            if valid:
+                process(valid, report)
+        if report.schools_created:
+            invalidate_school_statistics()
+        return report
+
+    def validate(self, serializer_class, line, record, report):
+        serializer = serializer_class(data=record, context=self.context)
+        if serializer.is_valid():
+            return serializer.validated_data
+        report.error(line, serializer.errors)
+        return None
+
+    def duplicate_emails(self, staff_data):
+        seen, duplicates = set(), set()
+        for staff in staff_data:
+            email = staff['email'].lower()
+            (duplicates if email in seen else seen).add(email)
+        return duplicates
+
+    def import_schools(self, chunk, report):
+        rows = []
+        codes = set()
+        for line, record in chunk:
+            data = self.validate(SchoolImportSerializer, line, record, report)
+            if data is None:
+                continue
+            if data['code'] in codes:
+                report.error(line, {'code': ['Duplicate code in this import.']})
+                continue
+            duplicates = self.duplicate_emails(data.get('staff_data', []))
+            if duplicates:
+                report.error(line, {'staff_data': [f'Duplicate staff email: {email}' for email in sorted(duplicates)]})
+                continue
+            codes.add(data['code'])
+            rows.append((line, data))
+
+        existing = set(School.objects.filter(code__in=codes).values_list('code', flat=True))
+        entries = []
+        for line, data in rows:
+            if data['code'] in existing:
+                report.error(line, {'code': ['school with this code already exists.']})
+                continue
+            entries.append((line, *self.build_school(data)))
+        if not entries:
+            return
+
+        try:
+            with transaction.atomic():
+                self.save_schools(entries, report)
+        except IntegrityError:
+            # A concurrent writer took a code; retry row by row so only
+            # the conflicting rows fail
+            for entry in entries:
+                try:
+                    with transaction.atomic():
+                        self.save_schools([entry], report)
+                except IntegrityError as e:
+                    report.error(entry[0], {'non_field_errors': [str(e)]})
+
+    def build_school(self, data):
+        staff_data = data.pop('staff_data', [])
+        school = School(created_by=self.user, **data)
+        school.license_bucket = license_bucket_for(school.license_expiry)
+        staff = [SchoolStaff(school=school, **item) for item in staff_data]
+        # Counters that the SchoolStaff signals would otherwise maintain
+        for member in staff:
+            field = counter_field((school.pk, member.role, member.is_active))
+            if field:
+                setattr(school, field, getattr(school, field) + 1)
+        return school, staff
+
+    def save_schools(self, entries, report):
+        schools = [school for _, school, _ in entries]
+        staff = [member for _, _, members in entries for member in members]
+        School.objects.bulk_create(schools)
+        SchoolStaff.objects.bulk_create(staff)
+        for instance in schools + staff:
+            self.search_backend.update(instance)
+        report.schools_created += len(schools)
+        report.staff_created += len(staff)
+
+    def import_staff(self, chunk, report):
+        rows = []
+        for line, record in chunk:
+            code = record.pop('school_code', None)
+            data = self.validate(SchoolStaffImportSerializer, line, record, report)
+            if data is None:
+                continue
+            if not code:
+                report.error(line, {'school_code': ['This field is required.']})
+                continue
+            rows.append((line, str(code), data))
+
+        schools = dict(School.objects.filter(
+            code__in={code for _, code, _ in rows}
+        ).values_list('code', 'pk'))
+        existing = set(SchoolStaff.objects.filter(
+            school_id__in=schools.values(),
+            email__in={data['email'] for _, _, data in rows}
+        ).values_list('school_id', 'email'))
+
+        staff = []
+        for line, code, data in rows:
+            school_id = schools.get(code)
+            if school_id is None:
+                report.error(line, {'school_code': [f'No school with code "{code}".']})
+                continue
+            if (school_id, data['email']) in existing:
+                report.error(line, {'email': ['Staff with this email already exists for this school.']})
+                continue
+            existing.add((school_id, data['email']))
+            staff.append((line, SchoolStaff(school_id=school_id, **data)))
+        if not staff:
+            return
+
+        try:
+            with transaction.atomic():
+                self.save_staff([member for _, member in staff], report)
+        except IntegrityError:
+            for line, member in staff:
+                try:
+                    with transaction.atomic():
+                        self.save_staff([member], report)
+                except IntegrityError as e:
+                    report.error(line, {'non_field_errors': [str(e)]})
+
+    def save_staff(self, staff, report):
+        SchoolStaff.objects.bulk_create(staff)
+        apply_staff_changes([
+            (None, (member.school_id, member.role, member.is_active)) for member in staff
+        ])
+        for member in staff:
+            self.search_backend.update(member)
+        report.staff_created += len(staff)
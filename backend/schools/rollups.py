@@ -0,0 +1,196 @@
+"""
+Week, month and quarter rollups of SchoolUsageStats.
+
+Every daily row is summed into one rollup per grain, both for its school
+(SchoolUsageRollup) and platform-wide (PlatformUsageRollup). The
+SchoolUsageStats signals apply each create, update and delete as a delta
+with ``F()`` updates; ``rebuild_usage_rollups`` recomputes them from the
+daily rows after bulk loads.
+
+``summarize_usage`` answers a date range from the coarsest rollups that
+fit inside it and reads daily rows only for the uneven edges.
+"""
+from datetime import timedelta
+
+from dateutil.relativedelta import relativedelta
+from django.apps import apps as global_apps
+from django.db import router, transaction
+from django.db.models import F, Q, Sum, Count, Min, Max
+from django.db.models.functions import TruncWeek, TruncMonth, TruncQuarter
+
+USAGE_METRICS = [
+    'active_students', 'active_teachers', 'login_count',
+    'quiz_attempts', 'assignments_submitted', 'classes_conducted',
+]
+
+# Coarsest first
+GRAINS = ['quarter', 'month', 'week']
+
+GRAIN_TRUNCATES = {
+    'week': TruncWeek,
+    'month': TruncMonth,
+    'quarter': TruncQuarter,
+}
+
+def period_start(grain, day):
+    if grain == 'week':
+        return day - timedelta(days=day.weekday())
+    if grain == 'month':
+        return day.replace(day=1)
+    return day.replace(month=(day.month - 1) // 3 * 3 + 1, day=1)
+
+def period_end(grain, start):
+    length = {
+        'week': relativedelta(weeks=1),
+        'month': relativedelta(months=1),
+        'quarter': relativedelta(months=3),
+    }[grain]
+    return start + length - timedelta(days=1)
+
+def rollup_models(apps=global_apps):
+    return (
+        apps.get_model('schools', 'SchoolUsageRollup'),
+        apps.get_model('schools', 'PlatformUsageRollup'),
+    )
+
+def apply_usage_delta(school_id, day, metrics, days):
+    """
+    Add `metrics` (field -> delta) and `days` daily rows to the week, month
+    and quarter containing `day`, for the school and platform-wide.
+    """
+    changes = {field: F(field) + value for field, value in metrics.items() if value}
+    if days:
+        changes['day_count'] = F('day_count') + days
+    if not changes:
+        return
+
+    periods = [(grain, period_start(grain, day)) for grain in GRAINS]
+    match = Q()
+    for grain, start in periods:
+        match |= Q(grain=grain, period_start=start)
+
+    school_model, platform_model = rollup_models()
+    for model, scope in ((school_model, {'school_id': school_id}), (platform_model, {})):
+        # Only a new day can open a period; removals and edits only touch
+        # rollups that already exist (and must not recreate the rollups of
+        # a school that is being deleted)
+        if days > 0:
+            model.objects.bulk_create(
+                [model(grain=grain, period_start=start, **scope) for grain, start in periods],
+                ignore_conflicts=True
+            )
+        model.objects.filter(match, **scope).update(**changes)
+
+def rebuild_usage_rollups(start=None, end=None, apps=global_apps):
+    """
+    Recompute the rollups of every period touching [start, end] (all
+    periods when no bounds are given) from the daily rows.
+    """
+    stats_model = apps.get_model('schools', 'SchoolUsageStats')
+    school_model, platform_model = rollup_models(apps)
+    totals = {field: Sum(field) for field in USAGE_METRICS}
+
+    for grain, truncate in GRAIN_TRUNCATES.items():
+        # Widen the bounds to whole periods of this grain
+        daily = stats_model.objects.all()
+        rollups = Q(grain=grain)
+        if start:
+            lower = period_start(grain, start)
+            daily = daily.filter(date__gte=lower)
+            rollups &= Q(period_start__gte=lower)
+        if end:
+            upper = period_end(grain, period_start(grain, end))
+            daily = daily.filter(date__lte=upper)
+            rollups &= Q(period_start__lte=upper)
+
+        daily = daily.annotate(period=truncate('date')).order_by()
+        # Readers never see a grain half deleted or half rebuilt
+        with transaction.atomic(using=router.db_for_write(school_model)):
+            for model, group in ((school_model, ['school_id', 'period']), (platform_model, ['period'])):
+                rows = daily.values(*group).annotate(day_count=Count('id'), **totals)
+                model.objects.filter(rollups).delete()
+                model.objects.bulk_create([
+                    model(
+                        grain=grain,
+                        period_start=row.pop('period'),
+                        **row
+                    )
+                    for row in rows
+                ], batch_size=500)
+
+def plan_usage_periods(start, end):
+    """
+    Cover [start, end] with whole rollup periods, coarsest first, and
+    daily ranges for what is left. Returns (periods, day_ranges) where
+    periods is a list of (grain, period_start) and day_ranges a list of
+    inclusive (first, last) dates.
+    """
+    periods, day_ranges = [], []
+    cursor = start
+    while cursor <= end:
+        for grain in GRAINS:
+            if period_start(grain, cursor) != cursor or period_end(grain, cursor) > end:
+                continue
+            if grain == 'week':
+                # Weeks straddle months; don't let one swallow the start of
+                # a month that could be read as a whole
+                next_month = period_start('month', cursor) + relativedelta(months=1)
+                if period_end('week', cursor) >= next_month and period_end('month', next_month) <= end:
+                    continue
+            periods.append((grain, cursor))
+            cursor = period_end(grain, cursor) + timedelta(days=1)
+            break
+        else:
+            if day_ranges and day_ranges[-1][1] == cursor - timedelta(days=1):
+                day_ranges[-1] = (day_ranges[-1][0], cursor)
+            else:
+                day_ranges.append((cursor, cursor))
+            cursor += timedelta(days=1)
+    return periods, day_ranges
+
+def summarize_usage(start=None, end=None, school_id=None):
+    """
+    Usage totals and daily averages for [start, end] (inclusive), for one
+    school or platform-wide. At most two aggregate queries, plus one on the
+    rollups when a bound is missing.
+    """
+    stats_model = global_apps.get_model('schools', 'SchoolUsageStats')
+    school_model, platform_model = rollup_models()
+    daily = stats_model.objects.all()
+    rollups = platform_model.objects.all()
+    if school_id is not None:
+        daily = daily.filter(school_id=school_id)
+        rollups = school_model.objects.filter(school_id=school_id)
+
+    if start is None or end is None:
+        # Open ends extend to the first/last quarter on record
+        bounds = rollups.filter(grain='quarter', day_count__gt=0).aggregate(
+            first=Min('period_start'), last=Max('period_start')
+        )
+        start = start or bounds['first']
+        end = end or (bounds['last'] and period_end('quarter', bounds['last']))
+
+    totals = {field: 0 for field in USAGE_METRICS}
+    rows = 0
+    if start is not None and end is not None and start <= end:
+        periods, day_ranges = plan_usage_periods(start, end)
+        sums = {field: Sum(field) for field in USAGE_METRICS}
+        parts = []
+        if periods:
+            match = Q()
+            for grain, period in periods:
+                match |= Q(grain=grain, period_start=period)
+            parts.append(rollups.filter(match).aggregate(rows=Sum('day_count'), **sums))
+        if day_ranges:
+            match = Q()
+            for first, last in day_ranges:
+                match |= Q(date__range=(first, last))
+            parts.append(daily.filter(match).aggregate(rows=Count('id'), **sums))
+        for part in parts:
+            rows += part.pop('rows') or 0
+            for field, value in part.items():
+                totals[field] += value or 0
+
+    if not rows:
+        return {field: None for field in USAGE_METRICS}, 0
+    return totals, rows
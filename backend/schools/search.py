@@ -0,0 +1,261 @@
+"""
+Full-text search for schools and staff.
+
+The default backend keeps an SQLite FTS5 index next to each searchable
+table. The index uses external content (the model table itself) and is
+kept in sync by triggers, so saves, deletes and bulk writes are all
+reflected without extra queries from Django. ``?search=`` joins the
+index into the filtered queryset, so the other filters, the count and
+pagination see every match. Other backends can be plugged in with the
+``SEARCH_BACKEND`` setting; they receive ``update`` and ``remove`` calls
+from the model signals instead, and their ``search()`` results (at most
+``SEARCH_MAX_RESULTS`` primary keys) restrict the queryset.
+"""
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connections
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+from rest_framework import filters
+from .models import School, SchoolStaff
+
+# Indexed columns and their bm25 weights, per model
+SEARCH_INDEXES = {
+    School: {'name': 10.0, 'code': 8.0, 'email': 2.0, 'city': 1.0},
+    SchoolStaff: {'name': 10.0, 'email': 4.0, 'phone': 2.0},
+}
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+def tokenize(query):
+    return [token.lower() for token in TOKEN_RE.findall(query or '')]
+
+def edit_distance(a, b, limit):
+    """Optimal string alignment distance, giving up once it exceeds `limit`"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2, previous = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+class SearchBackend:
+    """Interface for pluggable search backends"""
+
+    def is_available(self, model, using='default'):
+        return model in SEARCH_INDEXES
+
+    def setup(self, using='default'):
+        """Create whatever storage the backend needs (idempotent)"""
+
+    def rebuild(self, model, using='default'):
+        """Re-index every row of `model`"""
+
+    def update(self, instance):
+        """Index a saved instance"""
+
+    def remove(self, instance):
+        """Drop a deleted instance from the index"""
+
+    def search(self, model, query, limit, using='default'):
+        """Return primary keys of matching rows, best match first"""
+        raise NotImplementedError
+
+    def filter_queryset(self, queryset, query, ranked=True):
+        """
+        Restrict `queryset` to the rows matching `query`, best match first
+        when `ranked`. Goes through search(), so only its first
+        SEARCH_MAX_RESULTS matches are found.
+        """
+        limit = getattr(settings, 'SEARCH_MAX_RESULTS', 500)
+        pks = self.search(queryset.model, query, limit, using=queryset.db)
+        if not pks:
+            return queryset.none()
+        queryset = queryset.filter(pk__in=pks)
+        if not ranked:
+            return queryset
+        # Raw CASE keeps the rank order without compiling hundreds of
+        # When() expressions; pks are the raw column values from the index
+        column = f'"{queryset.model._meta.db_table}"."{queryset.model._meta.pk.column}"'
+        whens = ' '.join(['WHEN %s THEN %s'] * len(pks))
+        params = [value for position, pk in enumerate(pks) for value in (pk, position)]
+        return queryset.order_by(RawSQL(f'CASE {column} {whens} END', params))
+
+class SQLiteFTS5Backend(SearchBackend):
+    """FTS5 index with prefix matching, typo tolerance and bm25 ranking"""
+    prefix_lengths = '2 3 4'
+    fuzzy_min_length = 4
+    fuzzy_candidates = 5
+
+    def is_available(self, model, using='default'):
+        return model in SEARCH_INDEXES and connections[using].vendor == 'sqlite'
+
+    def table_names(self, model):
+        table = model._meta.db_table
+        return table, f'{table}_fts', f'{table}_fts_vocab'
+
+    def setup(self, using='default'):
+        connection = connections[using]
+        if connection.vendor != 'sqlite':
+            return
+        with connection.cursor() as cursor:
+            for model, weights in SEARCH_INDEXES.items():
+                table, fts, vocab = self.table_names(model)
+                columns = list(weights)
+                column_list = ', '.join(columns)
+                new_values = ', '.join(f'new.{column}' for column in columns)
+                old_values = ', '.join(f'old.{column}' for column in columns)
+
+                cursor.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = %s",
+                    [f'{fts}_ai']
+                )
+                needs_rebuild = cursor.fetchone() is None
+
+                cursor.execute(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+                    f"{column_list}, content='{table}', content_rowid='rowid', "
+                    f"prefix='{self.prefix_lengths}')"
+                )
+                cursor.execute(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {vocab} USING fts5vocab({fts}, 'row')"
+                )
+                # Column-weighted bm25 as the table's built-in rank, so
+                # ORDER BY rank LIMIT n is resolved inside FTS5
+                weight_list = ', '.join(str(weight) for weight in weights.values())
+                cursor.execute(
+                    f"INSERT INTO {fts}({fts}, rank) VALUES ('rank', %s)",
+                    [f'bm25({weight_list})']
+                )
+                cursor.execute(
+                    f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+                    f"INSERT INTO {fts}(rowid, {column_list}) VALUES (new.rowid, {new_values}); END"
+                )
+                cursor.execute(
+                    f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+                    f"INSERT INTO {fts}({fts}, rowid, {column_list}) "
+                    f"VALUES ('delete', old.rowid, {old_values}); END"
+                )
+                cursor.execute(
+                    f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {column_list} ON {table} BEGIN "
+                    f"INSERT INTO {fts}({fts}, rowid, {column_list}) "
+                    f"VALUES ('delete', old.rowid, {old_values}); "
+                    f"INSERT INTO {fts}(rowid, {column_list}) VALUES (new.rowid, {new_values}); END"
+                )
+
+                # Table rebuilds during migrations drop the triggers and
+                # renumber rowids, so re-index whenever they were missing
+                if needs_rebuild:
+                    cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+    def rebuild(self, model, using='default'):
+        self.setup(using)
+        _, fts, _ = self.table_names(model)
+        with connections[using].cursor() as cursor:
+            cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+            cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('optimize')")
+
+    def expand_token(self, cursor, vocab, token):
+        """Prefix match for `token`, or close vocabulary terms if it has none"""
+        prefix = f'"{token}"*'
+        if len(token) < self.fuzzy_min_length:
+            return prefix
+
+        cursor.execute(
+            f"SELECT 1 FROM {vocab} WHERE term >= %s AND term < %s LIMIT 1",
+            [token, token + '\U0010ffff']
+        )
+        if cursor.fetchone():
+            return prefix
+
+        # Typo tolerance: vocabulary terms within 1 edit (2 for longer
+        # words), most common first. Candidates sharing the first two
+        # letters are tried before widening to the first letter only.
+        limit = 1 if len(token) < 8 else 2
+        candidates = []
+        for lead in (token[:2], token[:1]):
+            cursor.execute(
+                f"SELECT term, doc FROM {vocab} WHERE term >= %s AND term < %s",
+                [lead, lead + '\U0010ffff']
+            )
+            candidates = sorted(
+                (
+                    (doc, term) for term, doc in cursor.fetchall()
+                    if edit_distance(token, term, limit) <= limit
+                ),
+                reverse=True
+            )[:self.fuzzy_candidates]
+            if candidates:
+                break
+        if not candidates:
+            return prefix
+        return '(' + ' OR '.join(f'"{term}"' for _, term in candidates) + ')'
+
+    def match_expression(self, model, tokens, using='default'):
+        _, _, vocab = self.table_names(model)
+        with connections[using].cursor() as cursor:
+            return ' AND '.join(self.expand_token(cursor, vocab, token) for token in tokens)
+
+    def search(self, model, query, limit, using='default'):
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        table, fts, _ = self.table_names(model)
+        pk_column = model._meta.pk.column
+
+        match = self.match_expression(model, tokens, using)
+        with connections[using].cursor() as cursor:
+            cursor.execute(
+                f"SELECT t.{pk_column} FROM ("
+                f"SELECT rowid, rank FROM {fts} WHERE {fts} MATCH %s ORDER BY rank LIMIT %s"
+                f") f JOIN {table} t ON t.rowid = f.rowid ORDER BY f.rank",
+                [match, limit]
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def filter_queryset(self, queryset, query, ranked=True):
+        """Join the index on rowid, so every filter applies to every match"""
+        tokens = tokenize(query)
+        if not tokens:
+            return queryset.none()
+        table, fts, _ = self.table_names(queryset.model)
+        queryset = queryset.extra(
+            tables=[fts],
+            where=[f'{fts}.rowid = {table}.rowid', f'{fts} MATCH %s'],
+            params=[self.match_expression(queryset.model, tokens, queryset.db)]
+        )
+        if not ranked:
+            return queryset
+        return queryset.extra(select={'search_rank': f'{fts}.rank'}).order_by('search_rank')
+
+@lru_cache(maxsize=None)
+def get_search_backend():
+    backend = getattr(settings, 'SEARCH_BACKEND', 'schools.search.SQLiteFTS5Backend')
+    return import_string(backend)()
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """
+    SearchFilter that answers ?search= from the search index, ranked by
+    relevance unless an explicit ?ordering= is given. Falls back to the
+    regular icontains search when no index is available for the model.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '')
+        backend = get_search_backend()
+        if not query.strip() or not backend.is_available(queryset.model, queryset.db):
+            return super().filter_queryset(request, queryset, view)
+
+        return backend.filter_queryset(
+            queryset, query, ranked=not request.query_params.get('ordering')
+        )
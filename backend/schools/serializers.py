@@ -1,33 +1,77 @@
 from rest_framework import serializers
+from super_admin_backend.fieldsets import SparseFieldsetMixin
+from super_admin_backend.refcache import ReferenceField, tier_cache
+from users.serializers import UserSerializer
 from .models import School, SchoolTier, SchoolStaff, SchoolUsageStats
 
-class SchoolTierSerializer(serializers.ModelSerializer):
+class SchoolTierSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = SchoolTier
         fields = '__all__'
 
-class SchoolStaffSerializer(serializers.ModelSerializer):
+class SchoolBriefSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """Compact school representation used for ?expand=school"""
+    class Meta:
+        model = School
+        fields = ['id', 'name', 'code', 'status', 'city', 'state', 'country']
+
+class SchoolStaffSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = SchoolStaff
         fields = '__all__'
+        expandable_fields = {'school': SchoolBriefSerializer}
 
-class SchoolUsageStatsSerializer(serializers.ModelSerializer):
+class SchoolUsageStatsSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = SchoolUsageStats
         fields = '__all__'
+        expandable_fields = {'school': SchoolBriefSerializer}
 
-class SchoolSerializer(serializers.ModelSerializer):
-    tier_name = serializers.CharField(source='tier.name', read_only=True)
-    staff = SchoolStaffSerializer(many=True, read_only=True)
-    usage_stats = SchoolUsageStatsSerializer(many=True, read_only=True)
+class SchoolSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    tier_name = ReferenceField(tier_cache, 'name', source='tier_id')
+    staff = serializers.SerializerMethodField()
+    usage_stats = serializers.SerializerMethodField()
+    staff_total = serializers.SerializerMethodField()
     is_license_expired = serializers.BooleanField(read_only=True)
     
     class Meta:
         model = School
         fields = '__all__'
         read_only_fields = ('id', 'created_at', 'updated_at')
+        expandable_fields = {'tier': SchoolTierSerializer, 'created_by': UserSerializer}
+        field_dependencies = {
+            'staff': [],
+            'usage_stats': [],
+            'staff_total': [],
+            'is_license_expired': ['license_expiry'],
+        }
+    
+    def get_staff(self, obj):
+        # Use the bounded prefetch from SchoolViewSet when available
+        staff = getattr(obj, 'windowed_staff', None)
+        if staff is None:
+            staff = obj.staff.all()
+        return SchoolStaffSerializer(
+            staff, many=True, context=self.context,
+            **self.get_nested_sparse_kwargs('staff')
+        ).data
+    
+    def get_usage_stats(self, obj):
+        usage_stats = getattr(obj, 'windowed_usage_stats', None)
+        if usage_stats is None:
+            usage_stats = obj.usage_stats.all()
+        return SchoolUsageStatsSerializer(
+            usage_stats, many=True, context=self.context,
+            **self.get_nested_sparse_kwargs('usage_stats')
+        ).data
+    
+    def get_staff_total(self, obj):
+        # Nested staff is paged by SchoolViewSet, so expose the full size
+        if hasattr(obj, 'staff_total'):
+            return obj.staff_total
+        return obj.staff.count()
 
-class SchoolCreateSerializer(serializers.ModelSerializer):
+class SchoolCreateSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     staff_data = SchoolStaffSerializer(many=True, write_only=True, required=False)
     
     class Meta:
@@ -44,8 +88,45 @@ class SchoolCreateSerializer(serializers.ModelSerializer):
         
         return school
 
-class SchoolSummarySerializer(serializers.ModelSerializer):
-    tier_name = serializers.CharField(source='tier.name', read_only=True)
+class TierField(serializers.Field):
+    """SchoolTier by id or name, looked up in the importer's tier cache"""
+    default_error_messages = {
+        'does_not_exist': 'Invalid tier "{value}" - no tier with this id or name.',
+    }
+    
+    def to_internal_value(self, data):
+        tier = self.context['tiers'].get(str(data))
+        if tier is None:
+            self.fail('does_not_exist', value=data)
+        return tier
+    
+    def to_representation(self, value):
+        return value.pk
+
+class SchoolStaffImportSerializer(serializers.ModelSerializer):
+    """Staff row of a bulk import; the school comes from the import"""
+    class Meta:
+        model = SchoolStaff
+        fields = ['name', 'email', 'phone', 'role', 'is_active']
+
+class SchoolImportSerializer(serializers.ModelSerializer):
+    """
+    School row of a bulk import. Code uniqueness and staff emails are
+    checked per chunk by schools.onboarding instead of per row.
+    """
+    tier = TierField()
+    staff_data = SchoolStaffImportSerializer(many=True, required=False)
+    
+    class Meta:
+        model = School
+        exclude = (
+            'id', 'created_at', 'updated_at', 'created_by', 'license_bucket',
+            'total_teachers', 'total_admins'
+        )
+        extra_kwargs = {'code': {'validators': []}}
+
+class SchoolSummarySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    tier_name = ReferenceField(tier_cache, 'name', source='tier_id')
     staff_count = serializers.SerializerMethodField()
     
     class Meta:
@@ -56,6 +137,10 @@ class SchoolSummarySerializer(serializers.ModelSerializer):
             'staff_count', 'subscription_end', 'license_expiry',
             'created_at'
         ]
+        field_dependencies = {'staff_count': []}
     
     def get_staff_count(self, obj):
+        # Prefer the count annotated by SchoolViewSet.get_queryset()
+        if hasattr(obj, 'active_staff_count'):
+            return obj.active_staff_count
         return obj.staff.filter(is_active=True).count()
\ No newline at end of file
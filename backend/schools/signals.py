@@ -0,0 +1,130 @@
+from django.db.models.signals import post_init, pre_save, post_save, post_delete
+from django.dispatch import receiver
+from .counters import apply_staff_change
+from .licenses import license_bucket_for
+from .models import School, SchoolStaff, SchoolUsageStats
+from .rollups import USAGE_METRICS, apply_usage_delta
+from .search import get_search_backend
+from .stats import invalidate_school_statistics
+
+@receiver(post_save, sender=School)
+@receiver(post_delete, sender=School)
+def school_changed(sender, instance, **kwargs):
+    """Invalidate cached school statistics whenever a school changes"""
+    invalidate_school_statistics()
+
+@receiver(pre_save, sender=School)
+def set_license_bucket(sender, instance, raw=False, **kwargs):
+    """Keep license_bucket in step with license_expiry on every save"""
+    if not raw:
+        instance.license_bucket = license_bucket_for(instance.license_expiry)
+
+@receiver(post_save, sender=School)
+@receiver(post_save, sender=SchoolStaff)
+def index_search_document(sender, instance, **kwargs):
+    get_search_backend().update(instance)
+
+@receiver(post_delete, sender=School)
+@receiver(post_delete, sender=SchoolStaff)
+def remove_search_document(sender, instance, **kwargs):
+    get_search_backend().remove(instance)
+
+STAFF_STATE_FIELDS = ('school_id', 'role', 'is_active')
+USAGE_STATE_FIELDS = ('school_id', 'date', *USAGE_METRICS)
+
+def tracked_state(instance, fields, previous=None, update_fields=None):
+    """
+    Snapshot `fields` of an instance as a tuple, or None when some are
+    deferred. With a `previous` snapshot, fields that were deferred or left
+    out of update_fields keep their previous value, as they were not written.
+    """
+    values = instance.__dict__
+    if previous is None:
+        if not all(name in values for name in fields):
+            return None
+        return tuple(values[name] for name in fields)
+    written = set(fields)
+    if update_fields is not None:
+        written = {name for name in fields if name in update_fields or name.removesuffix('_id') in update_fields}
+    return tuple(
+        values[name] if name in values and name in written else old
+        for name, old in zip(fields, previous)
+    )
+
+def load_tracked_state(instance, attr, fields):
+    # Instances loaded with .only()/.defer() did not record their state
+    if instance._state.adding or getattr(instance, attr) is not None:
+        return
+    setattr(instance, attr, type(instance).objects.filter(pk=instance.pk).values_list(*fields).first())
+
+@receiver(post_init, sender=SchoolStaff)
+def remember_staff_counter_state(sender, instance, **kwargs):
+    """Keep the loaded school/role/is_active to diff against on save"""
+    instance._counter_state = tracked_state(instance, STAFF_STATE_FIELDS)
+
+@receiver(pre_save, sender=SchoolStaff)
+def load_staff_counter_state(sender, instance, raw=False, **kwargs):
+    if not raw:
+        load_tracked_state(instance, '_counter_state', STAFF_STATE_FIELDS)
+
+@receiver(post_save, sender=SchoolStaff)
+def update_staff_counters(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    """Move the staff member between the School counters it affects"""
+    if raw:
+        return
+    old_state = None if created else instance._counter_state
+    new_state = tracked_state(instance, STAFF_STATE_FIELDS, old_state, update_fields)
+    if old_state != new_state:
+        apply_staff_change(old_state, new_state)
+    instance._counter_state = new_state
+
+@receiver(post_delete, sender=SchoolStaff)
+def release_staff_counters(sender, instance, **kwargs):
+    apply_staff_change(instance._counter_state or tracked_state(instance, STAFF_STATE_FIELDS), None)
+
+def apply_usage_change(old_state, new_state):
+    """Feed the difference between two daily usage snapshots to the rollups"""
+    old = dict(zip(USAGE_STATE_FIELDS, old_state)) if old_state else None
+    new = dict(zip(USAGE_STATE_FIELDS, new_state)) if new_state else None
+    for state in (old, new):
+        if state:
+            state['date'] = SchoolUsageStats._meta.get_field('date').to_python(state['date'])
+
+    if old and new and (old['school_id'], old['date']) == (new['school_id'], new['date']):
+        metrics = {field: (new[field] or 0) - (old[field] or 0) for field in USAGE_METRICS}
+        apply_usage_delta(new['school_id'], new['date'], metrics, 0)
+        return
+    if old:
+        metrics = {field: -(old[field] or 0) for field in USAGE_METRICS}
+        apply_usage_delta(old['school_id'], old['date'], metrics, -1)
+    if new:
+        metrics = {field: new[field] or 0 for field in USAGE_METRICS}
+        apply_usage_delta(new['school_id'], new['date'], metrics, 1)
+
+@receiver(post_init, sender=SchoolUsageStats)
+def remember_usage_state(sender, instance, **kwargs):
+    instance._rollup_state = tracked_state(instance, USAGE_STATE_FIELDS)
+
+@receiver(pre_save, sender=SchoolUsageStats)
+def load_usage_state(sender, instance, raw=False, **kwargs):
+    if not raw:
+        load_tracked_state(instance, '_rollup_state', USAGE_STATE_FIELDS)
+
+@receiver(post_save, sender=SchoolUsageStats)
+def update_usage_rollups(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    """Add a saved day of usage to its week, month and quarter rollups"""
+    if raw:
+        return
+    old_state = None if created else instance._rollup_state
+    new_state = tracked_state(instance, USAGE_STATE_FIELDS, old_state, update_fields)
+    if old_state != new_state:
+        apply_usage_change(old_state, new_state)
+    instance._rollup_state = new_state
+
+@receiver(post_delete, sender=SchoolUsageStats)
+def release_usage_rollups(sender, instance, **kwargs):
+    apply_usage_change(instance._rollup_state or tracked_state(instance, USAGE_STATE_FIELDS), None)
+
+def setup_search_index(sender, using='default', **kwargs):
+    """Create the search index storage after migrations have run"""
+    get_search_backend().setup(using)
@@ -0,0 +1,61 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q, Count
+from django.utils import timezone
+from super_admin_backend.refcache import tier_cache
+from .models import School
+
+SCHOOL_STATISTICS_CACHE_KEY = 'schools:statistics'
+
+def compute_school_statistics():
+    """Compute all school counters with a single conditional aggregate query"""
+    now = timezone.now()
+
+    aggregates = {
+        'total_schools': Count('id'),
+        'active_schools': Count('id', filter=Q(status='active')),
+        'trial_schools': Count('id', filter=Q(status='trial')),
+        'suspended_schools': Count('id', filter=Q(status='suspended')),
+        'expired_licenses': Count('id', filter=Q(license_expiry__lt=now)),
+        'expiring_soon': Count('id', filter=Q(
+            license_expiry__gt=now,
+            license_expiry__lt=now + timezone.timedelta(days=30)
+        )),
+    }
+
+    # Tier distribution, one conditional count per tier; names come from
+    # the reference cache so no join is needed
+    tiers = tier_cache.all(['name'])
+    for tier in tiers:
+        aggregates[f'tier_{tier.pk}'] = Count('id', filter=Q(tier_id=tier.pk))
+
+    counts = School.objects.aggregate(**aggregates)
+
+    tier_distribution = []
+    for tier in tiers:
+        count = counts.pop(f'tier_{tier.pk}')
+        if count:
+            tier_distribution.append({'tier__name': tier.name, 'count': count})
+
+    return {
+        **counts,
+        'tier_distribution': tier_distribution
+    }
+
+def get_school_statistics():
+    """Return the cached statistics snapshot, computing it on a miss"""
+    snapshot = cache.get(SCHOOL_STATISTICS_CACHE_KEY)
+    if snapshot is None:
+        snapshot = {
+            'computed_at': timezone.now(),
+            'data': compute_school_statistics()
+        }
+        cache.set(
+            SCHOOL_STATISTICS_CACHE_KEY, snapshot,
+            getattr(settings, 'SCHOOL_STATISTICS_CACHE_TTL', 60)
+        )
+    return snapshot
+
+def invalidate_school_statistics():
+    """Drop the cached statistics snapshot"""
+    cache.delete(SCHOOL_STATISTICS_CACHE_KEY)
@@ -1,3 +1,507 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import os
+import tempfile
+import zipfile
+from datetime import date, timedelta
+from unittest import mock
+from xml.etree import ElementTree
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db.models import Count, Sum
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from super_admin_backend.indexaudit import audit_list_views, suggested_index
+from super_admin_backend.pagination import StandardPagination
+from super_admin_backend.refcache import ReferenceCache, tier_cache
+from .counters import reconcile_school_counters
+from .models import (
+    PlatformUsageRollup, School, SchoolStaff, SchoolTier, SchoolUsageRollup, SchoolUsageStats
+)
+from .rollups import USAGE_METRICS, plan_usage_periods, rebuild_usage_rollups, summarize_usage
+
+def create_school(tier, name, **fields):
+    now = timezone.now()
+    defaults = {
+        'code': name.lower().replace(' ', '-'), 'email': 'office@example.com', 'phone': '1',
+        'address': '', 'city': '', 'state': '', 'country': '', 'postal_code': '',
+        'subscription_start': now, 'subscription_end': now, 'license_expiry': now,
+    }
+    return School.objects.create(tier=tier, name=name, **{**defaults, **fields})
+
+class IndexCoverageTests(TestCase):
+    def test_list_filters_use_an_index(self):
+        """Every filterset field of a list endpoint is served by an index"""
+        unindexed = [
+            f'{check.view.__name__}: {check.filter_field} -> {suggested_index(check)}'
+            for check in audit_list_views()
+            if check.filter_field and check.full_scan
+        ]
+        self.assertEqual(unindexed, [], 'Add these indexes to the model Meta')
+
+    def test_unindexed_filter_is_flagged(self):
+        """Walking the ordering index and discarding rows is not index support"""
+        class SchoolView:
+            queryset = School.objects.all()
+            filterset_fields = ['postal_code', 'status']
+            ordering = ['-created_at']
+
+        checks = {check.filter_field: check for check in audit_list_views([SchoolView]) if check.filter_field}
+        self.assertTrue(checks['postal_code'].full_scan, checks['postal_code'].plan)
+        self.assertFalse(checks['status'].full_scan, checks['status'].plan)
+        self.assertEqual(
+            suggested_index(checks['postal_code']), "models.Index(fields=['postal_code', '-created_at'])"
+        )
+
+@override_settings(SEARCH_MAX_RESULTS=2)
+class FullTextSearchTests(TestCase):
+    def setUp(self):
+        tier = SchoolTier.objects.create(
+            name='basic', description='', max_students=10, max_teachers=1, max_admins=1, price_per_month=1
+        )
+        self.maple = [
+            create_school(tier, f'Maple School {number}', status='active' if number % 2 else 'trial')
+            for number in range(6)
+        ]
+        self.by_city = create_school(tier, 'Oak School', city='Maple', status='active')
+        create_school(tier, 'Birch School', status='active')
+
+    def search(self, **params):
+        response = self.client.get('/api/schools/schools/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_filters_apply_to_every_match(self):
+        """Matches beyond SEARCH_MAX_RESULTS are still found and counted"""
+        data = self.search(search='maple', status='active')
+        self.assertEqual(data['count'], 4)
+        names = [row['name'] for row in data['results']]
+        self.assertEqual(
+            sorted(names[:3]), [school.name for school in self.maple if school.status == 'active']
+        )
+        # A city match weighs less than a name match
+        self.assertEqual(names[-1], 'Oak School')
+
+    def test_explicit_ordering_keeps_every_match(self):
+        data = self.search(search='maple', ordering='name')
+        self.assertEqual(
+            [row['name'] for row in data['results']],
+            sorted(school.name for school in self.maple) + ['Oak School']
+        )
+
+    def test_typo_and_prefix_matches(self):
+        self.assertEqual(self.search(search='mapel')['count'], 7)
+        self.assertEqual(self.search(search='bir')['count'], 1)
+        self.assertEqual(self.search(search='elm')['count'], 0)
+
+class KeysetPaginationTests(TestCase):
+    url = '/api/schools/schools/'
+
+    def setUp(self):
+        tier = SchoolTier.objects.create(
+            name='basic', description='', max_students=10, max_teachers=1, max_admins=1, price_per_month=1
+        )
+        now = timezone.now()
+        self.schools = [create_school(tier, f'School {number:02}') for number in range(45)]
+        # Rows sharing a created_at are told apart by the pk tiebreak
+        for position, school in enumerate(self.schools):
+            School.objects.filter(pk=school.pk).update(created_at=now - timedelta(minutes=position // 3))
+
+    def walk(self, params, link='next'):
+        pages, url = [], self.url
+        while url:
+            response = self.client.get(url, params if url == self.url else None)
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            self.assertNotIn('count', data)
+            pages.append([row['id'] for row in data['results']])
+            url = data[link]
+        return pages
+
+    def test_pages_cover_every_row_once(self):
+        pages = self.walk({'pagination': 'cursor'})
+        self.assertEqual([len(page) for page in pages], [20, 20, 5])
+        expected = School.objects.order_by('-created_at', '-pk').values_list('id', flat=True)
+        self.assertEqual(sum(pages, []), [str(pk) for pk in expected])
+
+    def test_previous_link_returns_the_previous_page(self):
+        first = self.client.get(self.url, {'pagination': 'cursor', 'ordering': 'name'}).json()
+        second = self.client.get(first['next']).json()
+        self.assertEqual(second['results'][0]['name'], 'School 20')
+        back = self.client.get(second['previous']).json()
+        self.assertEqual(back['results'], first['results'])
+
+    def test_invalid_cursor_is_not_found(self):
+        self.assertEqual(self.client.get(self.url, {'cursor': 'garbage'}).status_code, 404)
+
+    def test_unkeyable_orderings_fall_back_to_page_numbers(self):
+        request = Request(APIRequestFactory().get(self.url, {'pagination': 'cursor'}))
+        for ordering in ['tier__name', '-created_by', 'staff_count']:
+            view = type('View', (), {'ordering': [ordering]})()
+            paginator = StandardPagination()
+            page = paginator.paginate_queryset(School.objects.order_by('pk'), request, view)
+            self.assertIsNone(paginator.keyset, ordering)
+            self.assertEqual(len(page), 20)
+
+class ExportTests(TestCase):
+    url = '/api/schools/schools/'
+    
+    def setUp(self):
+        tier = SchoolTier.objects.create(
+            name='basic', description='', max_students=10, max_teachers=1, max_admins=1, price_per_month=1
+        )
+        self.academy = create_school(tier, 'Maple Academy', status='active', total_students=120)
+        create_school(tier, 'Maple High', status='trial')
+        create_school(tier, 'Oak School', status='active')
+        SchoolStaff.objects.create(
+            school=self.academy, name='Ann', email='ann@example.com', phone='1', role='teacher'
+        )
+    
+    def export(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content)
+    
+    def test_csv_applies_search_and_filters(self):
+        content = self.export(self.url, format='csv', search='maple', status='active')
+        header, *rows = list(csv.reader(io.StringIO(content.decode('utf-8'))))
+        # Method fields (staff_count) cannot be read with values()
+        self.assertEqual(header, [
+            'id', 'name', 'code', 'status', 'tier_name', 'total_students', 'total_teachers',
+            'total_admins', 'subscription_end', 'license_expiry', 'created_at'
+        ])
+        self.assertEqual(len(rows), 1)
+        row = dict(zip(header, rows[0]))
+        self.assertEqual(row['id'], str(self.academy.pk))
+        # Choices keep their stored value, tier_name is resolved from tier_id
+        self.assertEqual((row['name'], row['status'], row['tier_name']), ('Maple Academy', 'active', 'basic'))
+        self.assertEqual(row['total_students'], '120')
+        self.assertEqual(row['created_at'], timezone.localtime(self.academy.created_at).isoformat())
+    
+    def test_ndjson_honours_fields_and_ordering(self):
+        content = self.export(self.url, format='ndjson', fields='name,tier_name,status', ordering='-name')
+        self.assertEqual([json.loads(line) for line in content.decode('utf-8').splitlines()], [
+            {'name': 'Oak School', 'tier_name': 'basic', 'status': 'active'},
+            {'name': 'Maple High', 'tier_name': 'basic', 'status': 'trial'},
+            {'name': 'Maple Academy', 'tier_name': 'basic', 'status': 'active'},
+        ])
+    
+    def test_xlsx_rows(self):
+        content = self.export(
+            self.url, format='xlsx', fields='name,total_students', status='active', ordering='name'
+        )
+        with zipfile.ZipFile(io.BytesIO(content)) as workbook:
+            self.assertIn('xl/workbook.xml', workbook.namelist())
+            sheet = ElementTree.fromstring(workbook.read('xl/worksheets/sheet1.xml'))
+        namespace = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+        rows = [
+            [''.join(cell.itertext()) for cell in row.iter(f'{namespace}c')]
+            for row in sheet.iter(f'{namespace}row')
+        ]
+        self.assertEqual(rows, [['name', 'total_students'], ['Maple Academy', '120'], ['Oak School', '0']])
+        # Numbers are numeric cells, text is inline
+        cells = list(sheet.iter(f'{namespace}c'))
+        self.assertEqual([cell.get('t') for cell in cells[2:4]], ['inlineStr', None])
+    
+    def test_foreign_keys_export_their_ids(self):
+        content = self.export('/api/schools/staff/', format='ndjson', fields='name,role,school')
+        self.assertEqual(
+            [json.loads(line) for line in content.decode('utf-8').splitlines()],
+            [{'name': 'Ann', 'role': 'teacher', 'school': str(self.academy.pk)}]
+        )
+    
+    def test_errors_are_json(self):
+        response = self.client.get(self.url, {'format': 'csv', 'status': 'unknown'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response['Content-Type'], 'application/json')
+
+@override_settings(REFERENCE_CACHE_CHECK_INTERVAL=0)
+class ReferenceCacheTests(TestCase):
+    def setUp(self):
+        self.tier = SchoolTier.objects.create(
+            name='basic', description='', max_students=10, max_teachers=1, max_admins=1, price_per_month=1
+        )
+
+    def test_sees_changes_made_by_another_worker(self):
+        """Without a shared cache, workers still reload when the table changes"""
+        worker = ReferenceCache('schools.SchoolTier', validator=tier_cache.validator)
+        self.assertEqual(worker.get(self.tier.pk).name, 'basic')
+        self.assertEqual(tier_cache.get(self.tier.pk).name, 'basic')
+
+        # Saved by this worker: `worker` is not connected to its signals
+        self.tier.name = 'premium'
+        self.tier.save()
+        self.assertEqual(worker.get(self.tier.pk).name, 'premium')
+
+        # Written by another process: no signal reaches this one either
+        SchoolTier.objects.filter(pk=self.tier.pk).update(name='enterprise', updated_at=timezone.now())
+        self.assertEqual(worker.get(self.tier.pk).name, 'enterprise')
+        self.assertEqual(tier_cache.get(self.tier.pk).name, 'enterprise')
+
+class SchoolCounterTests(TestCase):
+    def setUp(self):
+        tier = SchoolTier.objects.create(
+            name='basic', description='', max_students=10, max_teachers=1, max_admins=1, price_per_month=1
+        )
+        self.north = create_school(tier, 'North')
+        self.south = create_school(tier, 'South')
+
+    def staff(self, school, role, email):
+        return SchoolStaff.objects.create(school=school, name=email, email=email, phone='1', role=role)
+
+    def counters(self, school):
+        school.refresh_from_db()
+        return school.total_teachers, school.total_admins
+
+    def test_staff_changes_move_counters(self):
+        teacher = self.staff(self.north, 'teacher', 'teacher@example.com')
+        self.staff(self.north, 'principal', 'principal@example.com')
+        self.staff(self.north, 'staff', 'office@example.com')
+        self.assertEqual(self.counters(self.north), (1, 1))
+
+        teacher.role = 'admin'
+        teacher.save()
+        self.assertEqual(self.counters(self.north), (0, 2))
+
+        # Loaded without its tracked fields, saved with update_fields
+        staff = SchoolStaff.objects.only('name').get(pk=teacher.pk)
+        staff.is_active = False
+        staff.save(update_fields=['is_active'])
+        self.assertEqual(self.counters(self.north), (0, 1))
+
+        staff.is_active = True
+        staff.school = self.south
+        staff.save()
+        self.assertEqual(self.counters(self.north), (0, 1))
+        self.assertEqual(self.counters(self.south), (0, 1))
+
+        staff.delete()
+        self.assertEqual(self.counters(self.south), (0, 0))
+        self.assertEqual(self.counters(self.north), (0, 1))
+
+    def test_reconcile_fixes_drift(self):
+        self.staff(self.north, 'teacher', 'teacher@example.com')
+        self.staff(self.south, 'admin', 'admin@example.com')
+        # QuerySet.update() skips the signals keeping the counters in sync
+        SchoolStaff.objects.filter(school=self.north).update(is_active=False)
+        School.objects.filter(pk=self.south.pk).update(total_admins=5)
+
+        drifted = dict(reconcile_school_counters([self.north.pk, self.south.pk], dry_run=True))
+        self.assertEqual(drifted, {
+            self.north.pk: {'total_teachers': (1, 0)}, self.south.pk: {'total_admins': (5, 1)}
+        })
+        self.assertEqual(self.counters(self.north), (1, 0))
+
+        reconcile_school_counters([self.north.pk, self.south.pk])
+        self.assertEqual(self.counters(self.north), (0, 0))
+        self.assertEqual(self.counters(self.south), (0, 1))
+        self.assertEqual(reconcile_school_counters([self.north.pk, self.south.pk]), [])
+
+class ReconcileCommandTests(TransactionTestCase):
+    def test_reconciles_chunks_in_parallel(self):
+        """Worker threads use their own connections, hence committed rows"""
+        tier = SchoolTier.objects.create(
+            name='basic', description='', max_students=10, max_teachers=1, max_admins=1, price_per_month=1
+        )
+        schools = [create_school(tier, f'School {number}') for number in range(5)]
+        School.objects.filter(pk__in=[school.pk for school in schools[::2]]).update(total_teachers=3)
+
+        output = io.StringIO()
+        call_command('reconcile_school_counters', chunk_size=2, workers=3, stdout=output)
+        self.assertIn('Checked 5 schools, 3 fixed', output.getvalue())
+        self.assertEqual(set(School.objects.values_list('total_teachers', flat=True)), {0})
+
+class UsageRollupTests(TestCase):
+    # Crossing weeks, months (February of a leap year) and quarters
+    ranges = [
+        (date(2024, 1, 29), date(2024, 7, 3)),
+        (date(2024, 2, 28), date(2024, 3, 4)),
+        (date(2024, 3, 25), date(2024, 4, 7)),
+        (date(2024, 1, 1), date(2024, 6, 30)),
+        (date(2024, 4, 1), date(2024, 4, 1)),
+        (None, None),
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        tier = SchoolTier.objects.create(
+            name='basic', description='', max_students=10, max_teachers=1, max_admins=1, price_per_month=1
+        )
+        cls.schools = [create_school(tier, 'North'), create_school(tier, 'South')]
+        # Saved one by one: the signals build the rollups
+        for position, school in enumerate(cls.schools):
+            day = date(2024, 1, 1)
+            while day <= date(2024, 6, 30):
+                SchoolUsageStats.objects.create(school=school, date=day, **{
+                    field: (day.toordinal() * (index + 1) + position) % 17
+                    for index, field in enumerate(USAGE_METRICS)
+                })
+                day += timedelta(days=1)
+
+    def direct(self, start, end, school_id=None):
+        daily = SchoolUsageStats.objects.all()
+        if start is not None:
+            daily = daily.filter(date__range=(start, end))
+        if school_id is not None:
+            daily = daily.filter(school_id=school_id)
+        totals = daily.aggregate(rows=Count('id'), **{field: Sum(field) for field in USAGE_METRICS})
+        return totals, totals.pop('rows')
+
+    def assertMatchesDailyRows(self):
+        for start, end in self.ranges:
+            for school_id in [None] + [school.pk for school in self.schools]:
+                with self.subTest(start=start, end=end, school=school_id):
+                    self.assertEqual(
+                        summarize_usage(start, end, school_id), self.direct(start, end, school_id)
+                    )
+
+    def rollups(self):
+        return {
+            model: sorted(model.objects.filter(day_count__gt=0).values_list(*[
+                field.attname for field in model._meta.concrete_fields
+                if field.name not in ('id', 'updated_at')
+            ]))
+            for model in (SchoolUsageRollup, PlatformUsageRollup)
+        }
+
+    def test_plans_coarsest_periods_first(self):
+        periods, day_ranges = plan_usage_periods(date(2024, 1, 29), date(2024, 7, 3))
+        self.assertEqual(periods, [
+            ('month', date(2024, 2, 1)), ('month', date(2024, 3, 1)), ('quarter', date(2024, 4, 1))
+        ])
+        # The week of January 29 would swallow the start of February
+        self.assertEqual(day_ranges, [
+            (date(2024, 1, 29), date(2024, 1, 31)), (date(2024, 7, 1), date(2024, 7, 3))
+        ])
+        periods, day_ranges = plan_usage_periods(date(2024, 3, 25), date(2024, 4, 7))
+        self.assertEqual(periods, [('week', date(2024, 3, 25)), ('week', date(2024, 4, 1))])
+        self.assertEqual(day_ranges, [])
+
+    def test_incremental_rollups_match_daily_rows(self):
+        self.assertMatchesDailyRows()
+
+        # Edit a row, move one across a week and a month, delete one
+        stats = SchoolUsageStats.objects.get(school=self.schools[0], date=date(2024, 2, 29))
+        stats.login_count += 100
+        stats.save()
+        stats = SchoolUsageStats.objects.get(school=self.schools[1], date=date(2024, 3, 31))
+        stats.delete()
+        stats = SchoolUsageStats.objects.get(school=self.schools[1], date=date(2024, 4, 1))
+        stats.date = date(2024, 3, 31)
+        stats.quiz_attempts = 50
+        stats.save()
+        SchoolUsageStats.objects.get(school=self.schools[0], date=date(2024, 1, 29)).delete()
+        self.assertMatchesDailyRows()
+
+        incremental = self.rollups()
+        rebuild_usage_rollups()
+        self.assertEqual(self.rollups(), incremental)
+
+    def test_rebuild_leaves_rollups_whole_when_it_fails(self):
+        SchoolUsageStats.objects.filter(date__gte=date(2024, 6, 1)).delete()
+        # Rows added without signals are picked up by the rebuild
+        SchoolUsageStats.objects.bulk_create([
+            SchoolUsageStats(school=self.schools[0], date=date(2024, 7, 1), login_count=5)
+        ])
+        before = self.rollups()
+        with mock.patch.object(PlatformUsageRollup.objects, 'bulk_create', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                rebuild_usage_rollups()
+        self.assertEqual(self.rollups(), before)
+
+        rebuild_usage_rollups(date(2024, 6, 15), date(2024, 7, 1))
+        self.assertMatchesDailyRows()
+
+class BulkImportTests(TestCase):
+    school_columns = [
+        'name', 'code', 'email', 'phone', 'address', 'city', 'state', 'country', 'postal_code', 'tier',
+        'subscription_start', 'subscription_end', 'license_expiry',
+    ]
+
+    def setUp(self):
+        self.tier = SchoolTier.objects.create(
+            name='basic', description='', max_students=10, max_teachers=1, max_admins=1, price_per_month=1
+        )
+        self.now = timezone.now()
+
+    def school_row(self, name, code, expiry, email='office@example.com', tier='basic'):
+        values = [
+            name, code, email, '1', '1 Main Street', 'Springfield', 'State', 'Country', '12345', tier,
+            self.now.isoformat(), self.now.isoformat(), expiry.isoformat()
+        ]
+        return ','.join(values)
+
+    def import_file(self, name, lines, **options):
+        """Run the import_schools command on a file of `lines`"""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(os.rmdir, directory)
+        path = os.path.join(directory, name)
+        with open(path, 'w') as upload:
+            upload.write('\n'.join(lines) + '\n')
+        self.addCleanup(os.remove, path)
+        output, errors = io.StringIO(), io.StringIO()
+        call_command('import_schools', path, stdout=output, stderr=errors, **options)
+        return output.getvalue(), errors.getvalue()
+
+    def search(self, url, query):
+        return sorted(row['name'] for row in self.client.get(url, {'search': query}).json()['results'])
+
+    def test_imports_match_per_row_saves(self):
+        soon, later = self.now + timedelta(days=10), self.now + timedelta(days=400)
+        upload = SimpleUploadedFile('schools.csv', '\n'.join([
+            ','.join(self.school_columns),
+            self.school_row('Cedar Academy', 'cedar', soon),
+            self.school_row('Broken School', 'broken', soon, email='not-an-email'),
+            self.school_row('Willow Academy', 'willow', later),
+        ]).encode())
+        response = self.client.post('/api/schools/schools/bulk_import/', {'file': upload})
+        self.assertEqual(response.status_code, 201)
+        report = response.json()
+        self.assertEqual((report['rows'], report['schools_created'], report['failed']), (3, 2, 1))
+        self.assertEqual(report['errors'][0]['line'], 3)
+        self.assertIn('email', report['errors'][0]['errors'])
+
+        output, errors = self.import_file('staff.csv', [
+            'school_code,name,email,phone,role',
+            'cedar,Rowan Teacher,rowan@example.com,1,teacher',
+            'cedar,Hazel Principal,hazel@example.com,1,principal',
+            'willow,Rowan Admin,rowan@example.com,1,admin',
+            'missing,Nobody,nobody@example.com,1,teacher',
+        ], kind='staff')
+        self.assertIn('Imported 0 schools and 3 staff from 4 rows (1 failed)', output)
+        self.assertIn('line 5', errors)
+
+        # The same schools and staff saved one by one, through the signals
+        saved = {
+            'cedar': create_school(self.tier, 'Cedar Institute', code='cedar-saved', license_expiry=soon),
+            'willow': create_school(self.tier, 'Willow Institute', code='willow-saved', license_expiry=later),
+        }
+        for code, name, email, role in [
+            ('cedar', 'Rowan Tutor', 'rowan@example.com', 'teacher'),
+            ('cedar', 'Hazel Head', 'hazel@example.com', 'principal'),
+            ('willow', 'Rowan Manager', 'rowan@example.com', 'admin'),
+        ]:
+            SchoolStaff.objects.create(school=saved[code], name=name, email=email, phone='1', role=role)
+
+        for code, school in saved.items():
+            imported = School.objects.get(code=code)
+            school.refresh_from_db()
+            self.assertEqual(
+                (imported.total_teachers, imported.total_admins, imported.license_bucket),
+                (school.total_teachers, school.total_admins, school.license_bucket)
+            )
+        self.assertNotEqual(saved['cedar'].license_bucket, saved['willow'].license_bucket)
+        self.assertEqual(
+            self.search('/api/schools/schools/', 'cedar'), ['Cedar Academy', 'Cedar Institute']
+        )
+        self.assertEqual(
+            self.search('/api/schools/staff/', 'rowan'),
+            ['Rowan Admin', 'Rowan Manager', 'Rowan Teacher', 'Rowan Tutor']
+        )
+        self.assertEqual(self.search('/api/schools/schools/', 'broken'), [])
@@ -1,86 +1,221 @@
 from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q, Count, Sum
+from django.db.models import Q, Count, Sum, Prefetch
+from django.http import StreamingHttpResponse
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 from .models import School, SchoolTier, SchoolStaff, SchoolUsageStats
 from .serializers import (
     SchoolSerializer, SchoolTierSerializer, SchoolStaffSerializer,
     SchoolUsageStatsSerializer, SchoolCreateSerializer, SchoolSummarySerializer
 )
+from super_admin_backend.exports import ExportViewSetMixin
+from super_admin_backend.fieldsets import SparseFieldsetViewSetMixin
+from super_admin_backend.refcache import ReferenceCacheViewSetMixin, tier_cache
+from .search import FullTextSearchFilter
+from .stats import get_school_statistics
+from .lifecycle import STATUS_ACTIONS, change_school_status
+from .onboarding import IMPORT_FORMATS, IMPORT_KINDS, BulkImporter, detect_format, read_records
+from .rollups import summarize_usage
+import uuid
 
-class SchoolTierViewSet(viewsets.ModelViewSet):
+class SchoolTierViewSet(ExportViewSetMixin, ReferenceCacheViewSetMixin, SparseFieldsetViewSetMixin, viewsets.ModelViewSet):
     queryset = SchoolTier.objects.all()
     serializer_class = SchoolTierSerializer
+    reference_cache = tier_cache
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['name', 'description']
     ordering_fields = ['name', 'price_per_month', 'created_at']
     ordering = ['price_per_month']
 
-class SchoolViewSet(viewsets.ModelViewSet):
-    queryset = School.objects.select_related('tier').prefetch_related('staff', 'usage_stats')
+class SchoolViewSet(ExportViewSetMixin, SparseFieldsetViewSetMixin, viewsets.ModelViewSet):
+    queryset = School.objects.all()
     serializer_class = SchoolSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, FullTextSearchFilter]
     filterset_fields = ['status', 'tier', 'city', 'state', 'country']
     search_fields = ['name', 'code', 'email', 'city']
     ordering_fields = ['name', 'created_at', 'subscription_end', 'total_students']
     ordering = ['-created_at']
+    bulk_status_limit = 1000
     
     def get_serializer_class(self):
         if self.action == 'create':
             return SchoolCreateSerializer
-        elif self.action == 'list':
+        elif self.action in ('list', 'expiring_licenses'):
             return SchoolSummarySerializer
         return SchoolSerializer
     
+    def get_queryset(self):
+        if self.action in ('list', 'expiring_licenses'):
+            # Summary rows only need an active staff count (the tier name
+            # comes from the reference cache), so skip the staff/usage
+            # prefetches and count in the database
+            return School.objects.annotate(
+                active_staff_count=Count('staff', filter=Q(staff__is_active=True))
+            )
+        if self.action in ('retrieve', 'update', 'partial_update'):
+            return self.get_windowed_queryset()
+        return super().get_queryset()
+    
+    def get_window_param(self, name, default, maximum):
+        try:
+            value = int(self.request.query_params.get(name, default))
+        except (TypeError, ValueError):
+            return default
+        return max(1, min(value, maximum))
+    
+    def get_windowed_queryset(self):
+        """Detail queryset with bounded staff and usage stats prefetches"""
+        usage_days = self.get_window_param('usage_days', 30, 365)
+        staff_page = self.get_window_param('staff_page', 1, 10 ** 6)
+        staff_page_size = self.get_window_param('staff_page_size', 20, 100)
+        offset = (staff_page - 1) * staff_page_size
+        since = timezone.now().date() - timezone.timedelta(days=usage_days)
+        
+        # Only prefetch the nested collections the response will render
+        fields = self.get_serializer().fields
+        queryset = super().get_queryset()
+        if 'staff_total' in fields:
+            queryset = queryset.annotate(staff_total=Count('staff'))
+        
+        # Sliced prefetch querysets are limited per school in SQL
+        # (ROW_NUMBER() window), so only the requested rows are fetched
+        prefetches = []
+        if 'staff' in fields:
+            prefetches.append(Prefetch(
+                'staff',
+                queryset=SchoolStaff.objects.order_by('name', 'id')[offset:offset + staff_page_size],
+                to_attr='windowed_staff'
+            ))
+        if 'usage_stats' in fields:
+            prefetches.append(Prefetch(
+                'usage_stats',
+                queryset=SchoolUsageStats.objects.filter(date__gte=since).order_by('-date'),
+                to_attr='windowed_usage_stats'
+            ))
+        return queryset.prefetch_related(*prefetches)
+    
+    def update(self, request, *args, **kwargs):
+        partial = kwargs.pop('partial', False)
+        instance = self.get_object()
+        serializer = self.get_serializer(instance, data=request.data, partial=partial)
+        serializer.is_valid(raise_exception=True)
+        self.perform_update(serializer)
+        
+        # Re-read through the windowed queryset instead of letting the
+        # serializer lazily load every staff and usage row
+        return Response(self.get_serializer(self.get_object()).data)
+    
     @action(detail=False, methods=['get'])
     def statistics(self, request):
         """Get overall school statistics"""
-        total_schools = School.objects.count()
-        active_schools = School.objects.filter(status='active').count()
-        trial_schools = School.objects.filter(status='trial').count()
-        suspended_schools = School.objects.filter(status='suspended').count()
-        
-        # License expiry stats
-        now = timezone.now()
-        expired_licenses = School.objects.filter(license_expiry__lt=now).count()
-        expiring_soon = School.objects.filter(
-            license_expiry__gt=now,
-            license_expiry__lt=now + timezone.timedelta(days=30)
-        ).count()
-        
-        # Tier distribution
-        tier_stats = School.objects.values('tier__name').annotate(
-            count=Count('id')
-        ).order_by('tier__name')
+        snapshot = get_school_statistics()
+        cache_age = (timezone.now() - snapshot['computed_at']).total_seconds()
         
         return Response({
-            'total_schools': total_schools,
-            'active_schools': active_schools,
-            'trial_schools': trial_schools,
-            'suspended_schools': suspended_schools,
-            'expired_licenses': expired_licenses,
-            'expiring_soon': expiring_soon,
-            'tier_distribution': tier_stats
+            **snapshot['data'],
+            'computed_at': snapshot['computed_at'],
+            'cache_age_seconds': round(cache_age, 1)
         })
     
     @action(detail=True, methods=['post'])
     def activate(self, request, pk=None):
         """Activate a school"""
         school = self.get_object()
-        school.status = 'active'
-        school.save()
+        change_school_status(School.objects.filter(pk=school.pk), 'activate', request)
         return Response({'status': 'School activated'})
     
     @action(detail=True, methods=['post'])
     def suspend(self, request, pk=None):
         """Suspend a school"""
         school = self.get_object()
-        school.status = 'suspended'
-        school.save()
+        change_school_status(School.objects.filter(pk=school.pk), 'suspend', request)
         return Response({'status': 'School suspended'})
     
+    @action(detail=False, methods=['post'])
+    def bulk_status(self, request):
+        """Activate or suspend many schools, selected by ids or by filter"""
+        operation = request.data.get('action')
+        ids = request.data.get('ids')
+        filter_params = request.data.get('filter')
+        
+        if operation not in STATUS_ACTIONS:
+            return Response(
+                {'error': f"action must be one of: {', '.join(STATUS_ACTIONS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if (ids is None) == (filter_params is None):
+            return Response(
+                {'error': 'Provide either ids or filter'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        results = {}
+        if ids is not None:
+            if not isinstance(ids, list):
+                return Response({'error': 'ids must be a list'}, status=status.HTTP_400_BAD_REQUEST)
+            requested = []
+            for value in ids:
+                try:
+                    requested.append(uuid.UUID(str(value)))
+                except ValueError:
+                    results[str(value)] = 'invalid'
+        else:
+            if not isinstance(filter_params, dict):
+                return Response({'error': 'filter must be an object'}, status=status.HTTP_400_BAD_REQUEST)
+            # Same filter fields and lookups as ?status=&tier=... on the list
+            filterset_class = DjangoFilterBackend().get_filterset_class(self, School.objects.all())
+            filterset = filterset_class(filter_params, queryset=School.objects.all(), request=request)
+            if not filterset.is_valid():
+                return Response(filterset.errors, status=status.HTTP_400_BAD_REQUEST)
+            requested = list(filterset.qs.values_list('pk', flat=True)[:self.bulk_status_limit + 1])
+        
+        if len(requested) > self.bulk_status_limit:
+            return Response(
+                {'error': f'At most {self.bulk_status_limit} schools can be changed per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        outcomes = change_school_status(School.objects.filter(pk__in=requested), operation, request)
+        for pk in requested:
+            results[str(pk)] = outcomes.get(pk, 'not_found')
+        
+        counts = {}
+        for outcome in results.values():
+            counts[outcome] = counts.get(outcome, 0) + 1
+        return Response({
+            'action': operation,
+            'counts': counts,
+            'results': [{'id': pk, 'result': outcome} for pk, outcome in results.items()]
+        })
+    
+    @action(detail=False, methods=['post'], parser_classes=[MultiPartParser])
+    def bulk_import(self, request):
+        """Onboard schools or staff from an uploaded CSV or NDJSON file"""
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'error': 'Upload the records as "file"'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        file_format = request.data.get('format') or detect_format(upload.name)
+        kind = request.data.get('kind', 'schools')
+        if file_format not in IMPORT_FORMATS or kind not in IMPORT_KINDS:
+            return Response(
+                {'error': f"format must be one of: {', '.join(IMPORT_FORMATS)}; "
+                          f"kind must be one of: {', '.join(IMPORT_KINDS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Large uploads are spooled to disk by Django and read back lazily
+        importer = BulkImporter(kind=kind, user=request.user)
+        report = importer.run(read_records(upload, file_format))
+        
+        response_status = status.HTTP_201_CREATED if report.schools_created or report.staff_created else status.HTTP_200_OK
+        return Response(report.as_dict(), status=response_status)
+    
     @action(detail=True, methods=['get'])
     def usage_stats(self, request, pk=None):
         """Get usage statistics for a school"""
@@ -92,28 +227,54 @@ class SchoolViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def expiring_licenses(self, request):
         """Get schools with expiring licenses"""
-        days = int(request.query_params.get('days', 30))
-        now = timezone.now()
-        cutoff_date = now + timezone.timedelta(days=days)
+        queryset = self.get_queryset()
+        bucket = request.query_params.get('bucket')
+        if bucket:
+            if bucket not in dict(School.LICENSE_BUCKET_CHOICES):
+                return Response(
+                    {'error': f"bucket must be one of: {', '.join(dict(School.LICENSE_BUCKET_CHOICES))}"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            # Precomputed bucket, read from the (license_bucket, license_expiry) index
+            queryset = queryset.filter(license_bucket=bucket)
+        else:
+            days = self.get_window_param('days', 30, 3650)
+            now = timezone.now()
+            queryset = queryset.filter(
+                license_expiry__gt=now,
+                license_expiry__lt=now + timezone.timedelta(days=days)
+            )
         
-        schools = School.objects.filter(
-            license_expiry__gt=now,
-            license_expiry__lt=cutoff_date
-        ).order_by('license_expiry')
+        # Soonest expiry first unless ?ordering= says otherwise; keyset
+        # pagination picks the same ordering up from the view
+        self.ordering = ['license_expiry']
+        queryset = self.filter_queryset(queryset)
         
-        serializer = SchoolSummarySerializer(schools, many=True)
-        return Response(serializer.data)
+        if request.query_params.get('stream', '').lower() in ('1', 'true', 'yes'):
+            return self.stream_ndjson(queryset)
+        
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+    
+    def stream_ndjson(self, queryset, chunk_size=500):
+        """Stream a queryset as newline-delimited JSON without loading it all"""
+        def rows():
+            encoder = JSONEncoder(separators=(',', ':'))
+            for obj in queryset.iterator(chunk_size=chunk_size):
+                yield encoder.encode(self.get_serializer(obj).data) + '\n'
+        return StreamingHttpResponse(rows(), content_type='application/x-ndjson')
 
-class SchoolStaffViewSet(viewsets.ModelViewSet):
+class SchoolStaffViewSet(ExportViewSetMixin, SparseFieldsetViewSetMixin, viewsets.ModelViewSet):
     queryset = SchoolStaff.objects.select_related('school')
     serializer_class = SchoolStaffSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, FullTextSearchFilter]
     filterset_fields = ['school', 'role', 'is_active']
     search_fields = ['name', 'email', 'phone']
     ordering_fields = ['name', 'role', 'created_at']
     ordering = ['-created_at']
 
-class SchoolUsageStatsViewSet(viewsets.ReadOnlyModelViewSet):
+class SchoolUsageStatsViewSet(ExportViewSetMixin, SparseFieldsetViewSetMixin, viewsets.ReadOnlyModelViewSet):
     queryset = SchoolUsageStats.objects.select_related('school')
     serializer_class = SchoolUsageStatsSerializer
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
@@ -123,26 +284,35 @@ class SchoolUsageStatsViewSet(viewsets.ReadOnlyModelViewSet):
     
     @action(detail=False, methods=['get'])
     def summary(self, request):
-        """Get usage summary across all schools"""
-        from django.db.models import Sum, Avg
+        """Get usage summary across all schools, or for one with ?school="""
+        try:
+            start_date = parse_date(request.query_params.get('start_date') or '')
+            end_date = parse_date(request.query_params.get('end_date') or '')
+        except ValueError:
+            start_date = end_date = None
+        for name, value in (('start_date', start_date), ('end_date', end_date)):
+            if request.query_params.get(name) and value is None:
+                return Response(
+                    {'error': f'{name} must be a date (YYYY-MM-DD)'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
         
-        # Get date range from query params
-        start_date = request.query_params.get('start_date')
-        end_date = request.query_params.get('end_date')
+        school_id = request.query_params.get('school')
+        if school_id:
+            try:
+                school_id = uuid.UUID(school_id)
+            except ValueError:
+                return Response({'error': 'Invalid school id'}, status=status.HTTP_400_BAD_REQUEST)
         
-        queryset = self.get_queryset()
-        if start_date:
-            queryset = queryset.filter(date__gte=start_date)
-        if end_date:
-            queryset = queryset.filter(date__lte=end_date)
-        
-        summary = queryset.aggregate(
-            total_active_students=Sum('active_students'),
-            total_active_teachers=Sum('active_teachers'),
-            total_logins=Sum('login_count'),
-            total_quiz_attempts=Sum('quiz_attempts'),
-            average_active_students=Avg('active_students'),
-            average_logins=Avg('login_count')
-        )
-        
-        return Response(summary)
\ No newline at end of file
+        # Whole weeks/months/quarters come from the rollup tables, daily
+        # rows only fill in the edges of the range
+        totals, days = summarize_usage(start_date, end_date, school_id or None)
+        
+        return Response({
+            'total_active_students': totals['active_students'],
+            'total_active_teachers': totals['active_teachers'],
+            'total_logins': totals['login_count'],
+            'total_quiz_attempts': totals['quiz_attempts'],
+            'average_active_students': totals['active_students'] / days if days else None,
+            'average_logins': totals['login_count'] / days if days else None
+        })
\ No newline at end of file
@@ -2,6 +2,8 @@
 ASGI config for super_admin_backend project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve it with an ASGI server (e.g. ``uvicorn super_admin_backend.asgi:application``)
+for the live dashboard feed, whose streams hold no worker thread.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
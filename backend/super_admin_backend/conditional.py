@@ -0,0 +1,37 @@
+"""
+Conditional GET for API actions.
+
+A view computes cheap validators for its response (usually from one
+aggregate query) and asks ``not_modified()`` before doing the real work.
+A client that sent a matching ``If-None-Match`` or ``If-Modified-Since``
+gets a 304 straight away; otherwise ``add_validators()`` puts the
+``ETag`` and ``Last-Modified`` headers on the full response.
+"""
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+def make_etag(*parts):
+    """Strong ETag from the values the response depends on"""
+    digest = hashlib.md5(':'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+    return quote_etag(digest)
+
+def not_modified(request, etag, last_modified=None):
+    """
+    The 304 response for `request` when the client's copy is current,
+    else None. `last_modified` is a datetime or None.
+    """
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is not None:
+        add_validators(response, etag, last_modified)
+    return response
+
+def add_validators(response, etag, last_modified=None):
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    # Let browsers keep the response but revalidate it on every load
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
@@ -0,0 +1,54 @@
+"""
+Shape-preserving downsampling of chart series.
+
+``lttb()`` implements Largest-Triangle-Three-Buckets: the first and last
+points are kept, the rest are split into equal buckets and each bucket
+keeps the point forming the largest triangle with the point kept from
+the previous bucket and the average of the next bucket. Peaks and dips
+survive, unlike plain averaging or every-nth sampling.
+"""
+
+def lttb(rows, threshold, x=lambda row: row[0], y=lambda row: row[1]):
+    """
+    Reduce `rows` (sorted by x) to at most `threshold` rows. `x` and `y`
+    pull the numeric coordinates out of a row; the kept rows are returned
+    whole, so other columns of a row travel with it.
+    """
+    rows = list(rows)
+    if threshold >= len(rows):
+        return rows
+    if threshold < 3:
+        return [rows[0], rows[-1]][:max(threshold, 0)]
+
+    xs = [float(x(row)) for row in rows]
+    ys = [float(y(row)) for row in rows]
+    sampled = [rows[0]]
+    bucket_size = (len(rows) - 2) / (threshold - 2)
+    previous = 0
+
+    for bucket in range(threshold - 2):
+        start = int(bucket * bucket_size) + 1
+        end = int((bucket + 1) * bucket_size) + 1
+
+        # Average of the next bucket (the last point for the final bucket)
+        next_start = end
+        next_end = min(int((bucket + 2) * bucket_size) + 1, len(rows))
+        if next_start >= next_end:
+            next_start, next_end = len(rows) - 1, len(rows)
+        count = next_end - next_start
+        average_x = sum(xs[next_start:next_end]) / count
+        average_y = sum(ys[next_start:next_end]) / count
+
+        best, best_area = start, -1.0
+        for index in range(start, end):
+            area = abs(
+                (xs[previous] - average_x) * (ys[index] - ys[previous]) -
+                (xs[previous] - xs[index]) * (average_y - ys[previous])
+            )
+            if area > best_area:
+                best, best_area = index, area
+        sampled.append(rows[best])
+        previous = best
+
+    sampled.append(rows[-1])
+    return sampled
@@ -0,0 +1,302 @@
+"""
+Streaming exports of list endpoints.
+
+``ExportViewSetMixin`` lets a list endpoint answer ``?format=csv``,
+``?format=xlsx`` or ``?format=ndjson`` (or the matching ``Accept`` header)
+with a file download. The export runs the same ``filter_queryset()`` as the
+JSON list, so filters, search and ordering apply, but skips pagination:
+rows are read with ``values().iterator(chunk_size=...)`` and written to a
+``StreamingHttpResponse`` as they arrive, so memory stays flat and the
+first bytes go out before the query is exhausted.
+
+Columns are the serializer's fields that map to a model column, a column
+of a related model (``source='school.name'``) or a queryset annotation, so
+``?fields=`` and ``?omit=`` pick export columns just like JSON fields.
+Method fields are left out, as they need model instances.
+"""
+import csv
+import datetime
+import decimal
+import json
+import re
+import uuid
+import zipfile
+from xml.sax.saxutils import escape
+
+from django.core.exceptions import FieldDoesNotExist
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.text import slugify
+from rest_framework import serializers
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+class ExportRenderer(BaseRenderer):
+    """
+    Lets content negotiation accept an export format. Exports are streamed
+    by the view and error responses are switched back to JSON, so this is
+    never asked to render anything itself.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return JSONRenderer().render(data, accepted_media_type, renderer_context)
+
+class CSVExportRenderer(ExportRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+class XLSXExportRenderer(ExportRenderer):
+    media_type = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    format = 'xlsx'
+    charset = None
+
+class NDJSONExportRenderer(ExportRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+EXPORT_RENDERERS = [CSVExportRenderer, XLSXExportRenderer, NDJSONExportRenderer]
+
+def export_value(value):
+    """Plain text/number form of a value for a CSV or XLSX cell"""
+    if value is None:
+        return ''
+    if isinstance(value, datetime.datetime) and timezone.is_aware(value):
+        value = timezone.localtime(value)
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, cls=DjangoJSONEncoder)
+    return value
+
+class Echo:
+    """File-like object handing back what is written, for csv.writer"""
+
+    def write(self, value):
+        return value
+
+class ChunkBuffer:
+    """Write-only file collecting bytes until the stream takes them"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+def stream_csv(columns, rows, batch_size):
+    writer = csv.writer(Echo())
+    yield writer.writerow(columns)
+    lines = []
+    for row in rows:
+        lines.append(writer.writerow([export_value(value) for value in row]))
+        if len(lines) >= batch_size:
+            yield ''.join(lines)
+            lines = []
+    if lines:
+        yield ''.join(lines)
+
+def stream_ndjson(columns, rows, batch_size):
+    encoder = DjangoJSONEncoder(separators=(',', ':'))
+    lines = []
+    for row in rows:
+        lines.append(encoder.encode(dict(zip(columns, row))) + '\n')
+        if len(lines) >= batch_size:
+            yield ''.join(lines)
+            lines = []
+    if lines:
+        yield ''.join(lines)
+
+# Characters XML 1.0 does not allow, even escaped
+XML_ILLEGAL = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]')
+
+def xlsx_cell(value):
+    value = export_value(value)
+    if isinstance(value, bool):
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float, decimal.Decimal)):
+        return f'<c><v>{value}</v></c>'
+    if value == '':
+        return '<c/>'
+    text = escape(XML_ILLEGAL.sub('', str(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+def xlsx_row(values):
+    return '<row>' + ''.join(xlsx_cell(value) for value in values) + '</row>'
+
+XLSX_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Export" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+def stream_xlsx(columns, rows, batch_size):
+    """
+    Write a single-sheet workbook row by row. The zip is written to a
+    non-seekable buffer (sizes go in data descriptors), so each batch of
+    rows can be sent as soon as it is compressed.
+    """
+    buffer = ChunkBuffer()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as workbook:
+        for name, content in XLSX_PARTS.items():
+            workbook.writestr(name, content)
+        with workbook.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                b'<sheetData>'
+            )
+            sheet.write(xlsx_row(columns).encode('utf-8'))
+            yield buffer.take()
+            lines = []
+            for row in rows:
+                lines.append(xlsx_row(row))
+                if len(lines) >= batch_size:
+                    sheet.write(''.join(lines).encode('utf-8'))
+                    lines = []
+                    yield buffer.take()
+            if lines:
+                sheet.write(''.join(lines).encode('utf-8'))
+            sheet.write(b'</sheetData></worksheet>')
+    yield buffer.take()
+
+EXPORT_WRITERS = {
+    'csv': stream_csv,
+    'xlsx': stream_xlsx,
+    'ndjson': stream_ndjson,
+}
+
+def export_columns(serializer, queryset):
+    """
+    (header, lookup, field) for each serializer field an export can read
+    with values(); `field` is set when its to_representation() has to run
+    on the value (custom read-only fields such as ReferenceField).
+    """
+    annotations = queryset.query.annotations
+    columns = []
+    for name, field in serializer.fields.items():
+        if field.write_only or field.source == '*':
+            continue
+        attrs = field.source.split('.')
+        if len(attrs) == 1 and attrs[0] in annotations:
+            columns.append((name, attrs[0], None))
+            continue
+        model = queryset.model
+        for attr in attrs:
+            try:
+                model_field = model._meta.get_field(attr) if model else None
+            except FieldDoesNotExist:
+                model_field = None
+            if model_field is None or not model_field.concrete:
+                # Methods, properties and reverse relations
+                break
+            model = model_field.related_model
+        else:
+            converter = None
+            if isinstance(field, serializers.ReadOnlyField) and type(field) is not serializers.ReadOnlyField:
+                converter = field
+            columns.append((name, '__'.join(attrs), converter))
+    return columns
+
+class ExportViewSetMixin:
+    """
+    ViewSet mixin streaming the list action as CSV, XLSX or NDJSON on
+    ``?format=csv|xlsx|ndjson``.
+    """
+    export_actions = ('list',)
+    export_chunk_size = 2000
+
+    def is_export(self):
+        renderer = getattr(getattr(self, 'request', None), 'accepted_renderer', None)
+        return isinstance(renderer, ExportRenderer)
+
+    def get_renderers(self):
+        renderers = super().get_renderers()
+        if getattr(self, 'action', None) in self.export_actions:
+            renderers += [renderer() for renderer in EXPORT_RENDERERS]
+        return renderers
+
+    def handle_exception(self, exc):
+        # Errors are reported as JSON whatever the export format
+        if self.is_export():
+            self.request.accepted_renderer = JSONRenderer()
+            self.request.accepted_media_type = JSONRenderer.media_type
+        return super().handle_exception(exc)
+
+    def list(self, request, *args, **kwargs):
+        if not self.is_export():
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        if not queryset.query.order_by and getattr(self, 'ordering', None):
+            queryset = queryset.order_by(*self.ordering)
+        return self.export_response(queryset, request.accepted_renderer)
+
+    def export_response(self, queryset, renderer):
+        columns = export_columns(self.get_serializer(), queryset)
+        headers = [header for header, _, _ in columns]
+        converters = [
+            (position, field) for position, (_, _, field) in enumerate(columns) if field is not None
+        ]
+        values = queryset.values_list(*[lookup for _, lookup, _ in columns])
+
+        def rows():
+            for row in values.iterator(chunk_size=self.export_chunk_size):
+                if converters:
+                    row = list(row)
+                    for position, field in converters:
+                        if row[position] is not None:
+                            row[position] = field.to_representation(row[position])
+                yield row
+
+        content = EXPORT_WRITERS[renderer.format](headers, rows(), self.export_chunk_size)
+        content_type = renderer.media_type
+        if renderer.charset:
+            content_type = f'{content_type}; charset={renderer.charset}'
+        response = StreamingHttpResponse(content, content_type=content_type)
+        name = slugify(queryset.model._meta.verbose_name_plural)
+        stamp = timezone.localtime().strftime('%Y%m%d-%H%M%S')
+        response['Content-Disposition'] = f'attachment; filename="{name}-{stamp}.{renderer.format}"'
+        return response
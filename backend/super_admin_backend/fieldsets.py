@@ -0,0 +1,178 @@
+"""
+Sparse fieldsets for the REST API.
+
+Clients can ask for a subset of a serializer's fields with
+``?fields=name,code``, drop fields with ``?omit=custom_settings`` and
+replace related primary keys by nested objects with ``?expand=school``.
+Dotted names (``?fields=user.email``) apply to nested serializers.
+
+``SparseFieldsetMixin`` does the output side on serializers and
+``SparseFieldsetViewSetMixin`` trims the list/retrieve queryset with
+``.only()`` and ``select_related()`` so that unused columns and joins are
+not read from the database either.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+SPARSE_PARAMS = ('fields', 'omit', 'expand')
+
+def parse_field_paths(value):
+    """Turn 'a,b.c,b.d' into {'a': {}, 'b': {'c': {}, 'd': {}}}"""
+    if value is None or isinstance(value, dict):
+        return value
+    if isinstance(value, str):
+        value = value.split(',')
+    tree = {}
+    for path in value:
+        node = tree
+        for part in path.strip().split('.'):
+            if part:
+                node = node.setdefault(part, {})
+    return tree
+
+class SparseFieldsetMixin:
+    """
+    Serializer mixin accepting ``fields``, ``omit`` and ``expand`` kwargs.
+
+    ``Meta.expandable_fields`` maps a field name to the serializer class
+    rendered for it on ``?expand=``. ``Meta.field_dependencies`` maps
+    method fields and properties to the model fields they read, which lets
+    ``SparseFieldsetViewSetMixin`` trim the queryset safely.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._sparse_fields = parse_field_paths(kwargs.pop('fields', None))
+        self._sparse_omit = parse_field_paths(kwargs.pop('omit', None)) or {}
+        self._sparse_expand = parse_field_paths(kwargs.pop('expand', None)) or {}
+        super().__init__(*args, **kwargs)
+
+    def get_nested_sparse_kwargs(self, name):
+        """Sparse fieldset kwargs for the nested serializer of field `name`"""
+        fields = None
+        if self._sparse_fields is not None:
+            fields = self._sparse_fields.get(name) or None
+        return {
+            'fields': fields,
+            'omit': self._sparse_omit.get(name),
+            'expand': self._sparse_expand.get(name),
+        }
+
+    def get_fields(self):
+        fields = super().get_fields()
+
+        # Swap expanded relations for their nested serializer
+        expandable = getattr(self.Meta, 'expandable_fields', {})
+        for name in self._sparse_expand:
+            if name in expandable and name in fields:
+                fields[name] = expandable[name](
+                    read_only=True, **self.get_nested_sparse_kwargs(name)
+                )
+
+        if self._sparse_fields is not None:
+            fields = {
+                name: field for name, field in fields.items()
+                if name in self._sparse_fields
+            }
+        for name, subtree in self._sparse_omit.items():
+            if not subtree:
+                fields.pop(name, None)
+
+        # Hand dotted selections down to declared nested serializers
+        for name, field in fields.items():
+            nested = field.child if isinstance(field, serializers.ListSerializer) else field
+            if isinstance(nested, SparseFieldsetMixin) and name not in self._sparse_expand:
+                nested_kwargs = self.get_nested_sparse_kwargs(name)
+                nested._sparse_fields = nested_kwargs['fields']
+                nested._sparse_omit = nested_kwargs['omit'] or {}
+                nested._sparse_expand = nested_kwargs['expand'] or {}
+        return fields
+
+def get_field_requirements(serializer, model):
+    """
+    Return the (columns, joins) a serializer reads from `model`, or None
+    when a field reads something that cannot be worked out.
+    """
+    dependencies = getattr(serializer.Meta, 'field_dependencies', {})
+    columns = {model._meta.pk.name}
+    joins = {}
+
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        if name in dependencies:
+            columns.update(dependencies[name])
+            continue
+        if field.source == '*':
+            return None
+
+        attrs = field.source.split('.')
+        try:
+            model_field = model._meta.get_field(attrs[0])
+        except FieldDoesNotExist:
+            # Properties and methods are only safe when declared
+            return None
+        if not model_field.concrete:
+            # Reverse and many-to-many relations are loaded separately
+            continue
+
+        columns.add(attrs[0])
+        if not model_field.is_relation:
+            continue
+        if len(attrs) == 1 and not isinstance(field, serializers.BaseSerializer):
+            # Primary key only, the foreign key column is enough
+            continue
+
+        related_columns = joins.setdefault(attrs[0], set())
+        related_field = None
+        if len(attrs) == 2:
+            try:
+                related_field = model_field.related_model._meta.get_field(attrs[1])
+            except FieldDoesNotExist:
+                pass
+        if related_columns is not None and related_field is not None and related_field.concrete \
+                and not related_field.is_relation:
+            related_columns.add(attrs[1])
+        else:
+            # Whole related row needed (nested serializer, method, ...)
+            joins[attrs[0]] = None
+
+    for relation, related_columns in joins.items():
+        if related_columns:
+            columns.update(f'{relation}__{column}' for column in related_columns)
+    return columns, set(joins)
+
+class SparseFieldsetViewSetMixin:
+    """
+    ViewSet mixin passing ?fields= / ?omit= / ?expand= to the serializer
+    and trimming list/retrieve querysets to the columns and joins used.
+    """
+    sparse_actions = ('list', 'retrieve')
+
+    def has_sparse_params(self):
+        request = getattr(self, 'request', None)
+        return request is not None and request.method in SAFE_METHODS and any(
+            request.query_params.get(param) for param in SPARSE_PARAMS
+        )
+
+    def get_serializer(self, *args, **kwargs):
+        if self.has_sparse_params() and issubclass(self.get_serializer_class(), SparseFieldsetMixin):
+            for param in SPARSE_PARAMS:
+                value = self.request.query_params.get(param)
+                if value:
+                    kwargs.setdefault(param, value)
+        return super().get_serializer(*args, **kwargs)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action in self.sparse_actions and self.has_sparse_params():
+            requirements = get_field_requirements(self.get_serializer(), queryset.model)
+            if requirements is not None:
+                columns, joins = requirements
+                # select_related() without arguments would follow every
+                # foreign key, so only re-add joins that are actually used
+                queryset = queryset.select_related(None)
+                if joins:
+                    queryset = queryset.select_related(*joins)
+                queryset = queryset.only(*columns)
+        return queryset
@@ -0,0 +1,207 @@
+"""
+Query-plan audit of the list endpoints.
+
+Every viewset routed with a ``list`` action is inspected for its filterset
+fields and orderings. Each filter (with the default ordering) and each
+ordering is turned into the queryset the endpoint would run and passed to
+``EXPLAIN``. A filter counts as covered only when the plan searches the
+table through an index constrained on the filter column, or reads a
+partial index whose condition is on that column (how boolean filters are
+served: Django compiles them to a bare ``WHERE col``, which no composite
+index can search). Any other read of the table, including walking the
+ordering index and discarding rows (SQLite's ``SCAN t USING INDEX``), is
+a full scan. Plans are also checked for sorts that no index serves, and
+an index is suggested for each problem.
+
+Used by the audit_indexes management command and by the index coverage
+test. Views over models of third-party apps (e.g. ``auth.User``) are
+skipped, as their tables are not ours to index.
+"""
+import datetime
+import re
+import uuid
+from collections import namedtuple
+
+from django.conf import settings
+from django.db import connections
+from django.urls import URLPattern, URLResolver, get_resolver
+from rest_framework.filters import OrderingFilter
+
+QueryCheck = namedtuple('QueryCheck', [
+    'view', 'model', 'filter_field', 'ordering', 'full_scan', 'sorts', 'plan'
+])
+
+# Unfiltered orderings: walking an index in ORDER BY order ("SCAN t USING
+# INDEX") and stopping at the page size is not a full scan; reading the
+# table itself is
+FULL_SCAN_PATTERNS = {
+    'sqlite': r'\bSCAN (?:TABLE )?"?{table}"?(?! USING)(?:\s|$)',
+    'postgresql': r'Seq Scan on "?{table}"?\b',
+}
+# Filters: an index search constrained on the filter column
+COVERED_PATTERNS = {
+    'sqlite': r'\bSEARCH (?:TABLE )?"?{table}"? USING (?:COVERING )?INDEX \S+ \([^)]*\b{column}\s*[=<>]',
+    'postgresql': r'Index Cond: [^\n]*\b"?{column}"?\s*[=<>]',
+}
+# Filters: any read through a partial index on the filter column
+PARTIAL_INDEX_PATTERN = r'(?i)\busing (?:covering )?(?:index )?"?{name}"?(?:\s|$)'
+SORT_PATTERNS = {
+    'sqlite': r'USE TEMP B-TREE FOR (?:RIGHT PART OF )?ORDER BY',
+    'postgresql': r'\bSort\b',
+}
+
+def iter_patterns(patterns):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from iter_patterns(pattern.url_patterns)
+        elif isinstance(pattern, URLPattern):
+            yield pattern
+
+def list_views(urlconf=None):
+    """Viewset classes routed with a list action, in URL order"""
+    views = []
+    for pattern in iter_patterns(get_resolver(urlconf).url_patterns):
+        view = getattr(pattern.callback, 'cls', None)
+        actions = getattr(pattern.callback, 'actions', None) or {}
+        if view is None or 'list' not in actions.values() or view in views:
+            continue
+        if getattr(view, 'queryset', None) is None:
+            continue
+        views.append(view)
+    return views
+
+def is_local_model(model):
+    """Whether the model belongs to one of the project's own apps"""
+    return str(model._meta.app_config.path).startswith(str(settings.BASE_DIR))
+
+def filter_fields(view):
+    filterset_class = getattr(view, 'filterset_class', None)
+    if filterset_class is not None:
+        return [f.field_name for f in filterset_class.base_filters.values()]
+    fields = getattr(view, 'filterset_fields', None) or []
+    return list(fields)
+
+def default_ordering(view):
+    ordering = getattr(view, 'ordering', None) or view.queryset.model._meta.ordering or []
+    if isinstance(ordering, str):
+        ordering = [ordering]
+    return list(ordering)
+
+def ordering_options(view):
+    """Orderings a client can ask for, the default one first"""
+    options = [default_ordering(view)]
+    if any(issubclass(backend, OrderingFilter) for backend in getattr(view, 'filter_backends', [])):
+        for field in getattr(view, 'ordering_fields', None) or []:
+            if field != '__all__' and [field] not in options and [f'-{field}'] not in options:
+                options.append([field])
+    return [ordering for ordering in options if ordering]
+
+def sample_value(field):
+    """A value of the right type to filter `field` on; plans don't depend on it"""
+    if field.is_relation:
+        field = field.target_field
+    internal_type = field.get_internal_type()
+    if internal_type == 'UUIDField':
+        return uuid.uuid4()
+    if is_boolean(field):
+        return True
+    if internal_type.endswith(('IntegerField', 'AutoField')):
+        return 1
+    if internal_type == 'DateTimeField':
+        return datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+    if internal_type == 'DateField':
+        return datetime.date(2024, 1, 1)
+    if internal_type in ('DecimalField', 'FloatField'):
+        return 1
+    if field.choices:
+        return field.choices[0][0]
+    return 'x'
+
+def is_boolean(field):
+    return field.get_internal_type() in ('BooleanField', 'NullBooleanField')
+
+def condition_fields(condition):
+    """Names of the fields a Q condition looks up"""
+    for child in condition.children:
+        if isinstance(child, tuple):
+            yield child[0].split('__')[0]
+        else:
+            yield from condition_fields(child)
+
+def partial_indexes(model, field_name):
+    """Names of the model's partial indexes conditioned on `field_name`"""
+    return [
+        index.name for index in model._meta.indexes
+        if index.condition is not None and field_name in condition_fields(index.condition)
+    ]
+
+def is_covered(plan, vendor, table, model, field):
+    pattern = COVERED_PATTERNS.get(vendor)
+    if pattern is None:
+        return True
+    if re.search(pattern.format(table=table, column=re.escape(field.column)), plan):
+        return True
+    return any(
+        re.search(PARTIAL_INDEX_PATTERN.format(name=re.escape(name)), plan)
+        for name in partial_indexes(model, field.name)
+    )
+
+def check_query(view, filter_field, ordering, using='default'):
+    model = view.queryset.model
+    queryset = model._default_manager.using(using).all()
+    if filter_field:
+        field = model._meta.get_field(filter_field)
+        queryset = queryset.filter(**{filter_field: sample_value(field)})
+    page_size = getattr(settings, 'REST_FRAMEWORK', {}).get('PAGE_SIZE') or 20
+    queryset = queryset.order_by(*ordering)[:page_size]
+
+    vendor = connections[using].vendor
+    plan = queryset.explain()
+    table = re.escape(model._meta.db_table)
+    if filter_field:
+        full_scan = not is_covered(plan, vendor, table, model, field)
+    else:
+        full_scan = bool(re.search(FULL_SCAN_PATTERNS.get(vendor, '$^').format(table=table), plan))
+    sorts = bool(re.search(SORT_PATTERNS.get(vendor, '$^'), plan))
+    return QueryCheck(view, model, filter_field, ordering, full_scan, sorts, plan)
+
+def audit_list_views(views=None, all_orderings=False, using='default'):
+    """
+    EXPLAIN every filter (with the default ordering, or with every ordering
+    when `all_orderings`) and every ordering of the list views.
+    """
+    checks = []
+    for view in views or list_views():
+        if not is_local_model(view.queryset.model):
+            continue
+        orderings = ordering_options(view)
+        filter_orderings = orderings if all_orderings else orderings[:1]
+        for filter_field in filter_fields(view):
+            for ordering in filter_orderings or [[]]:
+                checks.append(check_query(view, filter_field, ordering, using))
+        for ordering in orderings:
+            checks.append(check_query(view, None, ordering, using))
+    return checks
+
+def problems(checks):
+    """Filtered queries that scan the whole table, and sorts without an index"""
+    return [
+        check for check in checks
+        if (check.filter_field and check.full_scan) or check.sorts
+    ]
+
+def suggested_index(check):
+    """Definition of the index that would serve a problem query"""
+    condition = None
+    fields = [check.filter_field] if check.filter_field else []
+    if check.filter_field and is_boolean(check.model._meta.get_field(check.filter_field)):
+        # One partial index per value: filter=true and filter=false
+        condition, fields = check.filter_field, []
+    for term in check.ordering:
+        if term.lstrip('-') not in fields:
+            fields.append(term)
+    definition = f"fields=[{', '.join(repr(field) for field in fields)}]"
+    if condition:
+        name = f'{check.model._meta.db_table}_{condition}_idx'
+        definition += f", condition=Q({condition}=True), name='{name}'"
+    return f'models.Index({definition})'
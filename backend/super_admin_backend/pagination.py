@@ -0,0 +1,157 @@
+"""
+Pagination for the REST API.
+
+``StandardPagination`` keeps the page-number behaviour by default. A client
+can opt into keyset pagination for a request with ``?pagination=cursor`` (or
+by following a ``cursor`` link). Keyset pages are ordered by the view's first
+``ordering`` field with the primary key as a tiebreak, and each page is a
+``WHERE (field, pk) < (last_field, last_pk)`` range scan, so deep pages cost
+the same as the first one and no ``COUNT(*)`` is run.
+
+Keys must be non-null columns of the model itself: orderings on related
+fields (``school__name``), nullable columns (NULLs compare neither above
+nor below a key, so rows would be skipped or repeated) or annotations
+fall back to page numbers.
+"""
+import base64
+import json
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+def encode_cursor_value(value):
+    # Full isoformat(): DjangoJSONEncoder truncates microseconds, which
+    # would make rows sharing a millisecond fall between two pages
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+class KeysetPagination(BasePagination):
+    """Forward and backward keyset pagination on (ordering field, pk)"""
+    page_size = api_settings.PAGE_SIZE
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_ordering(self, request, queryset, view):
+        """Return the first ordering term, honouring ?ordering= if allowed"""
+        for backend in getattr(view, 'filter_backends', []):
+            if issubclass(backend, OrderingFilter):
+                ordering = backend().get_ordering(request, queryset, view)
+                if ordering:
+                    return ordering[0]
+        ordering = getattr(view, 'ordering', None) or queryset.query.order_by or queryset.model._meta.ordering
+        if isinstance(ordering, str):
+            return ordering
+        return ordering[0] if ordering else None
+
+    def is_keyable(self, model, name):
+        """Whether `name` is a non-null column of `model` itself"""
+        if name == 'pk':
+            return True
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return False
+        return field.concrete and not field.is_relation and not field.null
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            return cursor['v'], cursor['pk'], bool(cursor.get('r'))
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, obj, reverse):
+        cursor = {'v': getattr(obj, self.field), 'pk': obj.pk}
+        if reverse:
+            cursor['r'] = 1
+        encoded = base64.urlsafe_b64encode(
+            json.dumps(cursor, default=encode_cursor_value).encode('ascii')
+        ).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        ordering = self.get_ordering(request, queryset, view)
+        if ordering is None:
+            return None
+
+        if not isinstance(ordering, str) or not self.is_keyable(queryset.model, ordering.lstrip('-')):
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.descending = ordering.startswith('-')
+        self.field = ordering.lstrip('-')
+        cursor = self.decode_cursor(request)
+        reverse = cursor[2] if cursor else False
+
+        # Walking backwards flips the comparison and the sort direction
+        scan_descending = self.descending != reverse
+        if cursor:
+            value, pk = cursor[0], cursor[1]
+            lookup = 'lt' if scan_descending else 'gt'
+            queryset = queryset.filter(
+                Q(**{f'{self.field}__{lookup}': value}) |
+                Q(**{self.field: value, f'pk__{lookup}': pk})
+            )
+        prefix = '-' if scan_descending else ''
+        queryset = queryset.order_by(f'{prefix}{self.field}', f'{prefix}pk')
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        self.next_link = None
+        self.previous_link = None
+        if rows:
+            has_next = True if reverse else has_more
+            has_previous = has_more if reverse else cursor is not None
+            if has_next:
+                self.next_link = self.encode_cursor(rows[-1], reverse=False)
+            if has_previous:
+                self.previous_link = self.encode_cursor(rows[0], reverse=True)
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.next_link,
+            'previous': self.previous_link,
+            'results': data
+        })
+
+class StandardPagination(PageNumberPagination):
+    """Page-number pagination with per-request opt-in keyset pagination"""
+    mode_query_param = 'pagination'
+    keyset_class = KeysetPagination
+
+    def use_keyset(self, request):
+        params = request.query_params
+        return (
+            params.get(self.mode_query_param) == 'cursor' or
+            self.keyset_class.cursor_query_param in params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.use_keyset(request):
+            keyset = self.keyset_class()
+            page = keyset.paginate_queryset(queryset, request, view)
+            if page is not None:
+                self.keyset = keyset
+                return page
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
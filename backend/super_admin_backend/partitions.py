@@ -0,0 +1,344 @@
+"""
+Monthly partitions of the append-only log tables.
+
+``PARTITIONED_MODELS`` lists the tables whose rows are partitioned by the
+calendar month of ``created_at`` (RecentActivity and AuditLog). The last
+``hot_months`` months, the current one included, stay in the table, which
+alone serves the API: listings, exports and statistics only ever see the
+hot window. Older months are detached by ``archive_partitions``: the
+month's rows are written to a gzipped NDJSON file under
+``PARTITION_ARCHIVE_ROOT`` and deleted from the table, and an
+ArchivedPartition row catalogues the file with its per-day row counts
+(which keep the API request counts of PlatformMetrics recomputable).
+``restore_partition`` moves a month back into the table.
+
+Each run of the command also purges the archived rows whose school (or
+other cascading foreign key) has been deleted since, as CASCADE did to
+their rows in the table.
+"""
+import datetime
+import gzip
+import hashlib
+import json
+import os
+from collections import Counter, defaultdict
+
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, models, router, transaction
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+def partition_options(label):
+    options = getattr(settings, 'PARTITIONED_MODELS', {}).get(label)
+    if options is None:
+        raise ImproperlyConfigured(f'{label} is not in PARTITIONED_MODELS')
+    # Statistics read the last 30 days from the table
+    if options.get('hot_months', 2) < 2:
+        raise ImproperlyConfigured(f'{label} must keep at least 2 hot months')
+    return options
+
+def partitioned_models():
+    return list(getattr(settings, 'PARTITIONED_MODELS', {}))
+
+def archive_root():
+    return getattr(settings, 'PARTITION_ARCHIVE_ROOT', os.path.join(settings.BASE_DIR, 'archive'))
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+def month_of(moment):
+    """First day of the month of a datetime (local time) or date"""
+    if isinstance(moment, datetime.datetime):
+        moment = timezone.localtime(moment) if timezone.is_aware(moment) else moment
+    return datetime.date(moment.year, moment.month, 1)
+
+def month_range(month):
+    """Aware [start, end) datetimes of `month`"""
+    start = datetime.datetime.combine(month, datetime.time.min)
+    end = datetime.datetime.combine(add_months(month, 1), datetime.time.min)
+    return timezone.make_aware(start), timezone.make_aware(end)
+
+def hot_start(label, today=None):
+    """First month kept in the table"""
+    today = today or timezone.localdate()
+    return add_months(month_of(today), 1 - partition_options(label)['hot_months'])
+
+def archivable_months(label, today=None):
+    """Months before the hot window that still have rows in the table"""
+    rows = apps.get_model(label)._default_manager.order_by('created_at').values_list(
+        'created_at', flat=True
+    )
+    hot, _ = month_range(hot_start(label, today))
+    months = []
+    cursor = None
+    while True:
+        # One index seek per month that has rows
+        following = rows.filter(created_at__lt=hot)
+        if cursor is not None:
+            following = following.filter(created_at__gte=cursor)
+        first = following.first()
+        if first is None:
+            return months
+        months.append(month_of(first))
+        _, cursor = month_range(months[-1])
+
+def archived_partitions(label, start=None, end=None):
+    """Catalogued partitions of `label` overlapping [start, end) (dates or datetimes)"""
+    from compliance.models import ArchivedPartition
+    partitions = ArchivedPartition.objects.filter(model=label)
+    if start is not None:
+        partitions = partitions.filter(month__gte=month_of(start))
+    if end is not None:
+        if isinstance(end, datetime.datetime):
+            step = datetime.timedelta(microseconds=1)
+        else:
+            step = datetime.timedelta(days=1)
+        partitions = partitions.filter(month__lte=month_of(end - step))
+    return partitions
+
+def archived_day_counts(label, first, last):
+    """Rows per day in the archived partitions, for the days of [first, last]"""
+    counts = Counter()
+    for day_counts in archived_partitions(label, first, last + datetime.timedelta(days=1)).values_list(
+        'day_counts', flat=True
+    ):
+        for day, count in day_counts.items():
+            day = datetime.date.fromisoformat(day)
+            if first <= day <= last:
+                counts[day] += count
+    return counts
+
+def partition_path(label, month):
+    return os.path.join(label.lower().replace('.', '_'), f'{month:%Y-%m}.ndjson.gz')
+
+def write_rows(rows, path):
+    """Write dicts of column values to a gzipped NDJSON file; returns (rows, sha256, size)"""
+    encoder = DjangoJSONEncoder(separators=(',', ':'))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    count = 0
+    with open(path, 'wb') as raw:
+        with gzip.GzipFile(fileobj=raw, mode='wb', mtime=0) as archive:
+            for row in rows:
+                archive.write((encoder.encode(row) + '\n').encode('utf-8'))
+                count += 1
+        raw.flush()
+        os.fsync(raw.fileno())
+    digest = hashlib.sha256()
+    with open(path, 'rb') as written:
+        for block in iter(lambda: written.read(1 << 20), b''):
+            digest.update(block)
+    return count, digest.hexdigest(), os.path.getsize(path)
+
+def write_partition_file(queryset, fields, path):
+    """Stream the rows of `queryset` to a gzipped NDJSON file; returns (rows, sha256, size)"""
+    names = [field.attname for field in fields]
+    temporary = f'{path}.part'
+    written = write_rows(
+        (dict(zip(names, row)) for row in queryset.values_list(*names).iterator(chunk_size=2000)),
+        temporary
+    )
+    os.replace(temporary, path)
+    return written
+
+def archive_partition(label, month):
+    """
+    Detach `month` of `label` to its archive file. Returns the
+    ArchivedPartition, or None when the month has no rows.
+    """
+    from compliance.models import ArchivedPartition
+    if month >= hot_start(label):
+        raise ValueError(f'{month:%Y-%m} is still in the hot window of {label}')
+    if ArchivedPartition.objects.filter(model=label, month=month).exists():
+        raise ValueError(f'{month:%Y-%m} of {label} is already archived; restore it first')
+
+    model = apps.get_model(label)
+    start, end = month_range(month)
+    rows = model._default_manager.filter(created_at__gte=start, created_at__lt=end)
+    if not rows.exists():
+        return None
+
+    relative = partition_path(label, month)
+    path = os.path.join(archive_root(), relative)
+    written, checksum, size = write_partition_file(
+        rows.order_by('created_at'), model._meta.concrete_fields, path
+    )
+
+    using = router.db_for_write(model)
+    try:
+        with transaction.atomic(using=using):
+            day_counts = {
+                day.isoformat(): count
+                for day, count in rows.annotate(day=TruncDate('created_at')).order_by().values(
+                    'day'
+                ).annotate(count=Count('pk')).values_list('day', 'count')
+            }
+            if sum(day_counts.values()) != written:
+                # Rows were added to the month while it was being written
+                raise ValueError(f'{month:%Y-%m} of {label} changed while archiving; try again')
+            # Moving rows is not deleting them: a raw DELETE keeps the
+            # delete signals (metrics invalidation) from firing
+            table = connections[using].ops.quote_name(model._meta.db_table)
+            column = connections[using].ops.quote_name(model._meta.get_field('created_at').column)
+            with connections[using].cursor() as cursor:
+                cursor.execute(
+                    f'DELETE FROM {table} WHERE {column} >= %s AND {column} < %s',
+                    [
+                        connections[using].ops.adapt_datetimefield_value(start),
+                        connections[using].ops.adapt_datetimefield_value(end),
+                    ]
+                )
+            return ArchivedPartition.objects.create(
+                model=label, month=month, path=relative, file_size=size, checksum=checksum,
+                row_count=written, day_counts=day_counts
+            )
+    except Exception:
+        os.remove(path)
+        raise
+
+def iter_partition_file(partition):
+    with gzip.open(os.path.join(archive_root(), partition.path), 'rt', encoding='utf-8') as archive:
+        for line in archive:
+            yield json.loads(line)
+
+def row_instance(model, fields, row):
+    """Unsaved `model` instance of an archived row"""
+    return model(**{
+        name: fields[name].to_python(value) for name, value in row.items() if name in fields
+    })
+
+def existing_targets(field, values, chunk_size=500):
+    """The values of foreign key `field` whose target row still exists"""
+    values = list(values)
+    found = set()
+    for position in range(0, len(values), chunk_size):
+        found.update(field.related_model._default_manager.filter(**{
+            f'{field.target_field.attname}__in': values[position:position + chunk_size]
+        }).values_list(field.target_field.attname, flat=True))
+    return found
+
+def restore_partition(label, month, batch_size=1000):
+    """
+    Move an archived month back into the table; returns the number of rows
+    inserted. Rows already in the table are skipped, and so are rows whose
+    cascading foreign key points to a deleted row; other foreign keys to
+    deleted rows are set to NULL, as their on_delete would have done.
+    """
+    from compliance.models import ArchivedPartition
+    partition = ArchivedPartition.objects.get(model=label, month=month)
+    model = apps.get_model(label)
+    manager = model._default_manager
+    fields = {field.attname: field for field in model._meta.concrete_fields}
+    relations = [field for field in fields.values() if field.many_to_one]
+    restored = 0
+
+    def save(batch):
+        existing = set(manager.filter(pk__in=[obj.pk for obj in batch]).values_list('pk', flat=True))
+        batch = [obj for obj in batch if obj.pk not in existing]
+        for field in relations:
+            found = existing_targets(field, {getattr(obj, field.attname) for obj in batch} - {None})
+            kept = []
+            for obj in batch:
+                if getattr(obj, field.attname) not in found | {None}:
+                    if field.remote_field.on_delete is models.CASCADE or not field.null:
+                        continue
+                    setattr(obj, field.attname, None)
+                kept.append(obj)
+            batch = kept
+        created_at = [obj.created_at for obj in batch]
+        manager.bulk_create(batch)
+        # bulk_create stamps auto_now_add fields; put the original times back
+        for obj, moment in zip(batch, created_at):
+            obj.created_at = moment
+        manager.bulk_update(batch, ['created_at'])
+        return len(batch)
+
+    with transaction.atomic(using=router.db_for_write(model)):
+        batch = []
+        for row in iter_partition_file(partition):
+            batch.append(row_instance(model, fields, row))
+            if len(batch) >= batch_size:
+                restored += save(batch)
+                batch = []
+        if batch:
+            restored += save(batch)
+        partition.delete()
+    os.remove(os.path.join(archive_root(), partition.path))
+    return restored
+
+def rewrite_partition(partition, keep):
+    """
+    Rewrite the file of `partition` with the rows `keep(row)` accepts and
+    recount its catalog; the partition is dropped once it has no rows left.
+    Returns the number of rows removed.
+    """
+    model = apps.get_model(partition.model)
+    created_at = model._meta.get_field('created_at')
+    day_counts = Counter()
+
+    def kept():
+        for row in iter_partition_file(partition):
+            if keep(row):
+                day = timezone.localdate(created_at.to_python(row['created_at']))
+                day_counts[day.isoformat()] += 1
+                yield row
+
+    path = os.path.join(archive_root(), partition.path)
+    temporary = f'{path}.part'
+    written, checksum, size = write_rows(kept(), temporary)
+    removed = partition.row_count - written
+    if not removed:
+        os.remove(temporary)
+        return 0
+    try:
+        if written:
+            partition.file_size, partition.checksum, partition.row_count = size, checksum, written
+            partition.day_counts = dict(day_counts)
+            partition.save()
+        else:
+            partition.delete()
+    except Exception:
+        os.remove(temporary)
+        raise
+    if written:
+        os.replace(temporary, path)
+    else:
+        os.remove(temporary)
+        os.remove(path)
+    return removed
+
+def cascading_fields(model):
+    """Foreign keys of `model` whose deletion cascades to its rows"""
+    return [
+        field for field in model._meta.concrete_fields
+        if field.many_to_one and field.remote_field.on_delete is models.CASCADE
+    ]
+
+def purge_orphaned_rows(label):
+    """
+    Remove the archived rows of `label` whose cascading foreign key points
+    to a deleted row, as CASCADE did to their rows in the table; returns
+    the number of rows removed. Reads each archive file once, and rewrites
+    only the files holding such rows.
+    """
+    fields = cascading_fields(apps.get_model(label))
+    purged = 0
+    for partition in archived_partitions(label):
+        referenced = defaultdict(set)
+        for row in iter_partition_file(partition):
+            for field in fields:
+                if row[field.attname] is not None:
+                    referenced[field].add(field.to_python(row[field.attname]))
+        deleted = {
+            field.attname: {str(value) for value in values - existing_targets(field, values)}
+            for field, values in referenced.items()
+        }
+        if any(deleted.values()):
+            purged += rewrite_partition(partition, lambda row: not any(
+                str(row[attname]) in values for attname, values in deleted.items()
+            ))
+    return purged
@@ -0,0 +1,219 @@
+"""
+Publish/subscribe for the live feed.
+
+``publish(topic, data)`` encodes an event once and hands it to the broker
+configured in ``LIVE_FEED_BROKER``. The broker delivers it to the ``hub``
+of every process, and each hub fans it out to its subscribers: one
+bounded asyncio queue per open stream, fed with ``call_soon_threadsafe``
+so events can be published from sync code (signals, on_commit callbacks,
+management commands) on any thread.
+
+``LocalBroker`` delivers straight to the hub of the publishing process,
+which is enough for a single ASGI worker. ``RedisBroker`` relays events
+through a Redis channel so every worker sees every event; other brokers
+can be plugged in with a dotted class path. A broker's ``shared`` flag
+tells whether other processes (management commands) can publish to the
+web workers through it.
+
+The hub keeps the last ``LIVE_FEED_BACKLOG`` events so a client that
+reconnects with ``Last-Event-ID`` gets what it missed. A subscriber that
+falls ``LIVE_FEED_QUEUE_SIZE`` events behind is closed rather than
+buffered without bound; it reconnects and catches up from the backlog.
+"""
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.module_loading import import_string
+
+class Subscription:
+    """Queue of the events of `topics` (all when empty) for one stream"""
+
+    def __init__(self, hub, topics, queue_size):
+        self.hub = hub
+        self.topics = topics
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(queue_size)
+        self.overflowed = False
+        self.replay = []
+
+    def wants(self, event):
+        return not self.topics or event['topic'] in self.topics
+
+    def push(self, event):
+        """Queue `event`; safe to call from any thread"""
+        if not self.wants(event):
+            return
+        try:
+            self.loop.call_soon_threadsafe(self.put, event)
+        except RuntimeError:
+            # The stream's event loop is gone
+            self.close()
+
+    def put(self, event):
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    async def get(self, timeout):
+        """Next event, or None when nothing arrived within `timeout` seconds"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.hub.unsubscribe(self)
+
+class Hub:
+    """Fans events out to the subscribers of this process"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscribers = set()
+        self.backlog = deque(maxlen=getattr(settings, 'LIVE_FEED_BACKLOG', 200))
+
+    def deliver(self, event):
+        with self.lock:
+            self.backlog.append(event)
+            subscribers = list(self.subscribers)
+        for subscription in subscribers:
+            subscription.push(event)
+
+    def subscribe(self, topics=(), last_event_id=None):
+        """
+        Subscribe the running event loop to `topics`. With `last_event_id`,
+        ``replay`` holds the backlog events after it, or is None when events
+        after it may have left the backlog already.
+        """
+        subscription = Subscription(
+            self, set(topics), getattr(settings, 'LIVE_FEED_QUEUE_SIZE', 100)
+        )
+        with self.lock:
+            self.subscribers.add(subscription)
+            backlog = list(self.backlog)
+        if last_event_id:
+            try:
+                after = int(last_event_id, 16)
+            except ValueError:
+                after = None
+            if after is None or not backlog or after < int(backlog[0]['id'], 16):
+                subscription.replay = None
+            else:
+                subscription.replay = [
+                    event for event in backlog
+                    if int(event['id'], 16) > after and subscription.wants(event)
+                ]
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            self.subscribers.discard(subscription)
+
+    def has_subscribers(self, topic):
+        with self.lock:
+            subscribers = list(self.subscribers)
+        return any(subscription.wants({'topic': topic}) for subscription in subscribers)
+
+hub = Hub()
+
+class LocalBroker:
+    """Delivers events to this process's hub only"""
+    shared = False
+
+    def __init__(self, hub, **options):
+        self.hub = hub
+
+    def publish(self, event):
+        self.hub.deliver(event)
+
+    async def start(self):
+        """Called from each subscribing event loop before it subscribes"""
+
+class RedisBroker(LocalBroker):
+    """
+    Relays events through the Redis channel `channel`, so subscribers of
+    every process receive them. Needs the redis package.
+    """
+    shared = True
+
+    def __init__(self, hub, url='redis://localhost:6379/0', channel='live-feed', **options):
+        super().__init__(hub)
+        self.url = url
+        self.channel = channel
+        self.client = None
+        self.listeners = {}
+
+    def redis(self):
+        try:
+            import redis
+            import redis.asyncio
+        except ImportError:
+            raise ImproperlyConfigured('RedisBroker needs the redis package')
+        return redis
+
+    def publish(self, event):
+        if self.client is None:
+            self.client = self.redis().Redis.from_url(self.url)
+        self.client.publish(self.channel, json.dumps(event))
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        listener = self.listeners.get(loop)
+        if listener is None or listener.done():
+            self.listeners[loop] = loop.create_task(self.listen())
+
+    async def listen(self):
+        client = self.redis().asyncio.Redis.from_url(self.url)
+        while True:
+            try:
+                async with client.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    async for message in pubsub.listen():
+                        if message['type'] == 'message':
+                            self.hub.deliver(json.loads(message['data']))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Lost the connection; events published meanwhile are missed
+                await asyncio.sleep(1)
+
+@lru_cache(maxsize=None)
+def get_broker():
+    options = dict(getattr(settings, 'LIVE_FEED_BROKER', None) or {})
+    broker_class = import_string(options.pop('class', 'super_admin_backend.pubsub.LocalBroker'))
+    return broker_class(hub, **options)
+
+_last_event_id = 0
+_event_id_lock = threading.Lock()
+
+def event_id():
+    """Event ids are hex nanosecond timestamps, so they sort by time"""
+    global _last_event_id
+    with _event_id_lock:
+        # Strictly increasing, even for events of the same nanosecond
+        _last_event_id = max(time.time_ns(), _last_event_id + 1)
+        return f'{_last_event_id:x}'
+
+def publish(topic, data):
+    """Send `data` to the subscribers of `topic` in every process"""
+    event = {
+        'id': event_id(),
+        'topic': topic,
+        'data': json.dumps(data, cls=DjangoJSONEncoder),
+    }
+    get_broker().publish(event)
+    return event
+
+async def subscribe(topics=(), last_event_id=None):
+    await get_broker().start()
+    return hub.subscribe(topics, last_event_id)
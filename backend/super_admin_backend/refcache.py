@@ -0,0 +1,156 @@
+"""
+In-process cache for small reference tables (school tiers, integrations,
+system health components).
+
+Each worker keeps the whole table in memory and, at most every
+``REFERENCE_CACHE_CHECK_INTERVAL`` seconds, checks the table's
+``validator`` aggregates, e.g. its row count and latest ``auto_now``
+timestamp, reloading the rows when they change. The version is read from
+the table itself, so writes of every process (other web workers, the
+``probe_health`` and import commands) are picked up whatever the cache
+backend; the worker that made the change sees it straight away.
+
+A table without a validator falls back to a version counter in the
+Django cache, bumped when a save or delete commits. That counter is only
+shared between workers when ``CACHES`` points at a shared backend such
+as Redis.
+
+Serializers use ``ReferenceField`` to render a related row's attribute
+from the foreign key column, without a join or a query.
+"""
+import threading
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Max
+from django.db.models.signals import post_save, post_delete
+from rest_framework import serializers
+from rest_framework.response import Response
+
+class ReferenceCache:
+    """Whole-table, per-process cache of `model_label`, keyed by pk"""
+
+    def __init__(self, model_label, validator=None):
+        self.model_label = model_label
+        # {name: aggregate} whose values change with every write
+        self.validator = validator
+        self.version_key = f'refcache:{model_label.lower()}:version'
+        self.lock = threading.Lock()
+        self.rows = None
+        self.version = None
+        self.checked_at = 0
+
+    def __deepcopy__(self, memo):
+        # Serializer fields are deep-copied per serializer; keep sharing
+        return self
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+    def connect(self):
+        """Bump the version whenever a row is saved or deleted"""
+        for signal in (post_save, post_delete):
+            signal.connect(
+                self.changed, sender=self.model,
+                dispatch_uid=f'refcache:{self.model_label}:{signal is post_save}'
+            )
+
+    def changed(self, sender, **kwargs):
+        self.rows = None
+        transaction.on_commit(self.bump)
+
+    def bump(self):
+        self.rows = None
+        if self.validator:
+            return
+        try:
+            cache.incr(self.version_key)
+        except ValueError:
+            self.shared_version()
+
+    def shared_version(self):
+        if self.validator:
+            return tuple(self.model._default_manager.aggregate(**self.validator).values())
+        version = cache.get(self.version_key)
+        if version is None:
+            # Start from the clock so a counter lost from the cache never
+            # comes back with a value some worker already holds
+            cache.add(self.version_key, int(time.time() * 1000), None)
+            version = cache.get(self.version_key)
+        return version
+
+    def load(self):
+        now = time.monotonic()
+        interval = getattr(settings, 'REFERENCE_CACHE_CHECK_INTERVAL', 1.0)
+        rows = self.rows
+        if rows is not None and now - self.checked_at < interval:
+            return rows
+
+        version = self.shared_version()
+        with self.lock:
+            if self.rows is None or version != self.version:
+                self.rows = {obj.pk: obj for obj in self.model._default_manager.all()}
+                self.version = version
+            self.checked_at = now
+            return self.rows
+
+    def all(self, ordering=None):
+        rows = list(self.load().values())
+        for field in reversed(ordering or []):
+            name = field.lstrip('-')
+            rows.sort(key=lambda obj: getattr(obj, name), reverse=field.startswith('-'))
+        return rows
+
+    def get(self, pk):
+        rows = self.load()
+        try:
+            return rows[pk]
+        except KeyError:
+            pass
+        # Foreign key values may come in as strings (e.g. UUIDs from values())
+        pk = self.model._meta.pk.to_python(pk)
+        return rows.get(pk)
+
+class ReferenceField(serializers.ReadOnlyField):
+    """
+    Read-only attribute of a cached reference row, looked up from the
+    foreign key column given as `source`, e.g.
+    ``ReferenceField(tier_cache, 'name', source='tier_id')``.
+    """
+
+    def __init__(self, reference_cache, attribute, **kwargs):
+        self.reference_cache = reference_cache
+        self.attribute = attribute
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        obj = self.reference_cache.get(value) if value is not None else None
+        return getattr(obj, self.attribute) if obj is not None else None
+
+class ReferenceCacheViewSetMixin:
+    """Serve unfiltered list requests of a reference table from its cache"""
+    reference_cache = None
+
+    def list(self, request, *args, **kwargs):
+        if set(request.query_params) - {'page', 'page_size'}:
+            return super().list(request, *args, **kwargs)
+        rows = self.reference_cache.all(getattr(self, 'ordering', None))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        return Response(self.get_serializer(rows, many=True).data)
+
+# Saves stamp updated_at or last_check (auto_now); deletes change the count
+tier_cache = ReferenceCache(
+    'schools.SchoolTier', validator={'rows': Count('pk'), 'latest': Max('updated_at')}
+)
+integration_cache = ReferenceCache(
+    'integrations.Integration', validator={'rows': Count('pk'), 'latest': Max('updated_at')}
+)
+health_cache = ReferenceCache(
+    'dashboard.SystemHealth', validator={'rows': Count('pk'), 'latest': Max('last_check')}
+)
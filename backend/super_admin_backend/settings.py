@@ -128,7 +128,7 @@ REST_FRAMEWORK = {
         'rest_framework.filters.SearchFilter',
         'rest_framework.filters.OrderingFilter',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'super_admin_backend.pagination.StandardPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_RENDERER_CLASSES': [
         'rest_framework.renderers.JSONRenderer',
@@ -154,6 +154,97 @@ SIMPLE_JWT = {
     'ROTATE_REFRESH_TOKENS': True,
 }
 
+# Cache configuration
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='super-admin-cache'),
+    }
+}
+
+# Seconds a cached /schools/statistics/ snapshot is served before recomputing
+SCHOOL_STATISTICS_CACHE_TTL = config('SCHOOL_STATISTICS_CACHE_TTL', default=60, cast=int)
+
+# Full-text search backend for schools and staff (?search=)
+SEARCH_BACKEND = config('SEARCH_BACKEND', default='schools.search.SQLiteFTS5Backend')
+# Most matches taken from backends that cannot join the queryset (search())
+SEARCH_MAX_RESULTS = config('SEARCH_MAX_RESULTS', default=500, cast=int)
+
+# Seconds between checks of the shared version of cached reference tables
+REFERENCE_CACHE_CHECK_INTERVAL = config('REFERENCE_CACHE_CHECK_INTERVAL', default=1.0, cast=float)
+
+# Days of system health history kept per resolution (0 keeps it forever);
+# raw samples need to outlive a day for the daily rollups
+HEALTH_RETENTION_DAYS = {
+    'raw': config('HEALTH_RAW_RETENTION_DAYS', default=7, cast=int),
+    'minute': config('HEALTH_MINUTE_RETENTION_DAYS', default=30, cast=int),
+    'hour': config('HEALTH_HOUR_RETENTION_DAYS', default=400, cast=int),
+    'day': config('HEALTH_DAY_RETENTION_DAYS', default=0, cast=int),
+}
+# Most points per component a /system-health/history/ response holds
+HEALTH_HISTORY_MAX_POINTS = config('HEALTH_HISTORY_MAX_POINTS', default=500, cast=int)
+
+# Health prober (manage.py probe_health): one probe per SystemHealth
+# component, components with an empty target are not probed
+HEALTH_PROBE_INTERVAL = config('HEALTH_PROBE_INTERVAL', default=30, cast=int)
+HEALTH_PROBE_TIMEOUT = config('HEALTH_PROBE_TIMEOUT', default=5.0, cast=float)
+HEALTH_UPTIME_WINDOW_HOURS = config('HEALTH_UPTIME_WINDOW_HOURS', default=24, cast=int)
+HEALTH_PROBES = {
+    'database': {'class': 'dashboard.probes.DatabaseProbe'},
+    'api': {'class': 'dashboard.probes.HTTPProbe', 'url': config('API_HEALTH_URL', default='')},
+    'cache': {'class': 'dashboard.probes.CacheProbe'},
+    'storage': {'class': 'dashboard.probes.StorageProbe'},
+    'email': {
+        'class': 'dashboard.probes.TCPProbe',
+        'host': config('EMAIL_HOST', default='localhost'),
+        'port': config('EMAIL_PORT', default=25, cast=int),
+    },
+    'sms': {'class': 'dashboard.probes.HTTPProbe', 'url': config('SMS_HEALTH_URL', default='')},
+    'payment': {'class': 'dashboard.probes.HTTPProbe', 'url': config('PAYMENT_HEALTH_URL', default='')},
+}
+
+# Dashboard bootstrap (/api/dashboard/bootstrap/): seconds each panel is
+# cached; 0 leaves a panel to its own cache
+DASHBOARD_PANEL_TTLS = {
+    'schools': 0,
+    'system_health': 0,
+    'activities': 0,
+    'metrics': config('DASHBOARD_METRICS_TTL', default=300, cast=int),
+    'ai_quiz': config('DASHBOARD_AI_QUIZ_TTL', default=300, cast=int),
+    'revenue': config('DASHBOARD_REVENUE_TTL', default=300, cast=int),
+}
+DASHBOARD_BOOTSTRAP_WORKERS = config('DASHBOARD_BOOTSTRAP_WORKERS', default=6, cast=int)
+
+# Live dashboard feed (/api/dashboard/live/). With LocalBroker each ASGI
+# worker watches the tables for the events of other processes instead;
+# super_admin_backend.pubsub.RedisBroker relays events between processes
+LIVE_FEED_BROKER = {
+    'class': config('LIVE_FEED_BROKER', default='super_admin_backend.pubsub.LocalBroker'),
+    'url': config('REDIS_URL', default='redis://localhost:6379/0'),
+}
+LIVE_FEED_HEARTBEAT = config('LIVE_FEED_HEARTBEAT', default=15, cast=int)
+LIVE_FEED_QUEUE_SIZE = config('LIVE_FEED_QUEUE_SIZE', default=100, cast=int)
+LIVE_FEED_BACKLOG = config('LIVE_FEED_BACKLOG', default=200, cast=int)
+# Seconds between the table checks of a web process watching for events
+# itself (LocalBroker), and how many seconds each check reaches back for
+# rows of transactions that committed after their created_at
+LIVE_FEED_WATCH_POLL = config('LIVE_FEED_WATCH_POLL', default=2, cast=int)
+LIVE_FEED_WATCH_LAG = config('LIVE_FEED_WATCH_LAG', default=10, cast=int)
+LIVE_FEED_AUDIT_SEVERITIES = ['high', 'critical']
+
+# Monthly partitions of the log tables (manage.py archive_partitions): the
+# last hot_months months stay in the table and serve the API, older months
+# are moved to compressed files under PARTITION_ARCHIVE_ROOT
+PARTITION_ARCHIVE_ROOT = config('PARTITION_ARCHIVE_ROOT', default=str(BASE_DIR / 'archive'))
+PARTITIONED_MODELS = {
+    'dashboard.RecentActivity': {
+        'hot_months': config('ACTIVITY_HOT_MONTHS', default=3, cast=int),
+    },
+    'compliance.AuditLog': {
+        'hot_months': config('AUDIT_LOG_HOT_MONTHS', default=13, cast=int),
+    },
+}
+
 # Celery Configuration (for background tasks)
 CELERY_BROKER_URL = config('REDIS_URL', default='redis://localhost:6379/0')
 CELERY_RESULT_BACKEND = config('REDIS_URL', default='redis://localhost:6379/0')
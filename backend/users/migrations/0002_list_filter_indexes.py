@@ -0,0 +1,64 @@
+# Generated by Django 5.0 on 2026-10-17 18:31
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schools', '0005_list_filter_indexes'),
+        ('users', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='apikey',
+            index=models.Index(fields=['user', '-created_at'], name='users_apike_user_id_8f476f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='apikey',
+            index=models.Index(fields=['is_active', '-created_at'], name='users_apike_is_acti_cc7eac_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='apikey',
+            index=models.Index(fields=['-created_at'], name='users_apike_created_8f856b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(fields=['role', '-created_at'], name='users_userp_role_be2fcf_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(fields=['can_manage_schools', '-created_at'], name='users_userp_can_man_97f882_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(fields=['can_manage_integrations', '-created_at'], name='users_userp_can_man_d4847e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(fields=['-created_at'], name='users_userp_created_bea041_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='usersession',
+            index=models.Index(fields=['user', '-last_activity'], name='users_users_user_id_f9f20a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='usersession',
+            index=models.Index(fields=['is_active', '-last_activity'], name='users_users_is_acti_493f02_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='usersession',
+            index=models.Index(fields=['country', '-last_activity'], name='users_users_country_0f4e25_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='usersession',
+            index=models.Index(fields=['city', '-last_activity'], name='users_users_city_190b6f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='usersession',
+            index=models.Index(fields=['-last_activity'], name='users_users_last_ac_b5b272_idx'),
+        ),
+    ]
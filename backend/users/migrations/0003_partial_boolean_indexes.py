@@ -0,0 +1,64 @@
+# Generated by Django 5.0 on 2026-10-17 19:22
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schools', '0006_partial_boolean_indexes'),
+        ('users', '0002_list_filter_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='apikey',
+            name='users_apike_is_acti_cc7eac_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='userprofile',
+            name='users_userp_can_man_97f882_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='userprofile',
+            name='users_userp_can_man_d4847e_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='usersession',
+            name='users_users_is_acti_493f02_idx',
+        ),
+        migrations.AddIndex(
+            model_name='apikey',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-created_at'], name='users_apikey_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='apikey',
+            index=models.Index(condition=models.Q(('is_active', False)), fields=['-created_at'], name='users_apikey_inactive_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(condition=models.Q(('can_manage_schools', True)), fields=['-created_at'], name='users_profile_schools_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(condition=models.Q(('can_manage_schools', False)), fields=['-created_at'], name='users_profile_noschools_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(condition=models.Q(('can_manage_integrations', True)), fields=['-created_at'], name='users_profile_integr_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(condition=models.Q(('can_manage_integrations', False)), fields=['-created_at'], name='users_profile_nointegr_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='usersession',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-last_activity'], name='users_session_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='usersession',
+            index=models.Index(condition=models.Q(('is_active', False)), fields=['-last_activity'], name='users_session_inactive_idx'),
+        ),
+    ]
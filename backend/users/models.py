@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import Q
 from django.contrib.auth.models import User
 from schools.models import School
 import uuid
@@ -38,6 +39,26 @@ class UserProfile(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    class Meta:
+        indexes = [
+            # List endpoint filters and default ordering
+            models.Index(fields=['role', '-created_at']),
+            # Boolean filters compile to a bare WHERE col: one partial index per value
+            models.Index(
+                fields=['-created_at'], condition=Q(can_manage_schools=True), name='users_profile_schools_idx'
+            ),
+            models.Index(
+                fields=['-created_at'], condition=Q(can_manage_schools=False), name='users_profile_noschools_idx'
+            ),
+            models.Index(
+                fields=['-created_at'], condition=Q(can_manage_integrations=True), name='users_profile_integr_idx'
+            ),
+            models.Index(
+                fields=['-created_at'], condition=Q(can_manage_integrations=False), name='users_profile_nointegr_idx'
+            ),
+            models.Index(fields=['-created_at']),
+        ]
+    
     def __str__(self):
         return f"{self.user.get_full_name() or self.user.username} - {self.get_role_display()}"
 
@@ -56,6 +77,21 @@ class UserSession(models.Model):
     last_activity = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
     
+    class Meta:
+        indexes = [
+            # List endpoint filters and default ordering
+            models.Index(fields=['user', '-last_activity']),
+            models.Index(
+                fields=['-last_activity'], condition=Q(is_active=True), name='users_session_active_idx'
+            ),
+            models.Index(
+                fields=['-last_activity'], condition=Q(is_active=False), name='users_session_inactive_idx'
+            ),
+            models.Index(fields=['country', '-last_activity']),
+            models.Index(fields=['city', '-last_activity']),
+            models.Index(fields=['-last_activity']),
+        ]
+    
     def __str__(self):
         return f"{self.user.username} - {self.ip_address}"
 
@@ -80,5 +116,18 @@ class ApiKey(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    class Meta:
+        indexes = [
+            # List endpoint filters and default ordering
+            models.Index(fields=['user', '-created_at']),
+            models.Index(
+                fields=['-created_at'], condition=Q(is_active=True), name='users_apikey_active_idx'
+            ),
+            models.Index(
+                fields=['-created_at'], condition=Q(is_active=False), name='users_apikey_inactive_idx'
+            ),
+            models.Index(fields=['-created_at']),
+        ]
+    
     def __str__(self):
         return f"{self.user.username} - {self.name}"
\ No newline at end of file
@@ -1,36 +1,39 @@
 from rest_framework import serializers
+from super_admin_backend.fieldsets import SparseFieldsetMixin
 from django.contrib.auth.models import User
 from .models import UserProfile, UserSession, ApiKey
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'username', 'email', 'first_name', 'last_name', 'is_active', 'date_joined']
         read_only_fields = ['id', 'date_joined']
 
-class UserProfileSerializer(serializers.ModelSerializer):
+class UserProfileSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     
     class Meta:
         model = UserProfile
         fields = '__all__'
 
-class UserSessionSerializer(serializers.ModelSerializer):
+class UserSessionSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     user_name = serializers.CharField(source='user.get_full_name', read_only=True)
     
     class Meta:
         model = UserSession
         fields = '__all__'
+        expandable_fields = {'user': UserSerializer}
 
-class ApiKeySerializer(serializers.ModelSerializer):
+class ApiKeySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     user_name = serializers.CharField(source='user.get_full_name', read_only=True)
     
     class Meta:
         model = ApiKey
         fields = '__all__'
         read_only_fields = ('id', 'key_hash', 'created_at', 'updated_at')
+        expandable_fields = {'user': UserSerializer}
 
-class CreateUserSerializer(serializers.ModelSerializer):
+class CreateUserSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, min_length=8)
     profile_data = UserProfileSerializer(write_only=True, required=False)
     
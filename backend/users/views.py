@@ -10,8 +10,10 @@ from .serializers import (
     UserSerializer, UserProfileSerializer, UserSessionSerializer, 
     ApiKeySerializer, CreateUserSerializer
 )
+from super_admin_backend.exports import ExportViewSetMixin
+from super_admin_backend.fieldsets import SparseFieldsetViewSetMixin
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(ExportViewSetMixin, SparseFieldsetViewSetMixin, viewsets.ModelViewSet):
     queryset = User.objects.select_related('profile')
     serializer_class = UserSerializer
     filter_backends = [DjangoFilterBackend]
@@ -68,14 +70,14 @@ class UserViewSet(viewsets.ModelViewSet):
             'role_distribution': list(role_stats)
         })
 
-class UserProfileViewSet(viewsets.ModelViewSet):
+class UserProfileViewSet(ExportViewSetMixin, SparseFieldsetViewSetMixin, viewsets.ModelViewSet):
     queryset = UserProfile.objects.select_related('user')
     serializer_class = UserProfileSerializer
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['role', 'can_manage_schools', 'can_manage_integrations']
     ordering = ['-created_at']
 
-class UserSessionViewSet(viewsets.ReadOnlyModelViewSet):
+class UserSessionViewSet(ExportViewSetMixin, SparseFieldsetViewSetMixin, viewsets.ReadOnlyModelViewSet):
     queryset = UserSession.objects.select_related('user')
     serializer_class = UserSessionSerializer
     filter_backends = [DjangoFilterBackend]
@@ -141,7 +143,7 @@ class UserSessionViewSet(viewsets.ReadOnlyModelViewSet):
             'browser_distribution': list(device_stats)
         })
 
-class ApiKeyViewSet(viewsets.ModelViewSet):
+class ApiKeyViewSet(ExportViewSetMixin, SparseFieldsetViewSetMixin, viewsets.ModelViewSet):
     queryset = ApiKey.objects.select_related('user')
     serializer_class = ApiKeySerializer
     filter_backends = [DjangoFilterBackend]